@@ -0,0 +1,73 @@
+"""
+Cost of converting Falcon 500 readings with the swervepy.conversions functions against FalconConversion's
+precomputed factors, one reading at a time and for every module's readings at once.
+
+Run from the project root with ``python -m benchmarks.bench_conversions``.
+"""
+
+import random
+import timeit
+
+import numpy as np
+
+from swervepy import conversions
+from swervepy.conversions import FalconConversion
+
+GEAR_RATIO = 6.75
+CIRCUMFERENCE = 0.319
+MODULES = 4
+CALLS = 100_000
+
+
+def report(name, functions, precomputed):
+    functions_time = timeit.timeit(functions, number=CALLS) / CALLS
+    precomputed_time = timeit.timeit(precomputed, number=CALLS) / CALLS
+    print(
+        f"{name:<28} {functions_time * 1e9:9.0f} ns {precomputed_time * 1e9:9.0f} ns "
+        f"{functions_time / precomputed_time:7.2f}x"
+    )
+
+
+def main():
+    rng = random.Random(364)
+    raw = rng.uniform(-20_000, 20_000)
+    readings = [rng.uniform(-20_000, 20_000) for _ in range(MODULES)]
+    raw_array = np.array(readings)
+    out = np.empty(MODULES)
+    conversion = FalconConversion(GEAR_RATIO, CIRCUMFERENCE)
+
+    print(f"{'conversion':<28} {'functions':>12} {'precomputed':>12} {'speedup':>8}")
+    report(
+        "velocity to m/s",
+        lambda: conversions.falcon_to_mps(raw, CIRCUMFERENCE, GEAR_RATIO),
+        lambda: conversion.to_mps(raw),
+    )
+    report(
+        "m/s to velocity",
+        lambda: conversions.mps_to_falcon(raw, CIRCUMFERENCE, GEAR_RATIO),
+        lambda: conversion.from_mps(raw),
+    )
+    report(
+        "counts to metres",
+        lambda: conversions.falcon_to_metres(raw, CIRCUMFERENCE, GEAR_RATIO),
+        lambda: conversion.to_metres(raw),
+    )
+    report(
+        "counts to Rotation2d",
+        lambda: conversions.falcon_to_degrees(raw, GEAR_RATIO),
+        lambda: conversion.to_rotation(raw),
+    )
+    report(
+        f"{MODULES} velocities to m/s (scalar)",
+        lambda: [conversions.falcon_to_mps(value, CIRCUMFERENCE, GEAR_RATIO) for value in readings],
+        lambda: [conversion.to_mps(value) for value in readings],
+    )
+    report(
+        f"{MODULES} velocities to m/s (batch)",
+        lambda: [conversions.falcon_to_mps(value, CIRCUMFERENCE, GEAR_RATIO) for value in readings],
+        lambda: conversion.to_mps_batch(raw_array, out),
+    )
+
+
+if __name__ == "__main__":
+    main()
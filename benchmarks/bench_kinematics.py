@@ -0,0 +1,64 @@
+"""
+Per-call latency of the wpimath kinematics path used by SwerveDrive.drive against VectorizedSwerveKinematics.
+
+Run from the project root with ``python -m benchmarks.bench_kinematics``.
+"""
+
+import math
+import random
+import timeit
+
+import numpy as np
+import wpimath.kinematics
+from wpimath.geometry import Rotation2d, Translation2d
+from wpimath.kinematics import ChassisSpeeds
+
+from constants import DriveConstants as dc
+from swervepy.abstract.system import optimize
+from swervepy.kinematics import VectorizedSwerveKinematics
+
+PLACEMENTS = (
+    Translation2d(dc.wheelBase / 2, dc.trackWidth / 2),
+    Translation2d(-dc.wheelBase / 2, dc.trackWidth / 2),
+    Translation2d(dc.wheelBase / 2, -dc.trackWidth / 2),
+    Translation2d(-dc.wheelBase / 2, -dc.trackWidth / 2),
+)
+MAX_SPEED = 3.5
+PERIOD = 0.02
+CALLS = 20_000
+
+
+def wpimath_path(kinematics, vx, vy, omega, heading, current_angles):
+    speeds = ChassisSpeeds.fromFieldRelativeSpeeds(vx, vy, omega, heading)
+    speeds = ChassisSpeeds.discretize(speeds, PERIOD)
+    states = kinematics.toSwerveModuleStates(speeds)
+    states = kinematics.desaturateWheelSpeeds(states, MAX_SPEED)
+    return [optimize(state, angle) for state, angle in zip(states, current_angles)]
+
+
+def main():
+    rng = random.Random(364)
+    vx, vy, omega = rng.uniform(-3, 3), rng.uniform(-3, 3), rng.uniform(-4, 4)
+    heading = rng.uniform(-math.pi, math.pi)
+    current_degrees = [rng.uniform(-720, 720) for _ in PLACEMENTS]
+
+    kinematics = wpimath.kinematics.SwerveDrive4Kinematics(*PLACEMENTS)
+    current_rotations = [Rotation2d.fromDegrees(angle) for angle in current_degrees]
+    heading_rotation = Rotation2d(heading)
+    legacy = timeit.timeit(
+        lambda: wpimath_path(kinematics, vx, vy, omega, heading_rotation, current_rotations), number=CALLS
+    )
+
+    engine = VectorizedSwerveKinematics(PLACEMENTS)
+    current_array = np.array(current_degrees)
+    vectorized = timeit.timeit(
+        lambda: engine.calculate(vx, vy, omega, current_array, MAX_SPEED, PERIOD, heading, True), number=CALLS
+    )
+
+    print(f"wpimath kinematics:    {legacy / CALLS * 1e6:8.2f} us/call")
+    print(f"vectorized kinematics: {vectorized / CALLS * 1e6:8.2f} us/call")
+    print(f"speedup:               {legacy / vectorized:8.2f}x")
+
+
+if __name__ == "__main__":
+    main()
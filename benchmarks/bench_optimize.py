@@ -0,0 +1,60 @@
+"""
+Cost of placing a target angle near a wound-up azimuth angle: the original loop against the closed form,
+and the scalar optimizer against the batch optimizer.
+
+Run from the project root with ``python -m benchmarks.bench_optimize``.
+"""
+
+import timeit
+
+import numpy as np
+from wpimath.geometry import Rotation2d
+from wpimath.kinematics import SwerveModuleState
+
+from swervepy.abstract.system import optimize, optimize_batch, place_in_proper_0_to_360_scope
+
+WIND_UP_DEGREES = (0, 3_600, 36_000, 360_000, 3_600_000)
+CALLS = 2_000
+MODULES = 4
+
+
+def looping_place_in_proper_0_to_360_scope(scope_reference: float, new_angle: float) -> float:
+    lower_offset = scope_reference % 360
+    lower_bound = scope_reference - lower_offset
+    upper_bound = lower_bound + 360
+
+    while new_angle < lower_bound:
+        new_angle += 360
+    while new_angle > upper_bound:
+        new_angle -= 360
+
+    if new_angle - scope_reference > 180:
+        new_angle -= 360
+    elif new_angle - scope_reference < -180:
+        new_angle += 360
+
+    return new_angle
+
+
+def main():
+    print(f"{'wind-up (deg)':>14} {'loop (us)':>12} {'closed form (us)':>18}")
+    for wind_up in WIND_UP_DEGREES:
+        loop = timeit.timeit(lambda: looping_place_in_proper_0_to_360_scope(wind_up + 17.0, 45.0), number=CALLS)
+        closed = timeit.timeit(lambda: place_in_proper_0_to_360_scope(wind_up + 17.0, 45.0), number=CALLS)
+        print(f"{wind_up:>14} {loop / CALLS * 1e6:>12.3f} {closed / CALLS * 1e6:>18.3f}")
+
+    current = [Rotation2d.fromDegrees(360_000 + 90 * i) for i in range(MODULES)]
+    states = [SwerveModuleState(1.0, Rotation2d.fromDegrees(45 * i)) for i in range(MODULES)]
+    scalar = timeit.timeit(lambda: [optimize(s, c) for s, c in zip(states, current)], number=CALLS)
+
+    current_array = np.array([angle.degrees() for angle in current])
+    speeds = np.ones(MODULES)
+    angles = np.array([state.angle.degrees() for state in states])
+    batch = timeit.timeit(lambda: optimize_batch(speeds.copy(), angles.copy(), current_array), number=CALLS)
+
+    print(f"\n{MODULES} modules, scalar optimize: {scalar / CALLS * 1e6:.3f} us/call")
+    print(f"{MODULES} modules, optimize_batch:  {batch / CALLS * 1e6:.3f} us/call")
+
+
+if __name__ == "__main__":
+    main()
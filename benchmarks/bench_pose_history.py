@@ -0,0 +1,49 @@
+"""
+Per-lookup cost of PoseHistory against wpimath's TimeInterpolatablePose2dBuffer, at several history lengths.
+
+Run from the project root with ``python -m benchmarks.bench_pose_history``.
+"""
+
+import random
+import sys
+import timeit
+
+from wpimath.geometry import Pose2d, Rotation2d
+from wpimath.interpolation import TimeInterpolatablePose2dBuffer
+
+from swervepy.posehistory import PoseHistory
+
+PERIOD = 0.005
+CAPACITIES = (50, 500, 5000)
+CALLS = 20_000
+
+
+def fill(capacity):
+    history = PoseHistory(capacity)
+    buffer = TimeInterpolatablePose2dBuffer(capacity * PERIOD)
+    for i in range(capacity):
+        timestamp = i * PERIOD
+        pose = Pose2d(i * 0.01, i * 0.005, Rotation2d(i * 0.002))
+        history.record(timestamp, pose, (1.0, 1.0, 1.0, 1.0))
+        buffer.addSample(timestamp, pose)
+    return history, buffer
+
+
+def main():
+    rng = random.Random(364)
+    print(f"{'samples':>8} {'PoseHistory':>14} {'wpimath buffer':>16} {'memory':>10}")
+    for capacity in CAPACITIES:
+        history, buffer = fill(capacity)
+        times = [rng.uniform(0, (capacity - 1) * PERIOD) for _ in range(CALLS)]
+
+        ours = timeit.timeit(lambda: [history.sample_at(t) for t in times], number=1)
+        theirs = timeit.timeit(lambda: [buffer.sample(t) for t in times], number=1)
+        memory = sys.getsizeof(history._data)
+
+        print(
+            f"{capacity:>8} {ours / CALLS * 1e6:11.2f} us {theirs / CALLS * 1e6:13.2f} us {memory / 1024:7.1f} KiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Wall-clock time to simulate the autonomous trajectory headlessly, and how much faster than real time that is.
+
+Run from the project root with ``python -m benchmarks.bench_simulation``.
+"""
+
+import math
+import os
+
+import commands2
+from wpimath.geometry import Translation2d
+
+from constants import DriveConstants as dc
+from subsystems.drivesubsystem import DriveSubsystem
+from swervepy import u
+from swervepy.simulation import HeadlessSimulation, dummy_swerve_drive
+from swervepy.trajectory import compile_trajectory, read_compiled
+
+TRAJECTORY = "goToCage"
+RUNS = 5
+PLACEMENTS = (
+    Translation2d(dc.wheelBase / 2, dc.trackWidth / 2),
+    Translation2d(-dc.wheelBase / 2, dc.trackWidth / 2),
+    Translation2d(dc.wheelBase / 2, -dc.trackWidth / 2),
+    Translation2d(-dc.wheelBase / 2, -dc.trackWidth / 2),
+)
+
+
+def main():
+    source = os.path.join("deploy", "choreo", f"{TRAJECTORY}.traj")
+    compiled_path = os.path.join("deploy", "choreo", f"{TRAJECTORY}.ctraj")
+    compile_trajectory(source, compiled_path)
+    trajectory = read_compiled(compiled_path)
+
+    print(f"{'run':>4} {'cycles':>7} {'sim time':>10} {'wall time':>11} {'speedup':>9} {'final error':>12}")
+    for run in range(RUNS):
+        commands2.CommandScheduler.resetInstance()
+        drive = dummy_swerve_drive(PLACEMENTS, 4.5 * (u.m / u.s), 2 * math.pi * (u.rad / u.s))
+        command = drive.follow_trajectory_command(
+            trajectory, DriveSubsystem.TrajectoryFollowerParameters, DriveSubsystem.RobotConfigControls.config, True
+        )
+        with HeadlessSimulation(drive) as simulation:
+            result = simulation.run_command(command)
+
+        error = result.poses[-1].translation().distance(trajectory.pose(len(trajectory) - 1).translation())
+        print(
+            f"{run:>4} {result.cycles:>7} {result.sim_seconds:>8.2f} s {result.wall_seconds * 1000:>8.1f} ms "
+            f"{result.speedup:>8.0f}x {error * 100:>9.2f} cm"
+        )
+
+
+if __name__ == "__main__":
+    main()
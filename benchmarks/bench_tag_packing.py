@@ -0,0 +1,172 @@
+"""
+Bytes per frame and robot-side decode time of the single packed "AprilTag/Frame" topic against the previous
+scheme of one float array topic per field.
+
+Bytes are measured on the wire: frames are published from a NetworkTables client to a local server through a
+proxy that counts the bytes the client sends, so they include NetworkTables' and WebSocket's framing.
+
+Run from the project root with ``python -m benchmarks.bench_tag_packing``.
+"""
+
+import random
+import socket
+import threading
+import time
+import timeit
+
+import ntcore
+import numpy as np
+
+import visionprocessing.apriltagpackager as ATPackage
+
+TAG_COUNTS = (0, 1, 4, 8, 16)
+CALLS = 20_000
+FRAMES = 200
+# The previous scheme published these float arrays, along with the capture time as an integer topic
+ARRAY_TOPICS = ("Ids", "Centers_x", "Centers_y", "Positions_x", "Positions_y", "Positions_z", "Roll", "Pitch", "Yaw")
+# Every publish is sent and received rather than only the newest value each period
+SEND_ALL = ntcore.PubSubOptions(sendAll=True, keepDuplicates=True)
+
+
+class _CountingProxy:
+    def __init__(self, serverPort: int):
+        """
+        Forwards TCP connections to a local server, counting the bytes sent towards it
+
+        :param serverPort: The server's port
+        """
+        self.serverPort = serverPort
+        self.sent = 0
+        self.listener = socket.create_server(("127.0.0.1", 0))
+        self.port = self.listener.getsockname()[1]
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            client, _ = self.listener.accept()
+            server = socket.create_connection(("127.0.0.1", self.serverPort))
+            threading.Thread(target=self._forward, args=(client, server, True), daemon=True).start()
+            threading.Thread(target=self._forward, args=(server, client, False), daemon=True).start()
+
+    def _forward(self, source: socket.socket, destination: socket.socket, counted: bool):
+        while data := source.recv(65536):
+            if counted:
+                self.sent += len(data)
+            destination.sendall(data)
+
+
+class _Link:
+    def __init__(self):
+        """A NetworkTables client connected to a local server through a counting proxy"""
+        with socket.create_server(("127.0.0.1", 0)) as probe:
+            serverPort = probe.getsockname()[1]
+        self.server = ntcore.NetworkTableInstance.create()
+        self.server.startServer("", "127.0.0.1", 0, serverPort)
+        self.proxy = _CountingProxy(serverPort)
+        self.client = ntcore.NetworkTableInstance.create()
+        self.client.startClient4("bench_tag_packing")
+        self.client.setServer("127.0.0.1", self.proxy.port)
+        while not self.client.isConnected():
+            time.sleep(0.01)
+
+    def bytesPerFrame(self, publish) -> float:
+        """
+        :param publish: Publishes one frame, given its index. The server must be subscribed to its topics, or the
+                        client does not send their values
+        :returns: The mean number of bytes the client sent per frame, once the topics were announced
+        """
+        publish(0)
+        self._settle()
+        start = self.proxy.sent
+        for index in range(1, FRAMES + 1):
+            publish(index)
+            self.client.flush()
+            time.sleep(0.002)
+        self._settle()
+        return (self.proxy.sent - start) / FRAMES
+
+    def _settle(self):
+        self.client.flush()
+        time.sleep(0.2)
+
+    def close(self):
+        self.client.stopClient()
+        self.server.stopServer()
+        ntcore.NetworkTableInstance.destroy(self.client)
+        ntcore.NetworkTableInstance.destroy(self.server)
+
+
+def arrayBytesPerFrame(link: _Link, arrays: list[list[float]], tagCount: int) -> float:
+    table = link.client.getTable(f"Arrays{tagCount}")
+    publishers = [table.getFloatArrayTopic(name).publish(SEND_ALL) for name in ARRAY_TOPICS]
+    captureTime = table.getIntegerTopic("CaptureTime").publish(SEND_ALL)
+    # Held until measured, so the server keeps asking for every value
+    subscribers = [link.server.getTable(f"Arrays{tagCount}").getTopic(name).genericSubscribe(SEND_ALL)
+                   for name in (*ARRAY_TOPICS, "CaptureTime")]
+    ids = [float(index) for index in range(tagCount)]
+
+    def publish(index: int):
+        timestamp = 1_000_000 + index * 20_000
+        captureTime.set(timestamp, timestamp)
+        for publisher, values in zip(publishers, (ids, *arrays)):
+            publisher.set(values, timestamp)
+
+    return link.bytesPerFrame(publish)
+
+
+def packedBytesPerFrame(link: _Link, frame: bytes, tagCount: int) -> float:
+    publisher = link.client.getRawTopic(f"Packed{tagCount}").publish(ATPackage.kFrameTypeString, SEND_ALL)
+    # Held until measured, so the server keeps asking for every value
+    subscriber = link.server.getTopic(f"Packed{tagCount}").genericSubscribe(SEND_ALL)
+    buffer = bytearray(frame)
+
+    def publish(index: int):
+        # Each frame gets its own capture time and frame id, as on the coprocessor
+        timestamp = 1_000_000 + index * 20_000
+        ATPackage.kFrameHeader.pack_into(buffer, 0, timestamp, index, tagCount)
+        publisher.set(buffer, timestamp)
+
+    return link.bytesPerFrame(publish)
+
+
+def randomArrays(rng: random.Random, tagCount: int) -> list[list[float]]:
+    # Every field but the IDs
+    return [[rng.uniform(-3, 3) for _ in range(tagCount)] for _ in range(len(ARRAY_TOPICS) - 1)]
+
+
+def packedFrame(arrays: list[list[float]], tagCount: int) -> bytes:
+    buffer = bytearray(ATPackage.kFrameHeader.size + tagCount * ATPackage.kTagDtype.itemsize)
+    ATPackage.kFrameHeader.pack_into(buffer, 0, 123456789, 1, tagCount)
+    tags = np.frombuffer(buffer, dtype=ATPackage.kTagDtype, count=tagCount, offset=ATPackage.kFrameHeader.size)
+    for index in range(tagCount):
+        cX, cY, tX, tY, tZ, roll, pitch, yaw = (values[index] for values in arrays)
+        tags[index] = (index, (cX, cY), (0,) * 8, (tX, tY, tZ), (roll, pitch, yaw))
+    return bytes(buffer)
+
+
+def decodeArrays(arrays: list[list[float]]) -> list[tuple]:
+    # Each array arrives as its own list, and tags are assembled by zipping them together
+    cX, cY, tX, tY, tZ, roll, pitch, yaw = (list(values) for values in arrays)
+    return list(zip(cX, cY, tX, tY, tZ, roll, pitch, yaw))
+
+
+def main():
+    rng = random.Random(10476)
+    link = _Link()
+    print(f"{'tags':>5} {'arrays (B)':>11} {'packed (B)':>11} {'arrays (us)':>12} {'packed (us)':>12}")
+    for tagCount in TAG_COUNTS:
+        arrays = randomArrays(rng, tagCount)
+        frame = packedFrame(arrays, tagCount)
+
+        arrayBytes = arrayBytesPerFrame(link, arrays, tagCount)
+        packedBytes = packedBytesPerFrame(link, frame, tagCount)
+        arrayDecode = timeit.timeit(lambda: decodeArrays(arrays), number=CALLS) / CALLS
+        packedDecode = timeit.timeit(lambda: ATPackage.decodeFrame(frame, 0.0), number=CALLS) / CALLS
+
+        print(f"{tagCount:>5} {arrayBytes:>11.0f} {packedBytes:>11.0f} "
+              f"{arrayDecode * 1e6:>12.2f} {packedDecode * 1e6:>12.2f}")
+    link.close()
+
+
+if __name__ == "__main__":
+    main()
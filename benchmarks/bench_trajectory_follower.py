@@ -0,0 +1,129 @@
+"""
+Tracking error and per-cycle cost of swervepy's trajectory follower against PathPlanner's FollowPathCommand, on a
+simulated drive whose wheels lag their commanded speed.
+
+Run from the project root with ``python -m benchmarks.bench_trajectory_follower``.
+"""
+
+import math
+import os
+import statistics
+import time
+import tracemalloc
+
+import hal
+import numpy as np
+import wpilib.simulation
+from pathplannerlib.path import PathPlannerPath
+from wpimath.geometry import Translation2d
+
+from constants import DriveConstants as dc
+from subsystems.drivesubsystem import DriveSubsystem
+from swervepy import SwerveDrive, u
+from swervepy.impl import CoaxialSwerveModule, DummyGyro
+from swervepy.impl.motor import DummyCoaxialAzimuthComponent, DummyCoaxialDriveComponent
+from swervepy.trajectory import COLUMNS, CompiledTrajectory, X, Y, compile_trajectory, read_compiled
+
+TRAJECTORY = "goToCage"
+PERIOD = 0.02
+# Time constant of the simulated wheels' response to a new speed, in seconds
+WHEEL_LAG = 0.08
+PLACEMENTS = (
+    Translation2d(dc.wheelBase / 2, dc.trackWidth / 2),
+    Translation2d(-dc.wheelBase / 2, dc.trackWidth / 2),
+    Translation2d(dc.wheelBase / 2, -dc.trackWidth / 2),
+    Translation2d(-dc.wheelBase / 2, -dc.trackWidth / 2),
+)
+
+
+class LaggingDriveComponent(DummyCoaxialDriveComponent):
+    """A wheel that approaches its commanded speed exponentially, and leads it by the acceleration feedforward"""
+
+    def __init__(self):
+        super().__init__()
+        self._target = 0.0
+
+    def follow_velocity_closed(self, velocity: float, acceleration: float = 0.0):
+        self._target = velocity + WHEEL_LAG * acceleration
+
+    def simulation_periodic(self, delta_time: float):
+        self._velocity += (self._target - self._velocity) * min(delta_time / WHEEL_LAG, 1.0)
+        self._position += self._velocity * delta_time
+
+
+def make_drive() -> SwerveDrive:
+    modules = tuple(
+        CoaxialSwerveModule(LaggingDriveComponent(), DummyCoaxialAzimuthComponent(), placement)
+        for placement in PLACEMENTS
+    )
+    return SwerveDrive(modules, DummyGyro(), 4.5 * (u.m / u.s), 2 * math.pi * (u.rad / u.s))
+
+
+def run(name, make_command, reference: CompiledTrajectory):
+    drive = make_drive()
+    command = make_command(drive)
+    target = np.zeros(reference.samples.shape[1])
+
+    command.initialize()
+    start = wpilib.Timer.getFPGATimestamp()
+    errors, cycle_times, cycle_bytes = [], [], []
+    tracemalloc.start()
+    while not command.isFinished():
+        wpilib.simulation.stepTiming(PERIOD)
+        drive.periodic()
+
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        cycle_start = time.perf_counter()
+        command.execute()
+        cycle_times.append(time.perf_counter() - cycle_start)
+        cycle_bytes.append(tracemalloc.get_traced_memory()[1] - baseline)
+
+        drive.simulationPeriodic()
+        reference.sample_into(wpilib.Timer.getFPGATimestamp() - start, target)
+        pose = drive.pose
+        errors.append(math.hypot(pose.X() - target[X], pose.Y() - target[Y]))
+    tracemalloc.stop()
+    command.end(False)
+
+    rms = math.sqrt(statistics.fmean(error**2 for error in errors))
+    print(
+        f"{name:<30} {rms * 100:8.2f} cm {max(errors) * 100:8.2f} cm "
+        f"{statistics.median(cycle_times) * 1e6:9.1f} us {statistics.median(cycle_bytes):9.0f} B"
+    )
+
+
+def main():
+    hal.initialize()
+    wpilib.simulation.pauseTiming()
+
+    source = os.path.join("deploy", "choreo", f"{TRAJECTORY}.traj")
+    compiled_path = os.path.join("deploy", "choreo", f"{TRAJECTORY}.ctraj")
+    compile_trajectory(source, compiled_path)
+    trajectory = read_compiled(compiled_path)
+    without_forces = CompiledTrajectory(np.array(trajectory.samples[:, : len(COLUMNS)]), 0, TRAJECTORY)
+
+    parameters = DriveSubsystem.TrajectoryFollowerParameters
+    config = DriveSubsystem.RobotConfigControls.config
+    path = PathPlannerPath.fromChoreoTrajectory(TRAJECTORY)
+
+    print(f"{'follower':<30} {'rms error':>11} {'max error':>11} {'cycle time':>12} {'allocated':>11}")
+    run(
+        "swervepy, force feedforward",
+        lambda drive: drive.follow_trajectory_command(trajectory, parameters, config, True),
+        trajectory,
+    )
+    run(
+        "swervepy, speed feedforward",
+        lambda drive: drive.follow_trajectory_command(without_forces, parameters, config, True),
+        trajectory,
+    )
+    run(
+        "PathPlanner FollowPathCommand",
+        lambda drive: drive.follow_trajectory_command(path, parameters, config, True),
+        trajectory,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Load time and memory of a Choreo trajectory parsed from JSON against the same trajectory memory-mapped from its
+compiled form, for the deployed trajectories and for longer synthetic ones.
+
+Run from the project root with ``python -m benchmarks.bench_trajectory_load``.
+"""
+
+import json
+import os
+import tempfile
+import timeit
+import tracemalloc
+
+from swervepy.trajectory import compile_trajectory, read_compiled
+
+SOURCE = os.path.join("deploy", "choreo", "goToCage.traj")
+# Multiples of the deployed trajectory's sample count, standing in for longer autonomous routines
+SCALES = (1, 10, 100)
+LOADS = 200
+
+
+def parse_json(path):
+    with open(path) as file:
+        return json.load(file)["trajectory"]["samples"]
+
+
+def load_compiled(path):
+    trajectory = read_compiled(path)
+    # Touch every sample, as following the whole trajectory would
+    return float(trajectory.samples.sum())
+
+
+def peak_memory(load, path):
+    tracemalloc.start()
+    result = load(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return peak
+
+
+def make_trajectory(directory, scale):
+    with open(SOURCE) as file:
+        document = json.load(file)
+    samples = document["trajectory"]["samples"]
+    duration = samples[-1]["t"]
+    document["trajectory"]["samples"] = [
+        dict(sample, t=sample["t"] + repeat * duration) for repeat in range(scale) for sample in samples
+    ]
+
+    source = os.path.join(directory, f"trajectory{scale}.traj")
+    with open(source, "w") as file:
+        json.dump(document, file, indent=1)
+    compiled = os.path.join(directory, f"trajectory{scale}.ctraj")
+    compile_trajectory(source, compiled)
+    return source, compiled
+
+
+def main():
+    print(f"{'samples':>8} {'json':>10} {'compiled':>10} {'json size':>10} {'compiled size':>14} "
+          f"{'json heap':>10} {'compiled heap':>14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in SCALES:
+            source, compiled = make_trajectory(directory, scale)
+            samples = len(read_compiled(compiled))
+
+            json_time = timeit.timeit(lambda: parse_json(source), number=LOADS) / LOADS
+            compiled_time = timeit.timeit(lambda: load_compiled(compiled), number=LOADS) / LOADS
+
+            print(
+                f"{samples:>8} {json_time * 1e3:7.3f} ms {compiled_time * 1e3:7.3f} ms "
+                f"{os.path.getsize(source) / 1024:7.1f} KiB {os.path.getsize(compiled) / 1024:11.1f} KiB "
+                f"{peak_memory(parse_json, source) / 1024:7.1f} KiB "
+                f"{peak_memory(load_compiled, compiled) / 1024:11.1f} KiB"
+            )
+
+
+if __name__ == "__main__":
+    main()
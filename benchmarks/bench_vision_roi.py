@@ -0,0 +1,56 @@
+"""
+Per-frame April Tag detection time with and without region-of-interest tracking, on recorded frames.
+
+Record a sequence of camera frames as images in one directory (they are processed in file name order), then run
+from the project root with ``python -m benchmarks.bench_vision_roi path/to/frames``.
+"""
+
+import pathlib
+import sys
+import time
+
+import cv2
+import numpy as np
+
+from visionprocessing.vision import TagTracker, createDetector, createEstimator, detectTags
+
+
+def loadFrames(directory: pathlib.Path) -> list:
+    frames = []
+    for path in sorted(directory.iterdir()):
+        image = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if image is not None:
+            frames.append(image)
+    return frames
+
+
+def timeDetection(frames: list, tracker: TagTracker | None) -> tuple[float, int]:
+    detector = createDetector()
+    estimator = createEstimator()
+    regionBuffer = np.empty(frames[0].size, dtype=np.uint8)
+    detected = 0
+
+    start = time.perf_counter()
+    for frameId, frame in enumerate(frames, start=1):
+        detected += len(detectTags(detector, estimator, frame, frameId, tracker, regionBuffer))
+    elapsed = time.perf_counter() - start
+
+    return elapsed / len(frames) * 1000, detected
+
+
+def main():
+    frames = loadFrames(pathlib.Path(sys.argv[1]))
+    if not frames:
+        sys.exit("No readable images found")
+
+    fullMs, fullTags = timeDetection(frames, None)
+    trackedMs, trackedTags = timeDetection(frames, TagTracker())
+
+    print(f"{len(frames)} frames")
+    print(f"full frame: {fullMs:7.2f} ms/frame, {fullTags} tags detected")
+    print(f"tracking:   {trackedMs:7.2f} ms/frame, {trackedTags} tags detected")
+    print(f"speedup:    {fullMs / trackedMs:7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,7 @@
 import math
 from swervepy import u
 import swervepy.impl
-from wpimath.geometry import Translation2d
+from wpimath.geometry import Rotation3d, Transform3d, Translation2d, Translation3d
 from wpimath import units
 
 class DriveConstants:
@@ -93,6 +93,48 @@ class CameraConstants:
     kAprilTagSize = 0.1524
     kVerticalFocalLength = 700
     kHorizontalFocalLength = 700
+    # Number of threads running April Tag detection. Use about one per spare coprocessor core
+    kDetectorWorkers = 3
+    # Only search around the tags found in previous frames, scanning the whole frame every few frames
+    kTrackingEnabled = True
+    kTrackingFullScanInterval = 10
+    # Padding searched around each tracked tag, as a fraction of the tag's size, and at least kTrackingMinMargin pixels
+    kTrackingMargin = 0.5
+    kTrackingMinMargin = 16
+    # Have the camera deliver grayscale frames instead of converting every color frame. Only works if the camera
+    # supports a grayscale (Y) pixel format
+    kGrabGrayScale = False
+    # Publish per-frame allocation measurements. Slows the pipeline down, so only enable it while testing
+    kTraceAllocations = False
+    # Place holder. The camera's position on the robot, from the robot's center at floor level
+    kRobotToCamera = Transform3d(Translation3d(0, 0, 0.5), Rotation3d(0, 0, 0))
+    # Single tag poses whose best solution fits less than this much better than the other are thrown out
+    kMaxPoseAmbiguity = 0.2
+    # Standard deviations of a robot pose seen from one tag one meter away [meters, radians]. They grow with the
+    # square of the distance to the tags, and shrink with the number of tags seen
+    kVisionXYStdDev = 0.05
+    kVisionHeadingStdDev = 0.1
+
+class LoopProfilerConstants:
+    # Time each subsystem, trigger and command every loop. Adds a little overhead, so only enable it while tuning
+    kEnabled = False
+    # Robot loops between publishing the timings
+    kPublishPeriodCycles = 50
+
+class LoadShedderConstants:
+    # Run vision and telemetry less often when the robot loop nears its period
+    kEnabled = True
+    # Fractions of the loop period above which load is shed, and below which it is restored
+    kShedFraction = 0.8
+    kRestoreFraction = 0.6
+
+class GcConstants:
+    # Turn the garbage collector off entirely while enabled, rather than only collecting less often
+    kDisableWhileEnabled = False
+    # gc.set_threshold() values while enabled. Python's default is (2000, 10, 10) from 3.13, (700, 10, 10) before
+    kEnabledThresholds = (50000, 50, 100)
+    # Seconds between publishing collection pauses
+    kPublishPeriod = 1.0
 
 class ElevatorConstants:
     # Place Holder numbers
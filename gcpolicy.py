@@ -0,0 +1,138 @@
+"""Controls when Python's garbage collector runs, so collections do not pause the robot loop mid-match"""
+
+import gc
+import time
+import typing
+import weakref
+from array import array
+
+import ntcore
+import wpilib
+from wpiutil.log import DoubleArrayLogEntry
+
+from swervepy.stats import Histogram
+
+# Most collections held between publishes. If more happen, the oldest are dropped
+PENDING_CAPACITY = 256
+
+
+class GcPolicy:
+    """
+    Python frees most objects as soon as they are unused, but the cyclic garbage collector also runs whenever enough
+    objects have been allocated, and each run pauses every thread. The robot loop allocates constantly, so these
+    pauses land at arbitrary points of autonomous and teleop.
+
+    This moves the collections to when the robot is disabled. On the real robot, everything created by robotInit is
+    frozen so collections never scan it again. While enabled, automatic collection is turned off, or made much rarer
+    by raising the thresholds; the robot collects fully whenever it is disabled, and collects the young generations
+    on each change of enabled mode.
+
+    Every collection, automatic or not, is timed. Each generation's [p50, p99, max, count] in milliseconds is
+    published to NetworkTables under ``GC/`` and written to the DataLog.
+    """
+
+    def __init__(
+        self,
+        disableWhileEnabled: bool = False,
+        enabledThresholds: tuple[int, int, int] = (50000, 50, 100),
+    ):
+        """
+        :param disableWhileEnabled: Turn automatic collection off entirely while enabled
+        :param enabledThresholds: gc.set_threshold() values while enabled, if collection stays on
+        """
+        self.disableWhileEnabled = disableWhileEnabled
+        self.enabledThresholds = enabledThresholds
+        self._defaultThresholds = gc.get_threshold()
+
+        # Milliseconds each collection paused for, by generation. Filled in by publish()
+        self.pauses = [Histogram() for _ in gc.get_count()]
+        self.pausesWhileEnabled = 0
+        self._isEnabled = False
+        self._start = 0.0
+        # Pauses not yet added to the histograms. A collection can start inside any allocation, including one made
+        # while publish() holds a histogram's lock, so the gc callback only writes here and never takes a lock
+        self._pendingPauses = array("d", bytes(8 * PENDING_CAPACITY))
+        self._pendingGenerations = array("B", bytes(PENDING_CAPACITY))
+        self._pendingWritten = 0
+        self._pendingRead = 0
+
+        table = ntcore.NetworkTableInstance.getDefault().getTable("GC")
+        self._publishers = [table.getDoubleArrayTopic(f"Gen {i}").publish() for i in range(len(self.pauses))]
+        self._enabledPausesPublisher = table.getIntegerTopic("Pauses While Enabled").publish()
+        self._logEntries = [
+            DoubleArrayLogEntry(wpilib.DataLogManager.getLog(), f"GC/Gen {i}", "[p50, p99, max, count] ms")
+            for i in range(len(self.pauses))
+        ]
+
+        # The callback holds the policy weakly and is removed with it, so robots built one after another (as in
+        # tests) do not pile up callbacks
+        onCollection = weakref.WeakMethod(self._onCollection)
+
+        def callback(phase: str, info: dict[str, typing.Any]) -> None:
+            method = onCollection()
+            if method is not None:
+                method(phase, info)
+
+        gc.callbacks.append(callback)
+        weakref.finalize(self, gc.callbacks.remove, callback)
+
+    def robotInitFinished(self) -> None:
+        """
+        Collect, then on the real robot freeze every surviving object so later collections skip them. Frozen objects
+        are never freed, so in simulation, where tests build and tear down several robots, nothing is frozen. Call
+        once, at the end of robotInit
+        """
+        gc.collect()
+        if wpilib.RobotBase.isReal():
+            gc.freeze()
+
+    def enterEnabled(self) -> None:
+        """
+        Collect the young generations, then stop or reduce automatic collection. Call from each enabled mode's init
+        """
+        gc.collect(1)
+        self._isEnabled = True
+        if self.disableWhileEnabled:
+            gc.disable()
+        else:
+            gc.set_threshold(*self.enabledThresholds)
+
+    def enterDisabled(self) -> None:
+        """
+        Restore automatic collection and collect everything left over from the enabled mode. Nothing is frozen here:
+        a frozen object in a reference cycle is never collected, even after it is no longer used, so freezing on
+        every disable would leak whatever each mode left behind. Call from disabledInit
+        """
+        self._isEnabled = False
+        gc.set_threshold(*self._defaultThresholds)
+        gc.enable()
+        gc.collect()
+
+    def publish(self) -> None:
+        """Publish and log each generation's pauses since the last publish, then start them over"""
+        written = self._pendingWritten
+        for index in range(max(self._pendingRead, written - PENDING_CAPACITY), written):
+            index %= PENDING_CAPACITY
+            self.pauses[self._pendingGenerations[index]].record(self._pendingPauses[index])
+        self._pendingRead = written
+
+        for histogram, publisher, logEntry in zip(self.pauses, self._publishers, self._logEntries):
+            if histogram.count == 0:
+                continue
+            summary = [histogram.percentile(0.5), histogram.percentile(0.99), histogram.max, histogram.count]
+            histogram.reset()
+            publisher.set(summary)
+            logEntry.append(summary)
+        self._enabledPausesPublisher.set(self.pausesWhileEnabled)
+
+    def _onCollection(self, phase: str, info: dict[str, typing.Any]) -> None:
+        # Collections hold the GIL from start to stop, so they never overlap and this is the only writer
+        if phase == "start":
+            self._start = time.perf_counter()
+            return
+        index = self._pendingWritten % PENDING_CAPACITY
+        self._pendingPauses[index] = (time.perf_counter() - self._start) * 1000
+        self._pendingGenerations[index] = info["generation"]
+        self._pendingWritten += 1
+        if self._isEnabled:
+            self.pausesWhileEnabled += 1
@@ -0,0 +1,178 @@
+"""Skips less important periodic work when the robot loop is close to overrunning its period"""
+
+import enum
+import time
+import typing
+
+import ntcore
+import wpilib
+
+from swervepy.stats import Histogram
+
+
+class Tier(enum.IntEnum):
+    """How important a piece of periodic work is"""
+
+    # Always runs, e.g. odometry and drive output
+    CRITICAL = 0
+    # Runs less often under load, e.g. vision
+    NORMAL = 1
+    # The first to be skipped under load, e.g. telemetry and visualization
+    BEST_EFFORT = 2
+
+
+# For each shedding level, the number of cycles between runs of each tier. 0 means the tier does not run at all
+SHED_LEVELS = (
+    (1, 1, 1),
+    (1, 1, 5),
+    (1, 2, 0),
+    (1, 5, 0),
+)
+
+
+class LoadShedder:
+    """
+    Runs periodic work by tier, and measures how long each robot loop's work takes. When that comes close to the loop
+    period for several loops in a row, or overruns it once, the shedding level goes up and the lower tiers run less
+    often or not at all (see ``SHED_LEVELS``). Once the work has taken well under the period for ``restoreCycles``
+    loops in a row, the level comes back down one step at a time. The gap between the two thresholds keeps the level
+    from flapping.
+
+    The level, the work time [p50, p99, max] in milliseconds, and how many runs of each tier were skipped are
+    published to NetworkTables under ``LoadShedder/``. Level changes are written to the DataLog.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = True,
+        period: float = 0.02,
+        shedFraction: float = 0.8,
+        restoreFraction: float = 0.6,
+        shedCycles: int = 3,
+        restoreCycles: int = 50,
+        publishPeriodCycles: int = 50,
+    ):
+        """
+        :param enabled: Whether to shed at all. When disabled every tier runs every loop
+        :param period: The robot loop period in seconds
+        :param shedFraction: Fraction of the period above which a loop counts towards shedding more
+        :param restoreFraction: Fraction of the period below which a loop counts towards restoring
+        :param shedCycles: Loops in a row above the shed threshold before shedding more
+        :param restoreCycles: Loops in a row below the restore threshold before restoring one level
+        :param publishPeriodCycles: Loops between publishing results
+        """
+        self.enabled = enabled
+        self.period = period
+        self.shedThreshold = period * shedFraction
+        self.restoreThreshold = period * restoreFraction
+        self.shedCycles = shedCycles
+        self.restoreCycles = restoreCycles
+        self.publishPeriodCycles = publishPeriodCycles
+
+        self.level = 0
+        # Runs of each tier skipped since startup
+        self.skipped = [0] * len(Tier)
+        # Milliseconds each loop's work took
+        self.workTime = Histogram()
+        self._cycle = 0
+        self._overCycles = 0
+        self._underCycles = 0
+        self._tasks: list[tuple[Tier, typing.Callable[[], None]]] = []
+
+        table = ntcore.NetworkTableInstance.getDefault().getTable("LoadShedder")
+        self._levelPublisher = table.getIntegerTopic("Level").publish()
+        self._workTimePublisher = table.getDoubleArrayTopic("Work Time (ms)").publish()
+        self._skippedPublishers = [table.getIntegerTopic(f"Skipped/{tier.name}").publish() for tier in Tier]
+
+    def run(self) -> None:
+        """
+        Run the loop's tasks whose tier is not shed, in the order they were added, and measure how long they took
+        together. Call once per robot loop from robotPeriodic, with the CommandScheduler's run added as the first
+        critical task so the measurement covers the whole loop
+        """
+        start = time.perf_counter()
+        for tier, task in self._tasks:
+            if self.shouldRun(tier):
+                task()
+            else:
+                self.skipped[tier] += 1
+        self.recordCycle(time.perf_counter() - start)
+
+    def addTask(self, tier: Tier, task: typing.Callable[[], None]) -> None:
+        """Run a task from :meth:`run` every loop its tier is not shed"""
+        self._tasks.append((tier, task))
+
+    def wrap(self, tier: Tier, function: typing.Callable) -> typing.Callable:
+        """
+        Only call a function in loops its tier is not shed. In other loops the result of the last call is returned,
+        so it suits trigger conditions and callbacks polled by subsystems:
+        ``Trigger(loadShedder.wrap(Tier.NORMAL, unpacker.hasTags))``
+
+        :returns: The shed function, or the function itself if it is critical
+        """
+        if tier == Tier.CRITICAL:
+            return function
+
+        last = None
+
+        def shed(*args, **kwargs):
+            nonlocal last
+            if self.shouldRun(tier):
+                last = function(*args, **kwargs)
+            else:
+                self.skipped[tier] += 1
+            return last
+
+        return shed
+
+    def shouldRun(self, tier: Tier) -> bool:
+        """:returns: Whether work of a tier runs in the current loop"""
+        interval = SHED_LEVELS[self.level][tier]
+        return interval != 0 and self._cycle % interval == 0
+
+    def recordCycle(self, workSeconds: float) -> None:
+        """
+        Count the end of a loop, and shed or restore a level if needed
+
+        :param workSeconds: How long the loop's work took
+        """
+        self._cycle += 1
+        self.workTime.record(workSeconds * 1000)
+
+        if workSeconds > self.shedThreshold:
+            self._overCycles += 1
+            self._underCycles = 0
+        elif workSeconds < self.restoreThreshold:
+            self._underCycles += 1
+            self._overCycles = 0
+        else:
+            self._overCycles = self._underCycles = 0
+
+        if self.enabled:
+            overloaded = workSeconds > self.period or self._overCycles >= self.shedCycles
+            if overloaded and self.level < len(SHED_LEVELS) - 1:
+                self._setLevel(self.level + 1, workSeconds)
+            elif self._underCycles >= self.restoreCycles and self.level > 0:
+                self._setLevel(self.level - 1, workSeconds)
+
+        if self._cycle % self.publishPeriodCycles == 0:
+            self.publish()
+
+    def _setLevel(self, level: int, workSeconds: float) -> None:
+        self.level = level
+        self._overCycles = self._underCycles = 0
+        wpilib.DataLogManager.log(
+            f"LoadShedder: level {level} after a {workSeconds * 1000:.1f} ms loop; loops between runs: "
+            + ", ".join(f"{tier.name} {SHED_LEVELS[level][tier] or 'never'}" for tier in Tier)
+        )
+
+    def publish(self) -> None:
+        """Publish the shedding level, work time since the last publish and skipped runs"""
+        self._levelPublisher.set(self.level)
+        if self.workTime.count:
+            self._workTimePublisher.set(
+                [self.workTime.percentile(0.5), self.workTime.percentile(0.99), self.workTime.max]
+            )
+            self.workTime.reset()
+        for publisher, skipped in zip(self._skippedPublishers, self.skipped):
+            publisher.set(skipped)
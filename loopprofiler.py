@@ -0,0 +1,121 @@
+"""Measures how long each part of the robot loop takes, to find what overruns the 20 ms period"""
+
+import time
+import typing
+
+import commands2
+import ntcore
+import wpilib
+from wpiutil.log import DoubleArrayLogEntry
+
+from swervepy.stats import Histogram
+
+
+class LoopProfiler:
+    """
+    Times the CommandScheduler, each subsystem's periodic methods, trigger conditions and each command's execute, by
+    wrapping them in timed functions. Durations go into a histogram per item, and every ``publishPeriodCycles``
+    loops each item's [p50, p99, max] in milliseconds is published to NetworkTables under ``LoopProfiler/`` and
+    written to the DataLog, then the histograms start over.
+
+    When disabled nothing is wrapped, so the robot runs exactly the code it would without a profiler.
+    """
+
+    def __init__(self, enabled: bool, publishPeriodCycles: int = 50):
+        """
+        :param enabled: Whether to profile at all
+        :param publishPeriodCycles: Scheduler runs between publishing results
+        """
+        self.enabled = enabled
+        self.publishPeriodCycles = publishPeriodCycles
+        self._histograms: dict[str, Histogram] = {}
+        self._publishers: dict[str, ntcore.DoubleArrayPublisher] = {}
+        self._logEntries: dict[str, DoubleArrayLogEntry] = {}
+        self._cycles = 0
+        self._table = ntcore.NetworkTableInstance.getDefault().getTable("LoopProfiler")
+
+    def install(
+        self, scheduler: commands2.CommandScheduler, subsystems: typing.Iterable[commands2.Subsystem]
+    ) -> None:
+        """
+        Start timing the given subsystems and every command the scheduler starts from now on. The scheduler itself is
+        timed through :meth:`wrapScheduler`, and trigger conditions through :meth:`wrap`
+
+        :param scheduler: The robot's CommandScheduler
+        :param subsystems: Every subsystem on the robot
+        """
+        if not self.enabled:
+            return
+
+        for subsystem in subsystems:
+            name = subsystem.getName()
+            subsystem.periodic = self.wrap(f"{name}.periodic", subsystem.periodic)
+            subsystem.simulationPeriodic = self.wrap(f"{name}.simulationPeriodic", subsystem.simulationPeriodic)
+        scheduler.onCommandInitialize(self._wrapCommand)
+
+    def wrap(self, name: str, function: typing.Callable) -> typing.Callable:
+        """
+        Time every call to a function. Use it for trigger conditions, which are polled in the button loop:
+        ``Trigger(profiler.wrap("tagsDetected", unpacker.hasTags))``
+
+        :returns: The timed function, or the function itself if profiling is disabled
+        """
+        if not self.enabled:
+            return function
+
+        histogram = self._histograms.setdefault(name, Histogram())
+        perfCounter = time.perf_counter
+
+        def timed(*args, **kwargs):
+            start = perfCounter()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                histogram.record((perfCounter() - start) * 1000)
+
+        return timed
+
+    def wrapScheduler(self, run: typing.Callable[[], None]) -> typing.Callable[[], None]:
+        """
+        Time every run of the scheduler, and publish every ``publishPeriodCycles`` runs. Whatever runs the scheduler
+        each loop must call the returned function instead
+
+        :param run: The CommandScheduler's run method
+        :returns: The timed run, or run itself if profiling is disabled
+        """
+        if not self.enabled:
+            return run
+
+        timedRun = self.wrap("CommandScheduler.run", run)
+
+        def runAndPublish():
+            timedRun()
+            self._cycles += 1
+            if self._cycles % self.publishPeriodCycles == 0:
+                self.publish()
+
+        return runAndPublish
+
+    def _wrapCommand(self, command: commands2.Command) -> None:
+        # Commands are reused, so only wrap each one the first time it starts
+        if getattr(command, "_profiled", False):
+            return
+        command._profiled = True
+        command.execute = self.wrap(f"{command.getName()}.execute", command.execute)
+
+    def publish(self) -> None:
+        """Publish and log every item's timings since the last publish, then start them over"""
+        for name, histogram in self._histograms.items():
+            if histogram.count == 0:
+                continue
+            summary = [histogram.percentile(0.5), histogram.percentile(0.99), histogram.max]
+            histogram.reset()
+
+            publisher = self._publishers.get(name)
+            if publisher is None:
+                publisher = self._publishers[name] = self._table.getDoubleArrayTopic(name).publish()
+                self._logEntries[name] = DoubleArrayLogEntry(
+                    wpilib.DataLogManager.getLog(), f"LoopProfiler/{name}", "[p50, p99, max] ms"
+                )
+            publisher.set(summary)
+            self._logEntries[name].append(summary)
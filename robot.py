@@ -4,6 +4,10 @@ import wpilib
 import commands2
 import commands2.cmd
 
+import constants
+import gcpolicy
+import loadshedder
+import loopprofiler
 import robotcontainer
 
 """
@@ -16,10 +20,12 @@ project.
 # NOTE: There should only be scheduler calls in this file!!!! No logic/commands should be defined in here!
 
 
-class MyRobot(commands2.TimedCommandRobot):
+class MyRobot(wpilib.TimedRobot):
     """
     Command v2 robots are encouraged to inherit from TimedCommandRobot, which
-    has an implementation of robotPeriodic which runs the scheduler for you
+    runs the scheduler for you. This robot runs it from robotPeriodic instead,
+    through the load shedder, so each loop's work is measured as a whole and
+    less important work can be skipped when the loop runs long
     """
 
     def robotInit(self) -> None:
@@ -29,18 +35,51 @@ class MyRobot(commands2.TimedCommandRobot):
         """
         self.autonomousCommand: typing.Optional[commands2.Command] = None
 
+        # Moves garbage collection pauses out of autonomous and teleop
+        self.gcPolicy = gcpolicy.GcPolicy(
+            constants.GcConstants.kDisableWhileEnabled, constants.GcConstants.kEnabledThresholds
+        )
+        self.addPeriodic(self.gcPolicy.publish, constants.GcConstants.kPublishPeriod)
+
+        # Times each part of the robot loop when enabled in constants
+        self.profiler = loopprofiler.LoopProfiler(
+            constants.LoopProfilerConstants.kEnabled, constants.LoopProfilerConstants.kPublishPeriodCycles
+        )
+
+        # Skips vision and telemetry work when the loop nears its period
+        self.loadShedder = loadshedder.LoadShedder(
+            constants.LoadShedderConstants.kEnabled,
+            self.getPeriod(),
+            constants.LoadShedderConstants.kShedFraction,
+            constants.LoadShedderConstants.kRestoreFraction,
+        )
+        scheduler = commands2.CommandScheduler.getInstance()
+        # Added first, so tasks added by the container run after the scheduler each loop
+        self.loadShedder.addTask(loadshedder.Tier.CRITICAL, self.profiler.wrapScheduler(scheduler.run))
+
         # Instantiate our RobotContainer.  This will perform all our button bindings, and put our
         # autonomous chooser on the dashboard.
-        self.container = robotcontainer.RobotContainer()
+        self.container = robotcontainer.RobotContainer(self.profiler, self.loadShedder)
+        self.profiler.install(scheduler, self.container.subsystems())
+
+        # Everything created so far lives for the whole run, so stop the collector from scanning it
+        self.gcPolicy.robotInitFinished()
+
+    def robotPeriodic(self) -> None:
+        """Runs the scheduler and the load shedder's tasks. Called every loop in every mode"""
+        self.loadShedder.run()
 
     def disabledInit(self) -> None:
         """This function is called once each time the robot enters Disabled mode."""
+        self.gcPolicy.enterDisabled()
 
     def disabledPeriodic(self) -> None:
         """This function is called periodically when disabled"""
+        self.container.prepareAutonomous()
 
     def autonomousInit(self) -> None:
         """This autonomous runs the autonomous command selected by your RobotContainer class."""
+        self.gcPolicy.enterEnabled()
         self.autonomousCommand = self.container.getAutonomousCommand()
 
         # schedule the autonomous command (example)
@@ -53,6 +92,8 @@ class MyRobot(commands2.TimedCommandRobot):
         """This function is called periodically during autonomous"""
 
     def teleopInit(self) -> None:
+        self.gcPolicy.enterEnabled()
+
         # This makes sure that the autonomous stops running when
         # teleop starts running. If you want the autonomous to
         # continue until interrupted by another command, remove
@@ -64,5 +105,7 @@ class MyRobot(commands2.TimedCommandRobot):
         """This function is called periodically during operator control"""
 
     def testInit(self) -> None:
+        self.gcPolicy.enterEnabled()
+
         # Cancels all running commands at the start of test mode
         commands2.CommandScheduler.getInstance().cancelAll()
\ No newline at end of file
@@ -5,12 +5,17 @@ import commands2.button
 import constants
 import ntcore
 
+import loadshedder
+from loadshedder import Tier
+import loopprofiler
 import subsystems.drivesubsystem
+import swervepy
+import trajectorycache
 
 import visionprocessing.apriltagpackager as ATPackage
 from wpimath import geometry
 import wpilib
-from pathplannerlib.path import PathPlannerPath
+from swervepy.trajectory import CompiledTrajectory
 
 
 
@@ -31,9 +36,30 @@ class RobotContainer:
 
     """
 
-    def __init__(self):
+    def __init__(
+        self,
+        profiler: loopprofiler.LoopProfiler | None = None,
+        loadShedder: loadshedder.LoadShedder | None = None,
+    ):
+        """
+        :param profiler: Times trigger conditions, if given
+        :param loadShedder: Runs vision and telemetry less often under load, if given
+        """
+        self.profiler = profiler if profiler is not None else loopprofiler.LoopProfiler(False)
+        self.loadShedder = loadShedder if loadShedder is not None else loadshedder.LoadShedder(False)
+
+        # Receives tags and the robot's field pose from the vision coprocessor
+        self.aprilTagUnpacker = ATPackage.AprilTagUnpacker()
+
         # The robot's subsystems need to be declared here:
-        self.robotDrive = subsystems.drivesubsystem.DriveSubsystem()
+        # Vision is fused into odometry less often under load. Repeated measurements are ignored by the drive
+        self.driveTelemetry = swervepy.TelemetryPublisher("Swerve")
+        self.robotDrive = subsystems.drivesubsystem.DriveSubsystem(
+            self.loadShedder.wrap(Tier.NORMAL, self.getVisionMeasurement), self.driveTelemetry
+        )
+        # The drive does not publish a publisher it was given, so the load shedder runs it from robotPeriodic
+        self.loadShedder.addTask(Tier.BEST_EFFORT, self.driveTelemetry.periodic)
+        self.loadShedder.addTask(Tier.BEST_EFFORT, self.updateField)
         wpilib.CameraServer.launch("vision.py:main")
 
 
@@ -44,6 +70,10 @@ class RobotContainer:
         self.autoChooser = wpilib.SendableChooser()
         self.autoChooser.addOption("Go to Cage Chor Cmd", 1)
 
+        # Parse every trajectory in the background now, so autonomousInit does no file I/O
+        self.trajectoryCache = trajectorycache.TrajectoryCache(self.buildTrajectoryCommand)
+        self.trajectoryCache.preload()
+
 
         # The driver's controllers
         self.XBoxController = commands2.button.CommandXboxController(
@@ -94,11 +124,16 @@ class RobotContainer:
         """
 
         # Example Trigger
-        aprilTagUnpacker = ATPackage.AprilTagUnpacker()
         self.tagsDetected = commands2.button.Trigger(
-            lambda: len(aprilTagUnpacker.getTags()) > 0
+            self.loadShedder.wrap(Tier.NORMAL, self.profiler.wrap("tagsDetected", self.aprilTagUnpacker.hasTags))
         )
 
+    def subsystems(self) -> list[commands2.Subsystem]:
+        """
+        :returns: every subsystem on the robot
+        """
+        return [self.robotDrive]
+
 
     def getAutonomousCommand(self) -> commands2.Command:
         """
@@ -106,14 +141,47 @@ class RobotContainer:
 
         :returns: the command to run in autonomous
         """
+        isRed = wpilib.DriverStation.getAlliance() == wpilib.DriverStation.Alliance.kRed
+        return self.trajectoryCache.getCommand("goToCage", isRed)
+
+    def prepareAutonomous(self) -> None:
+        """
+        Build the autonomous commands once their trajectories have loaded. Called periodically while disabled
+        """
+        self.trajectoryCache.buildCommands()
+
+    def buildTrajectoryCommand(self, trajectory: CompiledTrajectory) -> commands2.Command:
+        """
+        Builds the command that follows an autonomous trajectory. The trajectory is already flipped for the robot's
+        alliance
+
+        :returns: the command following the trajectory
+        """
         return self.robotDrive.follow_trajectory_command(
-            PathPlannerPath.fromChoreoTrajectory("goToCage"), 
+            trajectory,
             self.robotDrive.TrajectoryFollowerParameters,
             self.robotDrive.RobotConfigControls.config,
             True,
-            True 
+            True
             )
     
+    def updateField(self) -> None:
+        """
+        Shows the robot's pose on the dashboard's field
+        """
+        self.robotDrive.field.setRobotPose(self.robotDrive.pose)
+
+    def getVisionMeasurement(self) -> swervepy.VisionMeasurement | None:
+        """
+        Gets the robot's pose solved by the vision coprocessor, to be fused into odometry
+
+        :returns: The measurement, or None if no pose has been solved
+        """
+        estimate = self.aprilTagUnpacker.getRobotPose()
+        if estimate is None:
+            return None
+        return swervepy.VisionMeasurement(estimate.pose, estimate.timestamp, estimate.stdDevs)
+
     def setDeadZonesTranslation(self):
         if abs(-self.leftJoystick.getX()) > constants.OIConstants.kDeadZone:
             return (-self.leftJoystick.getX())**3
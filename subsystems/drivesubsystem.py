@@ -1,3 +1,5 @@
+import swervepy
+import swervepy.signals
 import swervepy.subsystem
 import swervepy.impl
 from constants import DriveConstants as dc
@@ -10,32 +12,39 @@ from wpimath.kinematics import SwerveModuleState
 
 class DriveSubsystem(swervepy.subsystem.SwerveDrive):
 
-    def __init__(self):
+    def __init__(self, visionPoseCallback = lambda: None, telemetry: swervepy.TelemetryPublisher | None = None):
         """"
         Creates a swerve drive subsystem
+
+        :param visionPoseCallback: Returns the latest swervepy.VisionMeasurement of the robot's pose, or None
+        :param telemetry: Publisher for the drivetrain's telemetry, if the caller publishes it
         """
-        # Drive Components
-        m_frontLeft = swervepy.impl.NEOCoaxialDriveComponent(dc.fL_MotorPort, dc.drive_params)
-        m_backLeft = swervepy.impl.NEOCoaxialDriveComponent(dc.bL_MotorPort, dc.drive_params)
-        m_frontRight = swervepy.impl.NEOCoaxialDriveComponent(dc.fR_MotorPort, dc.drive_params)
-        m_backRight = swervepy.impl.NEOCoaxialDriveComponent(dc.bR_MotorPort, dc.drive_params)
+        # Motor controllers keep their configuration in flash, and are only reconfigured when it changes
+        configCache = swervepy.ConfigCache.on_robot()
+        # Every device is configured concurrently; leaving the block waits for them and reports the time each took
+        with swervepy.DeviceInitializer() as initializer:
+            # Drive Components
+            m_frontLeft = swervepy.impl.NEOCoaxialDriveComponent(dc.fL_MotorPort, dc.drive_params, initializer=initializer, config_cache=configCache)
+            m_backLeft = swervepy.impl.NEOCoaxialDriveComponent(dc.bL_MotorPort, dc.drive_params, initializer=initializer, config_cache=configCache)
+            m_frontRight = swervepy.impl.NEOCoaxialDriveComponent(dc.fR_MotorPort, dc.drive_params, initializer=initializer, config_cache=configCache)
+            m_backRight = swervepy.impl.NEOCoaxialDriveComponent(dc.bR_MotorPort, dc.drive_params, initializer=initializer, config_cache=configCache)
 
-        # Encoders
-        enc_frontLeft = swervepy.impl.AbsoluteCANCoder(dc.fL_EncoderPort)
-        enc_backLeft = swervepy.impl.AbsoluteCANCoder(dc.bL_EncoderPort)
-        enc_frontRight = swervepy.impl.AbsoluteCANCoder(dc.fR_EncoderPort)
-        enc_backRight = swervepy.impl.AbsoluteCANCoder(dc.bR_EncoderPort)
+            # Encoders
+            enc_frontLeft = swervepy.impl.AbsoluteCANCoder(dc.fL_EncoderPort, initializer=initializer)
+            enc_backLeft = swervepy.impl.AbsoluteCANCoder(dc.bL_EncoderPort, initializer=initializer)
+            enc_frontRight = swervepy.impl.AbsoluteCANCoder(dc.fR_EncoderPort, initializer=initializer)
+            enc_backRight = swervepy.impl.AbsoluteCANCoder(dc.bR_EncoderPort, initializer=initializer)
 
-        # Azimuth module offset. This is the value reported by the absolute encoder when the wheel is pointed straight.
-        offset_fL = Rotation2d.fromDegrees(-44.473)
-        offset_bL = Rotation2d.fromDegrees(31.533)
-        offset_fR = Rotation2d.fromDegrees(0)
-        offset_bR = Rotation2d.fromDegrees(0)
-        # Azimuth Components
-        a_frontLeft = swervepy.impl.NEOCoaxialAzimuthComponent(dc.fL_AzimuthPort, offset_fL, dc.azimuth_params, enc_frontLeft)
-        a_backLeft = swervepy.impl.NEOCoaxialAzimuthComponent(dc.bL_AzimuthPort, offset_bL, dc.azimuth_params, enc_backLeft)
-        a_frontRight = swervepy.impl.NEOCoaxialAzimuthComponent(dc.fR_AzimuthPort, offset_fR, dc.azimuth_params, enc_frontRight)
-        a_backRight = swervepy.impl.NEOCoaxialAzimuthComponent(dc.bR_AzimuthPort, offset_bR, dc.azimuth_params, enc_backRight)
+            # Azimuth module offset. This is the value reported by the absolute encoder when the wheel is pointed straight.
+            offset_fL = Rotation2d.fromDegrees(-44.473)
+            offset_bL = Rotation2d.fromDegrees(31.533)
+            offset_fR = Rotation2d.fromDegrees(0)
+            offset_bR = Rotation2d.fromDegrees(0)
+            # Azimuth Components
+            a_frontLeft = swervepy.impl.NEOCoaxialAzimuthComponent(dc.fL_AzimuthPort, offset_fL, dc.azimuth_params, enc_frontLeft, initializer=initializer, config_cache=configCache)
+            a_backLeft = swervepy.impl.NEOCoaxialAzimuthComponent(dc.bL_AzimuthPort, offset_bL, dc.azimuth_params, enc_backLeft, initializer=initializer, config_cache=configCache)
+            a_frontRight = swervepy.impl.NEOCoaxialAzimuthComponent(dc.fR_AzimuthPort, offset_fR, dc.azimuth_params, enc_frontRight, initializer=initializer, config_cache=configCache)
+            a_backRight = swervepy.impl.NEOCoaxialAzimuthComponent(dc.bR_AzimuthPort, offset_bR, dc.azimuth_params, enc_backRight, initializer=initializer, config_cache=configCache)
 
         # Swerve Modules
         frontLeft = swervepy.impl.CoaxialSwerveModule(
@@ -55,8 +64,11 @@ class DriveSubsystem(swervepy.subsystem.SwerveDrive):
             [frontLeft, backLeft, frontRight, backRight],
             gyro,
             dc.maxVelocity,
-            dc.maxAngularVelocity
+            dc.maxAngularVelocity,
+            visionPoseCallback,
+            telemetry=telemetry
         )
+        swervepy.signals.bus_load.report()
     
     class TrajectoryFollowerParameters:
         max_drive_velocity = dc.maxVelocity
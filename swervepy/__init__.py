@@ -3,7 +3,16 @@ A modular swerve drive library extendable to any swerve configuration.
 Comes with support for coaxial SDS- and MAXSwerve-style drivetrains out of the box.
 """
 
-__all__ = ["u", "SwerveDrive", "TrajectoryFollowerParameters"]
+__all__ = [
+    "u",
+    "SwerveDrive",
+    "TrajectoryFollowerParameters",
+    "VisionMeasurement",
+    "DeviceInitializer",
+    "ConfigCache",
+    "PoseHistory",
+    "TelemetryPublisher",
+]
 
 # fmt: off
 
@@ -11,4 +20,8 @@ __all__ = ["u", "SwerveDrive", "TrajectoryFollowerParameters"]
 from pint import UnitRegistry
 u = UnitRegistry()
 
-from .subsystem import SwerveDrive, TrajectoryFollowerParameters
+from .configcache import ConfigCache
+from .initializer import DeviceInitializer
+from .posehistory import PoseHistory
+from .telemetry import TelemetryPublisher
+from .subsystem import SwerveDrive, TrajectoryFollowerParameters, VisionMeasurement
@@ -10,6 +10,7 @@ __all__ = [
     "Gyro",
     "AbsoluteEncoder",
     "SwerveModule",
+    "ModuleSnapshot",
 ]
 
 from abc import ABCMeta
@@ -22,4 +23,4 @@ class SendableABCMeta(ABCMeta, type(Sendable)):
 
 from .motor import CoaxialDriveComponent, CoaxialAzimuthComponent
 from .sensor import Gyro, AbsoluteEncoder
-from .system import SwerveModule
+from .system import SwerveModule, ModuleSnapshot
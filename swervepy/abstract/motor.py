@@ -17,11 +17,12 @@ class CoaxialDriveComponent(Protocol):
         raise NotImplementedError
 
     @abstractmethod
-    def follow_velocity_closed(self, velocity: float):
+    def follow_velocity_closed(self, velocity: float, acceleration: float = 0.0):
         """
         Follow a velocity using closed loop control (i.e., PID)
 
         :param velocity: Desired velocity in m/s
+        :param acceleration: Desired acceleration in m/s^2, applied through the kA feedforward
         """
         raise NotImplementedError
 
@@ -46,6 +47,10 @@ class CoaxialDriveComponent(Protocol):
         :param delta_time: Time in seconds since this method was last called
         """
 
+    def is_ready(self) -> bool:
+        """Whether the motor has finished configuring"""
+        return True
+
     @property
     @abstractmethod
     def velocity(self) -> float:
@@ -92,6 +97,10 @@ class CoaxialAzimuthComponent(Protocol):
         :param delta_time: Time in seconds since this method was last called
         """
 
+    def is_ready(self) -> bool:
+        """Whether the motor has finished configuring and been reset to its absolute position"""
+        return True
+
     @property
     @abstractmethod
     def rotational_velocity(self) -> float:
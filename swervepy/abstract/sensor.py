@@ -1,4 +1,6 @@
 from abc import abstractmethod
+from concurrent.futures import Future
+from typing import Optional
 
 from wpimath.geometry import Rotation2d
 from wpiutil import Sendable, SendableBuilder
@@ -25,6 +27,10 @@ class Gyro(Sendable, metaclass=SendableABCMeta):
         """CCW+ chassis yaw angle"""
         raise NotImplementedError
 
+    def is_ready(self) -> bool:
+        """Whether the gyro is connected and reporting a usable heading"""
+        return True
+
     def initSendable(self, builder: SendableBuilder):
         builder.setSmartDashboardType("Gyro")
         builder.addDoubleProperty("Value", lambda: self.heading.degrees(), lambda _: None)
@@ -32,6 +38,13 @@ class Gyro(Sendable, metaclass=SendableABCMeta):
 
 
 class AbsoluteEncoder(Sendable, metaclass=SendableABCMeta):
+    # Completes once the encoder is configured, if it was configured by a DeviceInitializer
+    initialized: Optional[Future] = None
+
+    def is_ready(self) -> bool:
+        """Whether the encoder is configured and reporting a usable position"""
+        return self.initialized is None or self.initialized.done()
+
     @property
     @abstractmethod
     def absolute_position(self) -> Rotation2d:
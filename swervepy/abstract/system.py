@@ -1,5 +1,8 @@
+import math
 from abc import abstractmethod
+from typing import Any, NamedTuple, Optional, Sequence
 
+import numpy as np
 from wpimath.geometry import Translation2d, Rotation2d
 from wpimath.kinematics import SwerveModuleState, SwerveModulePosition
 from wpiutil import Sendable
@@ -7,10 +10,40 @@ from wpiutil import Sendable
 from . import SendableABCMeta
 
 
+class ModuleSnapshot(NamedTuple):
+    """Every sensor reading of a swerve module in one scheduler cycle"""
+
+    drive_velocity: float
+    drive_distance: float
+    drive_voltage: float
+    azimuth_angle: Rotation2d
+    azimuth_velocity: float
+
+
 class SwerveModule(Sendable, metaclass=SendableABCMeta):
     placement: Translation2d
 
-    def desire_state(self, state: SwerveModuleState, drive_open_loop: bool, rotate_in_place: bool):
+    # The most recent velocity and angle the module was commanded to follow
+    last_commanded_drive_velocity: float = 0
+    last_commanded_azimuth_angle = Rotation2d.fromDegrees(0)
+
+    # Sensor calls made to the hardware, and sensor readings served from a reading already taken this cycle
+    hal_reads: int = 0
+    cached_reads: int = 0
+
+    def __init__(self):
+        super().__init__()
+        # The readings taken this cycle, by ModuleSnapshot field. Each field is read from the hardware the first time
+        # it is asked for, so a consumer that needs two fields does not pay for all five
+        self._readings: dict[str, Any] = {}
+
+    def desire_state(
+        self,
+        state: SwerveModuleState,
+        drive_open_loop: bool,
+        rotate_in_place: bool,
+        acceleration: Optional[Sequence[float]] = None,
+    ):
         """
         Command the module to follow a speed and angle
 
@@ -18,13 +51,23 @@ class SwerveModule(Sendable, metaclass=SendableABCMeta):
         :param drive_open_loop: Use open loop (True) or closed loop (False) velocity control to drive the wheel
         :param rotate_in_place: Whether the modules will rotate while not driving. Set False to prevent wheels from
         wearing down by spinning in place
+        :param acceleration: Robot-relative (x, y) acceleration of the module in m/s^2. The part along the wheel is
+               applied as drive feedforward
         """
-        state = optimize(state, self.azimuth_angle)
+        current_angle = self.azimuth_angle
+        state = optimize(state, current_angle)
 
         # Prevent rotating the module if drive speed is less than 2 cm/s to prevent feedback-loop jitter
-        angle = state.angle if rotate_in_place or abs(state.speed) > 0.02 else self.azimuth_angle
-
-        self.desire_drive_velocity(state.speed, drive_open_loop)
+        angle = state.angle if rotate_in_place or abs(state.speed) > 0.02 else current_angle
+
+        wheel_acceleration = 0.0
+        if acceleration is not None:
+            wheel_acceleration = cosine_scale(
+                acceleration[0] * angle.cos() + acceleration[1] * angle.sin(), angle, current_angle
+            )
+        self.desire_drive_velocity(
+            cosine_scale(state.speed, angle, current_angle), drive_open_loop, wheel_acceleration
+        )
         self.desire_azimuth_angle(angle)
 
     @property
@@ -37,13 +80,63 @@ class SwerveModule(Sendable, metaclass=SendableABCMeta):
         """The swerve module's current velocity (in metres/sec) and facing angle"""
         return SwerveModuleState(self.drive_velocity, self.azimuth_angle)
 
+    @property
+    def desired_state(self) -> SwerveModuleState:
+        """The velocity (in metres/sec) and facing angle the module was last commanded to follow"""
+        return SwerveModuleState(self.last_commanded_drive_velocity, self.last_commanded_azimuth_angle)
+
+    @property
+    def snapshot(self) -> ModuleSnapshot:
+        """
+        The module's sensor readings for the current cycle. Each sensor is read from the hardware at most once
+        between calls to :meth:`invalidate_snapshot`, and every consumer in that cycle shares the result.
+        """
+        return ModuleSnapshot(*map(self._read_cached, ModuleSnapshot._fields))
+
+    def read_snapshot(self) -> ModuleSnapshot:
+        """Read every sensor on the module from the hardware, bypassing the cache"""
+        return ModuleSnapshot(
+            self.read_drive_velocity(),
+            self.read_drive_distance(),
+            self.read_drive_voltage(),
+            self.read_azimuth_angle(),
+            self.read_azimuth_velocity(),
+        )
+
+    def read_position(self) -> SwerveModulePosition:
+        """
+        Read the module's position from the hardware, bypassing the cache. Safe to call from a thread other than the
+        robot loop, e.g. for high-frequency odometry
+        """
+        return SwerveModulePosition(self.read_drive_distance(), self.read_azimuth_angle())
+
+    def invalidate_snapshot(self):
+        """Discard the cached sensor readings. Should be called once at the start of every scheduler cycle."""
+        self._readings.clear()
+
+    @property
+    def hal_calls_saved(self) -> int:
+        """How many hardware sensor calls the snapshot cache has avoided"""
+        return self.cached_reads
+
+    def _read_cached(self, field: str) -> Any:
+        value = self._readings.get(field)
+        if value is None:
+            value = self._readings[field] = getattr(self, _READERS[field])()
+            self.hal_reads += 1
+        else:
+            # The field would otherwise have been its own hardware call
+            self.cached_reads += 1
+        return value
+
     @abstractmethod
-    def desire_drive_velocity(self, velocity: float, open_loop: bool):
+    def desire_drive_velocity(self, velocity: float, open_loop: bool, acceleration: float = 0.0):
         """
         Drive the wheel
 
         :param velocity: Desired velocity in m/s
         :param open_loop: Use open loop (True) or closed loop (False) velocity control
+        :param acceleration: Desired wheel acceleration in m/s^2, used as feedforward in closed loop control
         """
         raise NotImplementedError
 
@@ -71,6 +164,10 @@ class SwerveModule(Sendable, metaclass=SendableABCMeta):
         """Reset sensor readings. Should be called during initialization."""
         raise NotImplementedError
 
+    def is_ready(self) -> bool:
+        """Whether every device in the module is configured and reporting usable readings"""
+        return True
+
     @abstractmethod
     def simulation_periodic(self, delta_time: float):
         """
@@ -81,35 +178,61 @@ class SwerveModule(Sendable, metaclass=SendableABCMeta):
         raise NotImplementedError
 
     @property
-    @abstractmethod
     def drive_velocity(self) -> float:
         """Drive wheel velocity in m/s"""
-        raise NotImplementedError
+        return self._read_cached("drive_velocity")
 
     @property
-    @abstractmethod
     def drive_distance(self) -> float:
         """Driven distance in metres"""
-        raise NotImplementedError
+        return self._read_cached("drive_distance")
 
     @property
-    @abstractmethod
     def drive_voltage(self) -> float:
         """Applied output voltage of the drive motor"""
-        raise NotImplementedError
+        return self._read_cached("drive_voltage")
 
     @property
-    @abstractmethod
     def azimuth_angle(self) -> Rotation2d:
         """CCW+ wheel angle"""
-        raise NotImplementedError
+        return self._read_cached("azimuth_angle")
 
     @property
-    @abstractmethod
     def azimuth_velocity(self) -> float:
         """CCW+ wheel angular velocity in rad/s"""
+        return self._read_cached("azimuth_velocity")
+
+    # Hardware reads behind each cached property. They bypass the cache, so they are safe to call from any thread
+
+    @abstractmethod
+    def read_drive_velocity(self) -> float:
+        """Read the drive wheel velocity in m/s from the hardware"""
         raise NotImplementedError
 
+    @abstractmethod
+    def read_drive_distance(self) -> float:
+        """Read the driven distance in metres from the hardware"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_drive_voltage(self) -> float:
+        """Read the drive motor's applied output voltage from the hardware"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_azimuth_angle(self) -> Rotation2d:
+        """Read the CCW+ wheel angle from the hardware"""
+        raise NotImplementedError
+
+    @abstractmethod
+    def read_azimuth_velocity(self) -> float:
+        """Read the CCW+ wheel angular velocity in rad/s from the hardware"""
+        raise NotImplementedError
+
+
+# The hardware read behind each ModuleSnapshot field
+_READERS = {field: f"read_{field}" for field in ModuleSnapshot._fields}
+
 
 def sign(num):
     return 1 if num > 0 else -1 if num < 0 else 0
@@ -122,10 +245,12 @@ def place_in_proper_0_to_360_scope(scope_reference: float, new_angle: float) ->
     lower_bound = scope_reference - lower_offset
     upper_bound = lower_bound + 360
 
-    while new_angle < lower_bound:
-        new_angle += 360
-    while new_angle > upper_bound:
-        new_angle -= 360
+    # Shift by whole turns in one step. Azimuth encoders report unbounded angles, so stepping 360 degrees
+    # at a time would get slower the further a module winds up
+    if new_angle < lower_bound:
+        new_angle += 360 * math.ceil((lower_bound - new_angle) / 360)
+    elif new_angle > upper_bound:
+        new_angle -= 360 * math.ceil((new_angle - upper_bound) / 360)
 
     if new_angle - scope_reference > 180:
         new_angle -= 360
@@ -150,3 +275,46 @@ def optimize(desired_state: SwerveModuleState, current_angle: Rotation2d):
         target_angle -= 180 * sign(delta)
 
     return SwerveModuleState(target_speed, Rotation2d.fromDegrees(target_angle))
+
+
+def cosine_scale(speed: float, angle: Rotation2d, current_angle: Rotation2d) -> float:
+    """
+    Scale a drive speed by the cosine of the angle the module still has to turn. A module that is far from its
+    target angle would otherwise push the robot in the wrong direction while it turns.
+
+    :param speed: Desired drive speed in m/s
+    :param angle: Desired module angle
+    :param current_angle: Current module angle
+    :return: The scaled speed in m/s
+    """
+    return speed * math.cos(math.radians(angle.degrees() - current_angle.degrees()))
+
+
+def optimize_batch(speeds: np.ndarray, angles: np.ndarray, current_angles: np.ndarray):
+    """
+    Optimize the states of many modules at once. Equivalent to calling :func:`optimize` on each module.
+
+    :param speeds: Desired drive speed of each module in m/s. Modified in place
+    :param angles: Desired angle of each module in degrees. Modified in place to an unbounded angle within
+           90 degrees of the module's current angle
+    :param current_angles: Current (possibly wound-up) angle of each module in degrees
+    """
+    # Wrap the difference into [-180, 180) with modular arithmetic, so the cost is independent of wind-up
+    delta = np.mod(angles - current_angles + 180, 360) - 180
+
+    flip = np.abs(delta) > 90
+    delta[flip] -= np.copysign(180, delta[flip])
+    speeds[flip] *= -1
+
+    np.add(current_angles, delta, out=angles)
+
+
+def cosine_scale_batch(speeds: np.ndarray, angles: np.ndarray, current_angles: np.ndarray):
+    """
+    Apply :func:`cosine_scale` to many modules at once.
+
+    :param speeds: Desired drive speed of each module in m/s. Modified in place
+    :param angles: Desired angle of each module in degrees
+    :param current_angles: Current angle of each module in degrees
+    """
+    speeds *= np.cos(np.radians(angles - current_angles))
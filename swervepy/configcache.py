@@ -0,0 +1,79 @@
+"""Remembers which configuration each motor controller holds, so unchanged devices are not reconfigured at boot"""
+
+import dataclasses
+import hashlib
+import json
+import os
+import threading
+from typing import Optional
+
+import wpilib
+
+
+def fingerprint(*parts) -> str:
+    """
+    Hash everything that goes into a device's configuration
+
+    :param parts: Parameter dataclasses (e.g. from ``in_standard_units``) and any other values the configuration is
+           built from
+    :return: A hex digest that changes whenever any part changes
+    """
+    data = [dataclasses.asdict(part) if dataclasses.is_dataclass(part) else part for part in parts]
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class ConfigCache:
+    """
+    A file of configuration fingerprints keyed by device. A device whose fingerprint matches the cache already holds
+    that configuration in flash, so it can skip the factory reset and full configuration push.
+    """
+
+    # Outside /home/lvuser/py, which is replaced on every deploy
+    ROBOT_PATH = "/home/lvuser/swervepy_config_cache.json"
+
+    def __init__(self, path: str):
+        """
+        :param path: File the fingerprints are kept in. Created on the first store
+        """
+        self._path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as file:
+                self._fingerprints: dict[str, str] = json.load(file)
+        except (OSError, ValueError):
+            self._fingerprints = {}
+
+    @classmethod
+    def on_robot(cls) -> Optional["ConfigCache"]:
+        """
+        :return: The cache on the roboRIO, or None in simulation, where devices forget their configuration between
+                 runs and must always be configured
+        """
+        return cls(cls.ROBOT_PATH) if wpilib.RobotBase.isReal() else None
+
+    def matches(self, device: str, fingerprint: str) -> bool:
+        """
+        :param device: Name of the device, unique on the robot (e.g. ``"SPARK MAX 3"``)
+        :param fingerprint: The configuration the device should hold
+        :return: Whether the device was last configured with this fingerprint
+        """
+        with self._lock:
+            return self._fingerprints.get(device) == fingerprint
+
+    def store(self, device: str, fingerprint: str):
+        """
+        Record that a device now holds a configuration in flash
+
+        :param device: Name of the device, unique on the robot
+        :param fingerprint: The configuration the device was given
+        """
+        with self._lock:
+            self._fingerprints[device] = fingerprint
+            # Write to a temporary file and swap it in, so losing power mid-write never corrupts the cache
+            temporary = f"{self._path}.tmp"
+            try:
+                with open(temporary, "w") as file:
+                    json.dump(self._fingerprints, file, indent=2, sort_keys=True)
+                os.replace(temporary, self._path)
+            except OSError as e:
+                wpilib.reportWarning(f"Could not save motor configuration cache: {e}", False)
@@ -1,8 +1,13 @@
 """
 A collection of methods for converting between native Falcon 500 units and standard units, like metres.
+
+The functions recompute their scale from the gear ratio and circumference on every call. Components that convert
+every loop should use :class:`FalconConversion`, which computes each scale once.
 """
 import math
+from typing import Optional
 
+import numpy as np
 import wpimath.geometry
 
 FALCON_CPR = 2048
@@ -80,3 +85,78 @@ def radps_to_falcon(dps: float, gear_ratio: float) -> float:
 
 def units_per_100_ms_to_units_per_sec(velocity: float) -> float:
     return velocity * 10
+
+
+class FalconConversion:
+    """
+    Scale factors between a Falcon 500's native units and a mechanism's standard units, computed once from its gear
+    ratio and wheel circumference. Each conversion is then a single multiplication. Results match the module-level
+    functions to within floating-point rounding.
+
+    Scalar methods take and return floats. The ``*_batch`` methods take NumPy arrays, e.g. the raw readings of every
+    module at once; the gear ratio and circumference may also be arrays with one element per module.
+    """
+
+    __slots__ = (
+        "metres_per_count",
+        "mps_per_native_velocity",
+        "degrees_per_count",
+        "radps_per_native_velocity",
+    )
+
+    def __init__(self, gear_ratio: float, circumference: float = 1.0):
+        """
+        :param gear_ratio: Motor rotations per mechanism rotation
+        :param circumference: Wheel circumference in metres. Only needed for the distance and speed conversions
+        """
+        counts_per_rotation = gear_ratio * FALCON_CPR
+        # Native velocity is in counts per 100 ms
+        self.metres_per_count = circumference / counts_per_rotation
+        self.mps_per_native_velocity = self.metres_per_count * 10
+        self.degrees_per_count = DEGREES_PER_ROTATION / counts_per_rotation
+        self.radps_per_native_velocity = RADS_PER_ROTATION * 10 / counts_per_rotation
+
+    def to_metres(self, counts: float) -> float:
+        return counts * self.metres_per_count
+
+    def from_metres(self, metres: float) -> float:
+        return metres / self.metres_per_count
+
+    def to_mps(self, velocity: float) -> float:
+        return velocity * self.mps_per_native_velocity
+
+    def from_mps(self, mps: float) -> float:
+        return mps / self.mps_per_native_velocity
+
+    def to_degrees(self, counts: float) -> float:
+        return counts * self.degrees_per_count
+
+    def to_rotation(self, counts: float) -> wpimath.geometry.Rotation2d:
+        return wpimath.geometry.Rotation2d.fromDegrees(counts * self.degrees_per_count)
+
+    def from_rotation(self, rotation: wpimath.geometry.Rotation2d) -> float:
+        return rotation.degrees() / self.degrees_per_count
+
+    def to_radps(self, velocity: float) -> float:
+        return velocity * self.radps_per_native_velocity
+
+    def from_radps(self, radps: float) -> float:
+        return radps / self.radps_per_native_velocity
+
+    def to_metres_batch(self, counts: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.multiply(counts, self.metres_per_count, out=out)
+
+    def to_mps_batch(self, velocities: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.multiply(velocities, self.mps_per_native_velocity, out=out)
+
+    def from_mps_batch(self, mps: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.divide(mps, self.mps_per_native_velocity, out=out)
+
+    def to_degrees_batch(self, counts: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.multiply(counts, self.degrees_per_count, out=out)
+
+    def from_degrees_batch(self, degrees: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.divide(degrees, self.degrees_per_count, out=out)
+
+    def to_radps_batch(self, velocities: np.ndarray, out: Optional[np.ndarray] = None) -> np.ndarray:
+        return np.multiply(velocities, self.radps_per_native_velocity, out=out)
@@ -1,6 +1,8 @@
 import copy
+import math
 from dataclasses import dataclass
 from enum import IntEnum
+from typing import Optional
 
 import phoenix5
 import phoenix5.sensors
@@ -15,6 +17,23 @@ from .sensor import SparkMaxEncoderType, SparkMaxAbsoluteEncoder
 from ..abstract.motor import CoaxialDriveComponent, CoaxialAzimuthComponent
 from .. import conversions, u
 from ..abstract.sensor import AbsoluteEncoder
+from ..configcache import ConfigCache, fingerprint
+from ..signals import (
+    AZIMUTH_SIGNALS,
+    DRIVE_SIGNALS,
+    SignalRates,
+    apply_spark_max_signals,
+    apply_talon_fx_signals,
+    bus_load,
+)
+from ..initializer import DeviceInitializer, initialize, wait_until
+
+# Part of every configuration fingerprint. Bump it when a _config method changes what it sends to the controller,
+# so controllers configured by older code are reconfigured
+CONFIG_VERSION = 1
+
+# Longest time an azimuth motor waits for its absolute encoder to report a position before resetting to it
+ABSOLUTE_ENCODER_READY_TIMEOUT = 0.5
 
 
 class NeutralMode(IntEnum):
@@ -81,9 +100,74 @@ class TypicalAzimuthComponentParameters:
         return data
 
 
+def _configure_talon_fx(
+    motor: phoenix5.WPI_TalonFX,
+    settings: phoenix5.TalonFXConfiguration,
+    name: str,
+    config_fingerprint: str,
+    cache: Optional[ConfigCache],
+):
+    """
+    Factory reset a Talon FX and apply its settings, unless the cache shows it already holds them. Phoenix 5 always
+    saves settings to flash, so the cache only needs updating.
+    """
+    if cache is not None and cache.matches(name, config_fingerprint):
+        # A replaced controller with the same CAN ID would match the cache but hold a factory configuration
+        if math.isclose(motor.configGetParameter(phoenix5.ParamEnum.eProfileParamSlot_P, 0), settings.slot0.kP,
+                        rel_tol=1e-5, abs_tol=1e-9):
+            return
+
+    motor.configFactoryDefault()
+    error = motor.configAllSettings(settings)
+    if cache is not None and error == phoenix5.ErrorCode.OK:
+        cache.store(name, config_fingerprint)
+
+
+def _configure_spark_max(
+    motor: rev.SparkMax,
+    config: rev.SparkBaseConfig,
+    name: str,
+    config_fingerprint: str,
+    cache: Optional[ConfigCache],
+    kP: float,
+    position_conversion_factor: float,
+):
+    """
+    Reset a SPARK MAX's safe parameters and apply a configuration, unless the cache shows it already holds it. With a
+    cache, the configuration is saved to flash so that later boots can skip it.
+    """
+    if cache is not None and cache.matches(name, config_fingerprint):
+        # A replaced controller with the same CAN ID would match the cache but hold a factory configuration
+        accessor = motor.configAccessor
+        if math.isclose(accessor.closedLoop.getP(), kP, rel_tol=1e-5, abs_tol=1e-9) and math.isclose(
+            accessor.encoder.getPositionConversionFactor(), position_conversion_factor, rel_tol=1e-5
+        ):
+            return
+
+    persist_mode = (
+        rev.SparkBase.PersistMode.kPersistParameters
+        if cache is not None
+        else rev.SparkBase.PersistMode.kNoPersistParameters
+    )
+    error = motor.configure(config, rev.SparkBase.ResetMode.kResetSafeParameters, persist_mode)
+    if cache is not None and error == rev.REVLibError.kOk:
+        cache.store(name, config_fingerprint)
+
+
 class Falcon500CoaxialDriveComponent(CoaxialDriveComponent):
-    def __init__(self, id_: int | tuple[int, str], parameters: TypicalDriveComponentParameters):
+    def __init__(
+        self,
+        id_: int | tuple[int, str],
+        parameters: TypicalDriveComponentParameters,
+        initializer: Optional[DeviceInitializer] = None,
+        config_cache: Optional[ConfigCache] = None,
+        signal_rates: SignalRates = DRIVE_SIGNALS,
+    ):
         self._params = parameters.in_standard_units()
+        self._conversion = conversions.FalconConversion(self._params.gear_ratio, self._params.wheel_circumference)
+        self._name = f"TalonFX {id_}"
+        self._config_cache = config_cache
+        self._signal_rates = signal_rates
 
         try:
             # Unpack tuple of motor id and CAN bus id into TalonFX constructor
@@ -92,8 +176,7 @@ class Falcon500CoaxialDriveComponent(CoaxialDriveComponent):
             # Only an int was provided for id_
             self._motor = phoenix5.WPI_TalonFX(id_)
 
-        self._config()
-        self.reset()
+        self._initialized = initialize(initializer, self._name, self._initialize)
 
         self._feedforward = SimpleMotorFeedforwardMeters(parameters.kS, parameters.kV, parameters.kA)
 
@@ -117,32 +200,37 @@ class Falcon500CoaxialDriveComponent(CoaxialDriveComponent):
         settings.openloopRamp = self._params.open_loop_ramp_rate
         settings.closedloopRamp = self._params.closed_loop_ramp_rate
 
-        self._motor.configFactoryDefault()
-        self._motor.configAllSettings(settings)
+        _configure_talon_fx(self._motor, settings, self._name, fingerprint(self._params, CONFIG_VERSION), self._config_cache)
+        # Inversion and neutral mode are not saved in flash, so they are set on every boot
         self._motor.setInverted(self._params.invert_motor)
 
         # Convert from generalized neutral mode to CTRE API NeutralMode
         self._motor.setNeutralMode(phoenix5.NeutralMode.Brake if self._params.neutral_mode is NeutralMode.BRAKE else phoenix5.NeutralMode.Coast)
+        # Status frame periods are not saved in flash either
+        bus_load.register(self._name, apply_talon_fx_signals(self._motor, self._signal_rates))
+
+    def _initialize(self):
+        self._config()
+        self.reset()
+
+    def is_ready(self) -> bool:
+        return self._initialized is None or self._initialized.done()
 
     def follow_velocity_open(self, velocity: float):
         percent_out = velocity / self._params.max_speed
         self._motor.set(phoenix5.ControlMode.PercentOutput, percent_out)
 
-        converted_velocity = conversions.mps_to_falcon(
-            velocity, self._params.wheel_circumference, self._params.gear_ratio
-        )
+        converted_velocity = self._conversion.from_mps(velocity)
         # CTRE sim requires us to invert sensor readings ourselves
         self._sim_motor.setIntegratedSensorVelocity(int(converted_velocity * -1 if self._params.invert_motor else 1))
 
-    def follow_velocity_closed(self, velocity: float):
-        converted_velocity = conversions.mps_to_falcon(
-            velocity, self._params.wheel_circumference, self._params.gear_ratio
-        )
+    def follow_velocity_closed(self, velocity: float, acceleration: float = 0.0):
+        converted_velocity = self._conversion.from_mps(velocity)
         self._motor.set(
             phoenix5.ControlMode.Velocity,
             converted_velocity,
             phoenix5.DemandType.ArbitraryFeedForward,
-            self._feedforward.calculate(velocity),
+            self._feedforward.calculate(velocity) + self._params.kA * acceleration,
         )
 
         # CTRE sim requires us to invert sensor readings ourselves
@@ -161,19 +249,11 @@ class Falcon500CoaxialDriveComponent(CoaxialDriveComponent):
 
     @property
     def velocity(self) -> float:
-        return conversions.falcon_to_mps(
-            self._motor.getSelectedSensorVelocity(),
-            self._params.wheel_circumference,
-            self._params.gear_ratio,
-        )
+        return self._conversion.to_mps(self._motor.getSelectedSensorVelocity())
 
     @property
     def distance(self) -> float:
-        return conversions.falcon_to_metres(
-            self._motor.getSelectedSensorPosition(),
-            self._params.wheel_circumference,
-            self._params.gear_ratio,
-        )
+        return self._conversion.to_metres(self._motor.getSelectedSensorPosition())
 
     @property
     def voltage(self) -> float:
@@ -187,8 +267,15 @@ class Falcon500CoaxialAzimuthComponent(CoaxialAzimuthComponent):
         azimuth_offset: Rotation2d,
         parameters: TypicalAzimuthComponentParameters,
         absolute_encoder: AbsoluteEncoder,
+        initializer: Optional[DeviceInitializer] = None,
+        config_cache: Optional[ConfigCache] = None,
+        signal_rates: SignalRates = AZIMUTH_SIGNALS,
     ):
         self._params = parameters.in_standard_units()
+        self._conversion = conversions.FalconConversion(self._params.gear_ratio)
+        self._name = f"TalonFX {id_}"
+        self._config_cache = config_cache
+        self._signal_rates = signal_rates
 
         try:
             # Unpack tuple of motor id and CAN bus id into TalonFX constructor
@@ -200,8 +287,9 @@ class Falcon500CoaxialAzimuthComponent(CoaxialAzimuthComponent):
         self._absolute_encoder = absolute_encoder
         self._offset = azimuth_offset
 
-        self._config()
-        self.reset()
+        self._initialized = initialize(
+            initializer, self._name, self._initialize, after=(absolute_encoder.initialized,)
+        )
 
         self._sim_motor = self._motor.getSimCollection()
 
@@ -222,13 +310,24 @@ class Falcon500CoaxialAzimuthComponent(CoaxialAzimuthComponent):
         settings.initializationStrategy = phoenix5.sensors.SensorInitializationStrategy.BootToZero
         settings.closedloopRamp = self._params.ramp_rate
 
-        self._motor.configFactoryDefault()
-        self._motor.configAllSettings(settings)
+        _configure_talon_fx(self._motor, settings, self._name, fingerprint(self._params, CONFIG_VERSION), self._config_cache)
+        # Inversion and neutral mode are not saved in flash, so they are set on every boot
         self._motor.setInverted(self._params.invert_motor)
         self._motor.setNeutralMode(phoenix5.NeutralMode.Brake if self._params.neutral_mode is NeutralMode.BRAKE else phoenix5.NeutralMode.Coast)
+        # Status frame periods are not saved in flash either
+        bus_load.register(self._name, apply_talon_fx_signals(self._motor, self._signal_rates))
+
+    def _initialize(self):
+        self._config()
+        # The starting angle is read from the absolute encoder, so it has to be reporting first
+        wait_until(self._absolute_encoder.is_ready, ABSOLUTE_ENCODER_READY_TIMEOUT)
+        self.reset()
+
+    def is_ready(self) -> bool:
+        return (self._initialized is None or self._initialized.done()) and self._absolute_encoder.is_ready()
 
     def follow_angle(self, angle: Rotation2d):
-        converted_angle = conversions.degrees_to_falcon(angle, self._params.gear_ratio)
+        converted_angle = self._conversion.from_rotation(angle)
         self._motor.set(phoenix5.ControlMode.Position, converted_angle)
 
         # CTRE sim requires us to invert sensor readings ourselves
@@ -236,27 +335,36 @@ class Falcon500CoaxialAzimuthComponent(CoaxialAzimuthComponent):
 
     def reset(self):
         absolute_position = self._absolute_encoder.absolute_position - self._offset
-        converted_position = conversions.degrees_to_falcon(absolute_position, self._params.gear_ratio)
+        converted_position = self._conversion.from_rotation(absolute_position)
         self._motor.setSelectedSensorPosition(converted_position)
 
     @property
     def rotational_velocity(self) -> float:
-        return conversions.falcon_to_radps(self._motor.getSelectedSensorVelocity(), self._params.gear_ratio)
+        return self._conversion.to_radps(self._motor.getSelectedSensorVelocity())
 
     @property
     def angle(self) -> Rotation2d:
-        return conversions.falcon_to_degrees(self._motor.getSelectedSensorPosition(), self._params.gear_ratio)
+        return self._conversion.to_rotation(self._motor.getSelectedSensorPosition())
 
 
 class NEOCoaxialDriveComponent(CoaxialDriveComponent):
-    def __init__(self, id_: int, parameters: TypicalDriveComponentParameters):
+    def __init__(
+        self,
+        id_: int,
+        parameters: TypicalDriveComponentParameters,
+        initializer: Optional[DeviceInitializer] = None,
+        config_cache: Optional[ConfigCache] = None,
+        signal_rates: SignalRates = DRIVE_SIGNALS,
+    ):
         self._params = parameters.in_standard_units()
+        self._name = f"SPARK MAX {id_}"
+        self._config_cache = config_cache
+        self._signal_rates = signal_rates
 
         self._motor = rev.SparkMax(id_, rev.SparkMax.MotorType.kBrushless)
         self._controller = self._motor.getClosedLoopController()
         self._encoder = self._motor.getEncoder()
-        self._config()
-        self.reset()
+        self._initialized = initialize(initializer, self._name, self._initialize)
 
         self._feedforward = SimpleMotorFeedforwardMeters(parameters.kS, parameters.kV, parameters.kA)
 
@@ -278,7 +386,8 @@ class NEOCoaxialDriveComponent(CoaxialDriveComponent):
         motorConfig.openLoopRampRate(self._params.open_loop_ramp_rate)
         motorConfig.closedLoopRampRate(self._params.closed_loop_ramp_rate)
 
-        self._motor.setInverted(self._params.invert_motor)
+        # Inversion is part of the configuration, so it survives the reset below and is saved with it
+        motorConfig.inverted(self._params.invert_motor)
 
         # Convert generic neutral mode to REV IdleMode
         motorConfig.setIdleMode(rev.SparkBaseConfig.IdleMode(self._params.neutral_mode))
@@ -287,7 +396,19 @@ class NEOCoaxialDriveComponent(CoaxialDriveComponent):
         motorConfig.encoder.positionConversionFactor(position_conversion_factor)
         motorConfig.encoder.velocityConversionFactor(position_conversion_factor / 60)
 
-        self._motor.configure(motorConfig, rev.SparkBase.ResetMode(1), rev.SparkBase.PersistMode(0))
+        bus_load.register(self._name, apply_spark_max_signals(motorConfig, self._signal_rates))
+
+        _configure_spark_max(
+            self._motor, motorConfig, self._name, fingerprint(self._params, self._signal_rates, CONFIG_VERSION),
+            self._config_cache, self._params.kP, position_conversion_factor,
+        )
+
+    def _initialize(self):
+        self._config()
+        self.reset()
+
+    def is_ready(self) -> bool:
+        return self._initialized is None or self._initialized.done()
 
     def follow_velocity_open(self, velocity: float):
         percent_out = velocity / self._params.max_speed
@@ -295,11 +416,11 @@ class NEOCoaxialDriveComponent(CoaxialDriveComponent):
 
         self._sim_velocity.set(percent_out)
 
-    def follow_velocity_closed(self, velocity: float):
+    def follow_velocity_closed(self, velocity: float, acceleration: float = 0.0):
         self._controller.setReference(
             velocity,
             rev.SparkMax.ControlType.kVelocity,
-            arbFeedforward=self._feedforward.calculate(velocity),
+            arbFeedforward=self._feedforward.calculate(velocity) + self._params.kA * acceleration,
         )
 
     def set_voltage(self, volts: float):
@@ -332,26 +453,31 @@ class NEOCoaxialAzimuthComponent(CoaxialAzimuthComponent):
         azimuth_offset: Rotation2d,
         parameters: TypicalAzimuthComponentParameters,
         absolute_encoder: AbsoluteEncoder | SparkMaxEncoderType,
+        initializer: Optional[DeviceInitializer] = None,
+        config_cache: Optional[ConfigCache] = None,
+        signal_rates: SignalRates = AZIMUTH_SIGNALS,
     ):
         self._params = parameters.in_standard_units()
+        self._name = f"SPARK MAX {id_}"
+        self._config_cache = config_cache
+        self._signal_rates = signal_rates
 
         self._motor = rev.SparkMax(id_, rev.SparkMax.MotorType.kBrushless)
         self._controller = self._motor.getClosedLoopController()
         self._encoder = self._motor.getEncoder()
 
-        # Config must be called before the absolute encoder is set up because config method
-        # factory resets the SPARK MAX
-        self._config()
-
         if isinstance(absolute_encoder, SparkMaxEncoderType):
-            # Construct an AbsoluteEncoder from sensor plugged into SPARK MAX
+            # Construct an AbsoluteEncoder from sensor plugged into SPARK MAX. The encoder only holds handles to the
+            # SPARK MAX, so it is read after the config below factory resets the controller
             self._absolute_encoder = SparkMaxAbsoluteEncoder(self._motor, absolute_encoder)
         else:
             self._absolute_encoder = absolute_encoder
 
         self._offset = azimuth_offset
 
-        self.reset()
+        self._initialized = initialize(
+            initializer, self._name, self._initialize, after=(self._absolute_encoder.initialized,)
+        )
 
         sim_motor = SimDeviceSim(f"SPARK MAX [{id_}]")
         self._sim_position = sim_motor.getDouble("Position")
@@ -367,7 +493,8 @@ class NEOCoaxialAzimuthComponent(CoaxialAzimuthComponent):
         motorConfig.smartCurrentLimit(self._params.continuous_current_limit)
         motorConfig.secondaryCurrentLimit(self._params.peak_current_limit)
 
-        self._motor.setInverted(self._params.invert_motor)
+        # Inversion is part of the configuration, so it survives the reset below and is saved with it
+        motorConfig.inverted(self._params.invert_motor)
 
         # Convert generic neutral mode to REV IdleMode
         motorConfig.setIdleMode(rev.SparkBaseConfig.IdleMode(self._params.neutral_mode))
@@ -375,8 +502,22 @@ class NEOCoaxialAzimuthComponent(CoaxialAzimuthComponent):
         position_conversion_factor = 360 / self._params.gear_ratio
         motorConfig.encoder.positionConversionFactor(position_conversion_factor)
         motorConfig.encoder.velocityConversionFactor(position_conversion_factor / 60)
-        
-        self._motor.configure(motorConfig, rev.SparkBase.ResetMode(1), rev.SparkBase.PersistMode(0))
+
+        bus_load.register(self._name, apply_spark_max_signals(motorConfig, self._signal_rates))
+
+        _configure_spark_max(
+            self._motor, motorConfig, self._name, fingerprint(self._params, self._signal_rates, CONFIG_VERSION),
+            self._config_cache, self._params.kP, position_conversion_factor,
+        )
+
+    def _initialize(self):
+        self._config()
+        # The starting angle is read from the absolute encoder, so it has to be reporting first
+        wait_until(self._absolute_encoder.is_ready, ABSOLUTE_ENCODER_READY_TIMEOUT)
+        self.reset()
+
+    def is_ready(self) -> bool:
+        return (self._initialized is None or self._initialized.done()) and self._absolute_encoder.is_ready()
 
     def follow_angle(self, angle: Rotation2d):
         degrees = angle.degrees()
@@ -410,7 +551,7 @@ class DummyCoaxialComponent(CoaxialDriveComponent, CoaxialAzimuthComponent):
     def follow_velocity_open(self, velocity: float):
         pass
 
-    def follow_velocity_closed(self, velocity: float):
+    def follow_velocity_closed(self, velocity: float, acceleration: float = 0.0):
         pass
 
     def set_voltage(self, volts: float):
@@ -456,7 +597,7 @@ class DummyCoaxialDriveComponent(CoaxialDriveComponent):
     def follow_velocity_open(self, velocity: float):
         self._velocity = velocity
 
-    def follow_velocity_closed(self, velocity: float):
+    def follow_velocity_closed(self, velocity: float, acceleration: float = 0.0):
         self._velocity = velocity
 
     def set_voltage(self, volts: float):
@@ -1,5 +1,6 @@
 import enum
 import math
+from typing import Optional
 
 import phoenix5.sensors
 import navx
@@ -8,12 +9,16 @@ import wpilib
 from wpimath.geometry import Rotation2d, Pose2d
 
 from ..abstract.sensor import AbsoluteEncoder, Gyro
+from ..initializer import DeviceInitializer, initialize
+from ..signals import ABSOLUTE_ENCODER_SIGNALS, GYRO_SIGNALS, SignalRates, apply_cancoder_signals, bus_load
 
 
 class NAVXGyro(Gyro):
-    def __init__(self):
+    def __init__(self, signal_rates: SignalRates = GYRO_SIGNALS):
         super().__init__()
-        self._gyro = navx.AHRS(navx.AHRS.NavXComType.kMXP_SPI)
+        # The NavX is on SPI rather than CAN, so it adds nothing to the bus load. It updates at 4 to 200 Hz
+        update_rate_hz = max(4, min(200, 1000 // signal_rates.position_ms))
+        self._gyro = navx.AHRS(navx.AHRS.NavXComType.kMXP_SPI, update_rate_hz)
         self._radians = 0
 
     def zero_heading(self):
@@ -23,6 +28,9 @@ class NAVXGyro(Gyro):
     def zero_position(self):
         self._gyro.resetDisplacement()
 
+    def is_ready(self) -> bool:
+        return self._gyro.isConnected() and not self._gyro.isCalibrating()
+
     def simulation_periodic(self, delta_position: float):
         self._radians += delta_position
 
@@ -55,7 +63,13 @@ class NAVXGyro(Gyro):
 
 
 class AbsoluteCANCoder(AbsoluteEncoder):
-    def __init__(self, id_: int | tuple[int, str], invert: bool = False):
+    def __init__(
+        self,
+        id_: int | tuple[int, str],
+        invert: bool = False,
+        initializer: Optional[DeviceInitializer] = None,
+        signal_rates: SignalRates = ABSOLUTE_ENCODER_SIGNALS,
+    ):
         super().__init__()
 
         # Construct the CANCoder from either a tuple of motor ID and CAN bus ID or just a motor ID
@@ -70,11 +84,24 @@ class AbsoluteCANCoder(AbsoluteEncoder):
         config.initializationStrategy = phoenix5.sensors.SensorInitializationStrategy.BootToAbsolutePosition
         config.sensorTimeBase = phoenix5.sensors.SensorTimeBase.PerSecond
 
-        self._encoder.configFactoryDefault()
-        self._encoder.configAllSettings(config)
+        name = f"CANCoder {id_}"
+
+        def configure():
+            self._encoder.configFactoryDefault()
+            self._encoder.configAllSettings(config)
+            bus_load.register(name, apply_cancoder_signals(self._encoder, signal_rates))
+
+        self.initialized = initialize(initializer, name, configure)
 
         wpilib.SmartDashboard.putData(f"Absolute CANCoder {id_}", self)
 
+    def is_ready(self) -> bool:
+        if not super().is_ready():
+            return False
+        # The position is only valid once the CANCoder has sent a status frame since booting
+        self._encoder.getAbsolutePosition()
+        return self._encoder.getLastError() == phoenix5.ErrorCode.OK
+
     @property
     def absolute_position(self) -> Rotation2d:
         return Rotation2d.fromDegrees(self._encoder.getAbsolutePosition())
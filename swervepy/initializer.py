@@ -0,0 +1,163 @@
+"""Configures motor controllers and sensors concurrently while the robot boots"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError
+from typing import Callable, Iterable, Optional
+
+import wpilib
+
+
+class DeviceInitializer:
+    """
+    Runs device configuration on a thread pool so the CAN round trips of every device overlap instead of adding up.
+
+    Devices submit their configuration as a task, optionally after other tasks (e.g. an azimuth motor after the
+    absolute encoder it reads). Use it as a context manager; leaving the block waits for every task and reports how
+    long each device took::
+
+        with DeviceInitializer() as initializer:
+            encoder = AbsoluteCANCoder(1, initializer=initializer)
+            azimuth = NEOCoaxialAzimuthComponent(2, offset, params, encoder, initializer=initializer)
+    """
+
+    def __init__(self, max_workers: int = 8, timeout: float = 2.0):
+        """
+        :param max_workers: Number of devices configured at the same time
+        :param timeout: Default time in seconds to wait for a device to finish configuring
+        """
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="DeviceInit")
+        self._timeout = timeout
+        self._lock = threading.Lock()
+        self._tasks: list[tuple[str, Future, float]] = []
+        self.timings: dict[str, float] = {}
+        self._started = time.perf_counter()
+
+    def __enter__(self) -> "DeviceInitializer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.wait()
+        self.report()
+        self._executor.shutdown(wait=False)
+
+    def submit(
+        self,
+        name: str,
+        task: Callable[[], None],
+        after: Iterable[Optional[Future]] = (),
+        timeout: Optional[float] = None,
+    ) -> Future:
+        """
+        Schedule a device's configuration
+
+        :param name: Name of the device, used in the timing report
+        :param task: Configures the device. Runs on a worker thread
+        :param after: Tasks that must finish first. None entries are ignored
+        :param timeout: Time in seconds to wait for this device. Defaults to the initializer's timeout
+        :return: A future that completes when the device is configured
+        """
+        dependencies = [future for future in after if future is not None]
+        result: Future = Future()
+
+        def run():
+            start = time.perf_counter()
+            try:
+                task()
+            except Exception as e:
+                result.set_exception(e)
+            else:
+                result.set_result(None)
+            finally:
+                with self._lock:
+                    self.timings[name] = time.perf_counter() - start
+
+        # Dependencies are waited on with callbacks rather than inside a worker, so a blocked task never holds a
+        # worker that the task it waits for needs
+        remaining = [len(dependencies)]
+
+        def dependency_done(_):
+            with self._lock:
+                remaining[0] -= 1
+                ready = remaining[0] == 0
+            if ready:
+                self._executor.submit(run)
+
+        if dependencies:
+            for dependency in dependencies:
+                dependency.add_done_callback(dependency_done)
+        else:
+            self._executor.submit(run)
+
+        with self._lock:
+            self._tasks.append((name, result, self._timeout if timeout is None else timeout))
+        return result
+
+    def wait(self) -> bool:
+        """
+        Wait for every submitted device to finish configuring. Devices that fail or time out are reported to the
+        Driver Station; they keep configuring in the background.
+
+        :return: Whether every device configured successfully in time
+        """
+        start = time.perf_counter()
+        success = True
+        for name, future, timeout in list(self._tasks):
+            remaining = max(0.0, start + timeout - time.perf_counter())
+            try:
+                future.result(remaining)
+            except TimeoutError:
+                wpilib.reportWarning(f"{name} did not finish configuring within {timeout:.1f} s", False)
+                success = False
+            except Exception as e:
+                wpilib.reportError(f"{name} failed to configure: {e!r}", False)
+                success = False
+        return success
+
+    def report(self):
+        """Print the time taken by each device and publish it to SmartDashboard"""
+        with self._lock:
+            timings = sorted(self.timings.items(), key=lambda item: item[1], reverse=True)
+        total = time.perf_counter() - self._started
+
+        lines = [f"Configured {len(timings)} devices in {total * 1000:.0f} ms"]
+        for name, seconds in timings:
+            lines.append(f"  {name}: {seconds * 1000:.0f} ms")
+            wpilib.SmartDashboard.putNumber(f"Init/{name} (ms)", seconds * 1000)
+        wpilib.SmartDashboard.putNumber("Init/Total (ms)", total * 1000)
+        print("\n".join(lines))
+
+
+def initialize(
+    initializer: Optional[DeviceInitializer],
+    name: str,
+    task: Callable[[], None],
+    after: Iterable[Optional[Future]] = (),
+) -> Optional[Future]:
+    """
+    Run a device's configuration on the initializer, or immediately if there is none
+
+    :return: The task's future, or None if it already ran
+    """
+    if initializer is None:
+        task()
+        return None
+    return initializer.submit(name, task, after)
+
+
+def wait_until(condition: Callable[[], bool], timeout: float, poll_period: float = 0.005) -> bool:
+    """
+    Poll a condition until it holds or the timeout passes
+
+    :param condition: Returns True once the wait is over
+    :param timeout: Longest time to wait in seconds
+    :param poll_period: Time between checks in seconds
+    :return: Whether the condition held before the timeout
+    """
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() >= deadline:
+            return False
+        time.sleep(poll_period)
+    return True
@@ -0,0 +1,154 @@
+"""
+A NumPy-backed swerve kinematics engine that computes every module's command in one array operation.
+
+It replaces the per-loop chain of ``ChassisSpeeds.discretize`` → ``toSwerveModuleStates`` →
+``desaturateWheelSpeeds`` → per-module ``optimize`` with a single pass over precomputed arrays.
+"""
+
+import math
+from typing import Iterable
+
+import numpy as np
+from wpimath.geometry import Translation2d
+
+from .abstract.system import optimize_batch, cosine_scale_batch
+
+
+class VectorizedSwerveKinematics:
+    """
+    Inverse kinematics for an N-module swerve drive.
+
+    The inverse-kinematics matrix is built once from the module placements. Each call to :meth:`calculate`
+    writes its results into preallocated arrays, so no wpimath objects are allocated in the control loop.
+    """
+
+    def __init__(self, placements: Iterable[Translation2d]):
+        """
+        :param placements: Position of each module relative to the robot's center, in the order the modules
+               are commanded
+        """
+        locations = np.array([(placement.x, placement.y) for placement in placements], dtype=float)
+        self.module_count = len(locations)
+
+        # Each module contributes two rows: [1, 0, -y] for its X velocity and [0, 1, x] for its Y velocity
+        self._inverse_kinematics = np.zeros((2 * self.module_count, 3))
+        self._inverse_kinematics[0::2, 0] = 1
+        self._inverse_kinematics[1::2, 1] = 1
+        self._inverse_kinematics[0::2, 2] = -locations[:, 1]
+        self._inverse_kinematics[1::2, 2] = locations[:, 0]
+
+        self._chassis = np.zeros(3)
+        self._module_velocities = np.zeros(2 * self.module_count)
+
+        #: Wheel speed (m/s) of each module after desaturation and optimization
+        self.speeds = np.zeros(self.module_count)
+        #: Unbounded facing angle (degrees) of each module after optimization, placed near the module's current angle
+        self.angles = np.zeros(self.module_count)
+        # Module headings are held when the chassis is commanded to stop, matching SwerveDriveKinematics
+        self._last_headings = np.zeros(self.module_count)
+
+    def calculate(
+        self,
+        vx: float,
+        vy: float,
+        omega: float,
+        current_angles: np.ndarray,
+        max_speed: float,
+        period: float,
+        heading: float = 0.0,
+        field_relative: bool = False,
+        rotate_in_place: bool = True,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Compute the optimized speed and angle of every module from a chassis velocity.
+
+        :param vx: Forward velocity in m/s
+        :param vy: Leftward velocity in m/s
+        :param omega: CCW+ angular velocity in rad/s
+        :param current_angles: Current (possibly wound-up) facing angle of each module in degrees
+        :param max_speed: Maximum attainable wheel speed in m/s. Module speeds are scaled down proportionally
+               if any module exceeds it
+        :param period: Discretization interval in seconds
+        :param heading: CCW+ chassis heading in radians. Only used when ``field_relative`` is True
+        :param field_relative: Whether vx and vy are relative to the field rather than the robot
+        :param rotate_in_place: If False, modules commanded slower than 2 cm/s hold their current angle
+        :return: The ``speeds`` (m/s) and ``angles`` (degrees) arrays. These are reused between calls.
+                 Speeds are cosine-scaled by how far each module still has to turn
+        """
+        if field_relative:
+            cos_heading = math.cos(heading)
+            sin_heading = math.sin(heading)
+            vx, vy = vx * cos_heading + vy * sin_heading, -vx * sin_heading + vy * cos_heading
+
+        self._discretize(vx, vy, omega, period)
+        np.dot(self._inverse_kinematics, self._chassis, out=self._module_velocities)
+
+        module_x = self._module_velocities[0::2]
+        module_y = self._module_velocities[1::2]
+        np.hypot(module_x, module_y, out=self.speeds)
+
+        if vx == 0 and vy == 0 and omega == 0:
+            self.speeds.fill(0)
+            self.angles[:] = self._last_headings
+        else:
+            np.arctan2(module_y, module_x, out=self.angles)
+            np.degrees(self.angles, out=self.angles)
+            self._last_headings[:] = self.angles
+
+        return self._desaturate_and_optimize(current_angles, max_speed, rotate_in_place)
+
+    def calculate_from_states(
+        self,
+        speeds: Iterable[float],
+        angles: Iterable[float],
+        current_angles: np.ndarray,
+        max_speed: float,
+        rotate_in_place: bool = True,
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Desaturate and optimize already-computed module states.
+
+        :param speeds: Desired wheel speed of each module in m/s
+        :param angles: Desired facing angle of each module in degrees
+        :param current_angles: Current (possibly wound-up) facing angle of each module in degrees
+        :param max_speed: Maximum attainable wheel speed in m/s
+        :param rotate_in_place: If False, modules commanded slower than 2 cm/s hold their current angle
+        :return: The ``speeds`` (m/s) and ``angles`` (degrees) arrays. These are reused between calls
+        """
+        self.speeds[:] = speeds
+        self.angles[:] = angles
+        return self._desaturate_and_optimize(current_angles, max_speed, rotate_in_place)
+
+    def _desaturate_and_optimize(
+        self, current_angles: np.ndarray, max_speed: float, rotate_in_place: bool
+    ) -> tuple[np.ndarray, np.ndarray]:
+        # Desaturate: scale every module by the same factor so the commanded motion keeps its direction
+        fastest = np.abs(self.speeds).max()
+        if fastest > max_speed:
+            self.speeds *= max_speed / fastest
+
+        optimize_batch(self.speeds, self.angles, current_angles)
+
+        if not rotate_in_place:
+            # Prevent rotating the module if drive speed is less than 2 cm/s to prevent feedback-loop jitter
+            np.copyto(self.angles, current_angles, where=np.abs(self.speeds) <= 0.02)
+
+        cosine_scale_batch(self.speeds, self.angles, current_angles)
+
+        return self.speeds, self.angles
+
+    def _discretize(self, vx: float, vy: float, omega: float, period: float):
+        # Closed form of Pose2d().log(Pose2d(vx * dt, vy * dt, omega * dt)) / dt, as done by ChassisSpeeds.discretize
+        dtheta = omega * period
+        half_dtheta = dtheta / 2
+        cos_minus_one = math.cos(dtheta) - 1
+
+        if abs(cos_minus_one) < 1e-9:
+            half_theta_by_tan = 1 - dtheta * dtheta / 12
+        else:
+            half_theta_by_tan = -(half_dtheta * math.sin(dtheta)) / cos_minus_one
+
+        # Rotating by (half_theta_by_tan, -half_dtheta) and scaling by its magnitude is a complex multiplication
+        self._chassis[0] = vx * half_theta_by_tan + vy * half_dtheta
+        self._chassis[1] = vy * half_theta_by_tan - vx * half_dtheta
+        self._chassis[2] = omega
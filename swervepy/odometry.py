@@ -0,0 +1,137 @@
+"""Samples swerve odometry on its own thread, faster than the robot loop"""
+
+import collections
+import threading
+from typing import NamedTuple, Optional, Sequence
+
+import wpilib
+from wpimath.geometry import Rotation2d
+from wpimath.kinematics import SwerveModulePosition
+
+from .abstract import Gyro, SwerveModule
+from .posehistory import PoseHistory
+from .stats import Histogram
+
+
+class OdometrySample(NamedTuple):
+    """Every sensor reading odometry needs, taken at one moment"""
+
+    timestamp: float  # FPGA time in seconds
+    heading: Rotation2d
+    positions: tuple[SwerveModulePosition, ...]
+    speeds: tuple[float, ...]  # Drive wheel velocities in m/s
+    generation: int
+
+
+class OdometryThread:
+    """
+    Reads module positions and the gyro on a Notifier at a fixed rate, and feeds each timestamped sample into a pose
+    estimator.
+
+    Sampling never waits on the estimator: samples are queued, and applied whenever the estimator's lock is free,
+    either straight away on the sampling thread or by the next call to :meth:`apply_pending` from the robot loop.
+    """
+
+    def __init__(
+        self,
+        modules: Sequence[SwerveModule],
+        gyro: Gyro,
+        estimator,
+        estimator_lock: threading.RLock,
+        frequency_hz: float = 200,
+        queue_size: int = 64,
+        history: Optional[PoseHistory] = None,
+    ):
+        """
+        :param modules: The swerve modules, in the estimator's order
+        :param gyro: Provides the chassis heading
+        :param estimator: The SwerveDrive*PoseEstimator to update
+        :param estimator_lock: Held by every user of the estimator
+        :param frequency_hz: Sampling rate. 100-250 Hz suits the CAN status rates in swervepy.signals
+        :param queue_size: Samples kept while the estimator is busy. The oldest are dropped past this
+        :param history: Records the pose after every update
+        """
+        self._modules = modules
+        self._gyro = gyro
+        self._estimator = estimator
+        self._estimator_lock = estimator_lock
+        self._history = history
+        self.period = 1 / frequency_hz
+
+        self._queue: collections.deque[OdometrySample] = collections.deque(maxlen=queue_size)
+        self._queue_lock = threading.Lock()
+        # Incremented by every reset. Samples read before a reset hold stale encoder distances and are discarded
+        self._generation = 0
+        self._last_sample_time = None
+
+        # Deviation of the time between samples from the nominal period, and delay from sampling to estimation
+        self.jitter = Histogram()
+        self.latency = Histogram()
+        self.samples_applied = 0
+        self.samples_discarded = 0
+
+        self._notifier: Optional[wpilib.Notifier] = None
+
+    def start(self):
+        if self._notifier is None:
+            self._notifier = wpilib.Notifier(self.sample)
+            self._notifier.setName("Odometry")
+        self._notifier.startPeriodic(self.period)
+
+    def stop(self):
+        if self._notifier is not None:
+            self._notifier.stop()
+
+    def sample(self):
+        """Take one sample, and apply it (and any queued before it) if the estimator is free"""
+        generation = self._generation
+        timestamp = wpilib.Timer.getFPGATimestamp()
+        sample = OdometrySample(
+            timestamp,
+            self._gyro.heading,
+            tuple(module.read_position() for module in self._modules),
+            tuple(module.read_drive_velocity() for module in self._modules),
+            generation,
+        )
+
+        if self._last_sample_time is not None:
+            self.jitter.record(abs(timestamp - self._last_sample_time - self.period) * 1000)
+        self._last_sample_time = timestamp
+
+        with self._queue_lock:
+            self._queue.append(sample)
+
+        if self._estimator_lock.acquire(blocking=False):
+            try:
+                self.apply_pending()
+            finally:
+                self._estimator_lock.release()
+
+    def apply_pending(self):
+        """Feed every queued sample into the estimator, oldest first. The caller must hold the estimator lock"""
+        with self._queue_lock:
+            samples = list(self._queue)
+            self._queue.clear()
+        if not samples:
+            return
+
+        now = wpilib.Timer.getFPGATimestamp()
+        for sample in samples:
+            if sample.generation != self._generation:
+                self.samples_discarded += 1
+                continue
+            pose = self._estimator.updateWithTime(sample.timestamp, sample.heading, sample.positions)
+            if self._history is not None:
+                self._history.record(sample.timestamp, pose, sample.speeds)
+            self.latency.record((now - sample.timestamp) * 1000)
+            self.samples_applied += 1
+
+    def invalidate(self):
+        """
+        Discard samples taken before now. Call with the estimator lock held whenever encoders, the gyro or the
+        estimator are reset
+        """
+        self._generation += 1
+        with self._queue_lock:
+            self.samples_discarded += len(self._queue)
+            self._queue.clear()
@@ -0,0 +1,144 @@
+"""A bounded record of where the robot has been, for looking up its pose at a past moment"""
+
+import math
+import threading
+from array import array
+from typing import NamedTuple, Optional, Sequence
+
+from wpimath.geometry import Pose2d, Rotation2d
+
+
+class PoseSample(NamedTuple):
+    """The robot's state at one moment"""
+
+    timestamp: float  # FPGA time in seconds
+    pose: Pose2d
+    module_speeds: tuple[float, ...]  # Drive wheel velocities in m/s, in module order
+
+
+class PoseHistory:
+    """
+    A fixed-capacity ring buffer of odometry updates. Samples are packed into one flat array of doubles, so memory is
+    allocated once up front and recording never allocates. Lookups binary search by timestamp and interpolate between
+    the two neighbouring samples.
+
+    Recording and lookups may happen on different threads.
+    """
+
+    def __init__(self, capacity: int = 500, module_count: int = 4):
+        """
+        :param capacity: Number of samples kept. The oldest is overwritten once full. 500 holds 2.5 s of history at
+               200 Hz, or 10 s at the 50 Hz robot loop
+        :param module_count: Number of swerve modules whose speeds are recorded
+        """
+        self.capacity = capacity
+        self.module_count = module_count
+        # Each row is timestamp, x, y, heading (radians), then one speed per module
+        self._stride = 4 + module_count
+        self._data = array("d", bytes(8 * capacity * self._stride))
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def record(self, timestamp: float, pose: Pose2d, module_speeds: Sequence[float]):
+        """
+        Add the result of an odometry update. Samples must arrive in time order; one not newer than the latest sample
+        is ignored.
+
+        :param timestamp: FPGA time of the update in seconds
+        :param pose: The estimated pose after the update
+        :param module_speeds: Drive wheel velocity of each module in m/s
+        """
+        with self._lock:
+            if self._size and timestamp <= self._timestamp(self._size - 1):
+                return
+
+            if self._size < self.capacity:
+                row = (self._start + self._size) % self.capacity
+                self._size += 1
+            else:
+                row = self._start
+                self._start = (self._start + 1) % self.capacity
+
+            offset = row * self._stride
+            data = self._data
+            data[offset] = timestamp
+            data[offset + 1] = pose.X()
+            data[offset + 2] = pose.Y()
+            data[offset + 3] = pose.rotation().radians()
+            for i in range(self.module_count):
+                data[offset + 4 + i] = module_speeds[i]
+
+    def sample_at(self, timestamp: float) -> Optional[PoseSample]:
+        """
+        :param timestamp: FPGA time in seconds
+        :return: The robot's state at that time, interpolated between the recorded samples either side of it. The
+                 latest sample if the time is newer than every sample, or None if it is older than every sample
+        """
+        with self._lock:
+            if self._size == 0 or timestamp < self._timestamp(0):
+                return None
+            if timestamp >= self._timestamp(self._size - 1):
+                return self._unpack(self._offset(self._size - 1), self._offset(self._size - 1), 0.0)
+
+            # Find the first sample after the timestamp; the one before it is at or before the timestamp
+            low, high = 1, self._size - 1
+            while low < high:
+                middle = (low + high) // 2
+                if self._timestamp(middle) <= timestamp:
+                    low = middle + 1
+                else:
+                    high = middle
+
+            before, after = self._offset(low - 1), self._offset(low)
+            t0, t1 = self._data[before], self._data[after]
+            return self._unpack(before, after, (timestamp - t0) / (t1 - t0), timestamp)
+
+    def pose_at(self, timestamp: float) -> Optional[Pose2d]:
+        """
+        :param timestamp: FPGA time in seconds
+        :return: The robot's pose at that time, or None if it is older than the history
+        """
+        sample = self.sample_at(timestamp)
+        return sample.pose if sample else None
+
+    @property
+    def oldest_timestamp(self) -> Optional[float]:
+        with self._lock:
+            return self._timestamp(0) if self._size else None
+
+    @property
+    def newest_timestamp(self) -> Optional[float]:
+        with self._lock:
+            return self._timestamp(self._size - 1) if self._size else None
+
+    def clear(self):
+        """Forget every sample, e.g. after the pose is reset and the recorded path no longer leads to it"""
+        with self._lock:
+            self._start = 0
+            self._size = 0
+
+    def _offset(self, index: int) -> int:
+        return ((self._start + index) % self.capacity) * self._stride
+
+    def _timestamp(self, index: int) -> float:
+        return self._data[self._offset(index)]
+
+    def _unpack(self, before: int, after: int, fraction: float, timestamp: Optional[float] = None) -> PoseSample:
+        data = self._data
+
+        def lerp(field: int) -> float:
+            start = data[before + field]
+            return start + (data[after + field] - start) * fraction
+
+        # Turn the short way around between the two headings
+        heading = data[before + 3]
+        heading_change = math.remainder(data[after + 3] - heading, math.tau)
+        return PoseSample(
+            data[before] if timestamp is None else timestamp,
+            Pose2d(lerp(1), lerp(2), Rotation2d(heading + heading_change * fraction)),
+            tuple(lerp(4 + i) for i in range(self.module_count)),
+        )
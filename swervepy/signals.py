@@ -0,0 +1,179 @@
+"""
+Status frame rates for the devices in a swerve drive.
+
+Every motor controller and CAN sensor sends its readings in periodic status frames. The defaults send many frames the
+drive never reads, and send the ones it does read at rates unrelated to how often it reads them. Each component role
+has a profile below that matches what SwerveDrive consumes; unused frames are slowed to the longest period allowed.
+"""
+
+import threading
+from dataclasses import dataclass
+from typing import Iterable
+
+import phoenix5
+import phoenix5.sensors
+import rev
+import wpilib
+
+
+@dataclass(frozen=True)
+class SignalRates:
+    """
+    How often a device reports each kind of signal, in milliseconds. Signals a device does not have are ignored.
+    """
+
+    # Position is read for odometry every cycle
+    position_ms: int
+    velocity_ms: int
+    # Applied output, for drive voltage (SysId logging)
+    applied_output_ms: int
+    # Bus voltage, current and temperature, for the dashboard
+    telemetry_ms: int
+    faults_ms: int
+
+
+# Odometry reads drive position and velocity every robot cycle (20 ms), and faster when run on its own thread
+DRIVE_SIGNALS = SignalRates(position_ms=10, velocity_ms=20, applied_output_ms=20, telemetry_ms=100, faults_ms=250)
+# Azimuth angle is read for odometry and module optimization; its velocity only reaches the dashboard
+AZIMUTH_SIGNALS = SignalRates(position_ms=10, velocity_ms=100, applied_output_ms=100, telemetry_ms=250, faults_ms=250)
+# The absolute encoder seeds the azimuth angle at boot, and is otherwise only shown on the dashboard
+ABSOLUTE_ENCODER_SIGNALS = SignalRates(
+    position_ms=100, velocity_ms=255, applied_output_ms=255, telemetry_ms=255, faults_ms=255
+)
+# Heading is read for odometry every cycle
+GYRO_SIGNALS = SignalRates(position_ms=10, velocity_ms=255, applied_output_ms=255, telemetry_ms=255, faults_ms=255)
+
+# Longest period CTRE devices accept for a status frame
+CTRE_MAX_PERIOD_MS = 255
+
+# Talon FX frames SwerveDrive never reads (motion profiling, auxiliary sensors and PID telemetry)
+_UNUSED_TALON_FX_FRAMES = (
+    "Status_3_Quadrature",
+    "Status_8_PulseWidth",
+    "Status_10_MotionMagic",
+    "Status_12_Feedback1",
+    "Status_13_Base_PIDF0",
+    "Status_14_Turn_PIDF1",
+    "Status_21_FeedbackIntegrated",
+)
+
+
+def apply_spark_max_signals(config: rev.SparkBaseConfig, rates: SignalRates) -> list[float]:
+    """
+    Add signal periods to a SPARK MAX configuration
+
+    :return: The period of each status frame the controller will send, in milliseconds
+    """
+    # As of REVLib 2025, a frame is sent at the fastest period of the signals it carries: status 0 holds applied
+    # output and telemetry, status 1 faults and warnings, and status 2 the primary encoder. Frames for sensors that
+    # are not plugged in are off unless requested.
+    frames = [
+        min(rates.applied_output_ms, rates.telemetry_ms),
+        rates.faults_ms,
+        min(rates.position_ms, rates.velocity_ms),
+    ]
+
+    signals = config.signals
+    # Setting a third status 0 signal raises "std::get: wrong index for variant" in REVLib 2025, so the frame is
+    # set once through applied output, which brings bus voltage, current and temperature with it
+    signals.appliedOutputPeriodMs(frames[0])
+    signals.faultsPeriodMs(rates.faults_ms)
+    signals.warningsPeriodMs(rates.faults_ms)
+    signals.primaryEncoderPositionPeriodMs(rates.position_ms)
+    signals.primaryEncoderVelocityPeriodMs(rates.velocity_ms)
+
+    return frames
+
+
+def apply_talon_fx_signals(motor: phoenix5.WPI_TalonFX, rates: SignalRates) -> list[float]:
+    """
+    Set a Talon FX's status frame periods. These are not saved in flash, so they must be set on every boot.
+
+    :return: The period of each status frame the controller will send, in milliseconds
+    """
+    frames = {
+        # Applied output and faults
+        phoenix5.StatusFrameEnhanced.Status_1_General: min(rates.applied_output_ms, rates.faults_ms),
+        # Selected sensor position and velocity
+        phoenix5.StatusFrameEnhanced.Status_2_Feedback0: min(rates.position_ms, rates.velocity_ms),
+        # Bus voltage and temperature
+        phoenix5.StatusFrameEnhanced.Status_4_AinTempVbat: rates.telemetry_ms,
+        phoenix5.StatusFrameEnhanced.Status_Brushless_Current: rates.telemetry_ms,
+    }
+    for name in _UNUSED_TALON_FX_FRAMES:
+        frames[getattr(phoenix5.StatusFrameEnhanced, name)] = CTRE_MAX_PERIOD_MS
+
+    return _set_ctre_frames(motor, frames)
+
+
+def apply_cancoder_signals(encoder: phoenix5.sensors.CANCoder, rates: SignalRates) -> list[float]:
+    """
+    Set a CANCoder's status frame periods
+
+    :return: The period of each status frame the encoder will send, in milliseconds
+    """
+    frames = {
+        phoenix5.sensors.CANCoderStatusFrame.SensorData: min(rates.position_ms, rates.velocity_ms),
+        phoenix5.sensors.CANCoderStatusFrame.VbatAndFaults: min(rates.telemetry_ms, rates.faults_ms),
+    }
+    return _set_ctre_frames(encoder, frames)
+
+
+def _set_ctre_frames(device, frames: dict) -> list[float]:
+    periods = []
+    for frame, period in frames.items():
+        period = min(period, CTRE_MAX_PERIOD_MS)
+        device.setStatusFramePeriod(frame, period)
+        periods.append(period)
+    return periods
+
+
+class BusLoadEstimator:
+    """Adds up the status frames every configured device is expected to send"""
+
+    # A CAN frame with a 29-bit ID and 8 data bytes, including typical bit stuffing
+    BITS_PER_FRAME = 150
+
+    def __init__(self, bitrate: int = 1_000_000):
+        """
+        :param bitrate: CAN bus speed in bits per second. The roboRIO's bus runs at 1 Mbit/s
+        """
+        self.bitrate = bitrate
+        self._lock = threading.Lock()
+        self._devices: dict[str, float] = {}
+
+    def register(self, device: str, frame_periods_ms: Iterable[float]):
+        """
+        Record the frames a device sends. Registering the same device again replaces it.
+
+        :param device: Name of the device, unique on the robot
+        :param frame_periods_ms: Period of each status frame the device sends, in milliseconds
+        """
+        with self._lock:
+            self._devices[device] = sum(1000 / period for period in frame_periods_ms if period > 0)
+
+    def frames_per_second(self) -> float:
+        """Expected status frames per second across every registered device"""
+        with self._lock:
+            return sum(self._devices.values())
+
+    def utilization(self) -> float:
+        """Expected fraction of the bus taken up by status frames, between 0 and 1"""
+        return self.frames_per_second() * self.BITS_PER_FRAME / self.bitrate
+
+    def report(self):
+        """Print the expected load and publish it to SmartDashboard"""
+        with self._lock:
+            devices = sorted(self._devices.items())
+        frames = self.frames_per_second()
+
+        lines = [f"Expected CAN load: {frames:.0f} frames/s ({self.utilization():.0%} of the bus)"]
+        lines += [f"  {device}: {device_frames:.0f} frames/s" for device, device_frames in devices]
+        print("\n".join(lines))
+
+        wpilib.SmartDashboard.putNumber("CAN/Expected Frames per Second", frames)
+        wpilib.SmartDashboard.putNumber("CAN/Expected Utilization (%)", self.utilization() * 100)
+
+
+# Every component registers the frames it configures here
+bus_load = BusLoadEstimator()
@@ -0,0 +1,145 @@
+"""
+Runs a swerve drive and its commands in simulation without the simulator GUI, as fast as the CPU allows.
+
+Simulated time is paused and stepped one robot loop at a time, so a whole autonomous routine takes a fraction of a
+second of real time while every timer, timestamp and command sees the usual 20 ms loop. The drive is built from dummy
+components, whose wheels reach their commanded speed and angle instantly. Useful for regression tests and benchmarks
+of trajectory following and odometry::
+
+    with HeadlessSimulation(dummy_swerve_drive(placements, 4.5 * (u.m / u.s), 2 * math.pi * (u.rad / u.s))) as sim:
+        result = sim.run_command(sim.drive.follow_trajectory_command(trajectory, parameters, config, True))
+"""
+
+import time
+from typing import Callable, NamedTuple, Optional, Sequence
+
+import commands2
+import hal
+import wpilib
+import wpilib.simulation
+from pint import Quantity
+from wpimath.geometry import Pose2d, Translation2d
+
+from .impl import CoaxialSwerveModule, DummyGyro
+from .impl.motor import DummyCoaxialAzimuthComponent, DummyCoaxialDriveComponent
+from .subsystem import SwerveDrive
+
+
+class SimulationResult(NamedTuple):
+    """How a simulated command went"""
+
+    finished: bool  # False if the command was still running at the timeout
+    cycles: int
+    sim_seconds: float
+    wall_seconds: float
+    poses: list[Pose2d]  # The drive's pose after every cycle
+
+    @property
+    def speedup(self) -> float:
+        """How many times faster than real time the command ran"""
+        return self.sim_seconds / self.wall_seconds if self.wall_seconds else float("inf")
+
+
+def dummy_swerve_drive(
+    placements: Sequence[Translation2d], max_velocity: Quantity, max_angular_velocity: Quantity, **kwargs
+) -> SwerveDrive:
+    """
+    Build a swerve drive with no hardware behind it
+
+    :param placements: Location of each module relative to the robot's centre
+    :param max_velocity: The maximum velocity of the robot
+    :param max_angular_velocity: The maximum angular velocity of the robot
+    :param kwargs: Passed on to SwerveDrive
+    """
+    modules = tuple(
+        CoaxialSwerveModule(DummyCoaxialDriveComponent(), DummyCoaxialAzimuthComponent(), placement)
+        for placement in placements
+    )
+    return SwerveDrive(modules, DummyGyro(), max_velocity, max_angular_velocity, **kwargs)
+
+
+class HeadlessSimulation:
+    """
+    Steps the CommandScheduler, and with it the drive's periodic and simulationPeriodic methods, on simulated time.
+    The robot is enabled in autonomous while the simulation is open.
+    """
+
+    def __init__(
+        self,
+        drive: SwerveDrive,
+        period: float = 0.02,
+        physics: Optional[Callable[[float, float], None]] = None,
+    ):
+        """
+        :param drive: The drive to simulate, e.g. from :func:`dummy_swerve_drive`
+        :param period: Simulated seconds per robot loop
+        :param physics: Called after every loop with the simulated time and the period, the signature of a pyfrc
+               PhysicsEngine's update_sim. The drive's own kinematic simulation runs either way. The robot's
+               physics.py cannot be passed as is: it reads the SPARK MAX sim devices of the full robot through
+               pyfrc's PhysicsInterface, and the dummy drive has neither
+        """
+        self.drive = drive
+        self.period = period
+        self._physics = physics
+        self._scheduler = commands2.CommandScheduler.getInstance()
+
+    def __enter__(self) -> "HeadlessSimulation":
+        self.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def open(self):
+        """Pause real time and enable the robot in autonomous"""
+        hal.initialize(500, 0)
+        wpilib.simulation.pauseTiming()
+        wpilib.simulation.DriverStationSim.setAutonomous(True)
+        wpilib.simulation.DriverStationSim.setEnabled(True)
+        wpilib.simulation.DriverStationSim.notifyNewData()
+        # The robot loop would normally pick up the new Driver Station state
+        wpilib.DriverStation.refreshData()
+
+    def close(self):
+        """Cancel every command, disable the robot, and let time run again"""
+        self._scheduler.cancelAll()
+        wpilib.simulation.DriverStationSim.setEnabled(False)
+        wpilib.simulation.DriverStationSim.notifyNewData()
+        wpilib.DriverStation.refreshData()
+        wpilib.simulation.resumeTiming()
+
+    def step(self, cycles: int = 1):
+        """Advance simulated time by some robot loops, running the scheduler and physics once per loop"""
+        for _ in range(cycles):
+            # stepTiming would wait on every notifier, including that of a TimedRobot which was built but is not
+            # running (as in pyfrc's test runner), and never return. Nothing stepped here runs on a notifier
+            wpilib.simulation.stepTimingAsync(self.period)
+            self._scheduler.run()
+            if self._physics is not None:
+                self._physics(wpilib.Timer.getFPGATimestamp(), self.period)
+
+    def run_command(self, command: commands2.Command, timeout: float = 15.0) -> SimulationResult:
+        """
+        Schedule a command and step until it finishes
+
+        :param command: The command to run, e.g. an autonomous routine
+        :param timeout: Most simulated seconds to run for
+        """
+        start_time = wpilib.Timer.getFPGATimestamp()
+        wall_start = time.perf_counter()
+        poses = []
+        cycles = 0
+
+        command.schedule()
+        while self._scheduler.isScheduled(command) and cycles * self.period < timeout:
+            self.step()
+            poses.append(self.drive.pose)
+            cycles += 1
+
+        return SimulationResult(
+            not self._scheduler.isScheduled(command),
+            cycles,
+            wpilib.Timer.getFPGATimestamp() - start_time,
+            time.perf_counter() - wall_start,
+            poses,
+        )
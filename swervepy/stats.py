@@ -0,0 +1,68 @@
+"""Lightweight statistics for timing measurements taken inside the robot loop"""
+
+import bisect
+import threading
+from array import array
+
+
+class Histogram:
+    """
+    A fixed-bucket histogram of durations in milliseconds. Buckets grow geometrically, so percentiles are accurate to
+    within the growth factor at every scale. Recording allocates nothing, so it is cheap enough to run every loop.
+    """
+
+    def __init__(self, min_ms: float = 0.01, max_ms: float = 1000.0, growth: float = 1.15):
+        """
+        :param min_ms: Upper edge of the smallest bucket. Smaller values are counted there
+        :param max_ms: Upper edge of the largest regular bucket. Larger values are counted in an overflow bucket
+        :param growth: Ratio between the edges of neighbouring buckets
+        """
+        edges = [min_ms]
+        while edges[-1] < max_ms:
+            edges.append(edges[-1] * growth)
+        self._edges = edges
+        self._counts = array("Q", bytes(8 * (len(edges) + 1)))
+        self._lock = threading.Lock()
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value_ms: float):
+        """Count one measurement"""
+        index = bisect.bisect_left(self._edges, value_ms)
+        with self._lock:
+            self._counts[index] += 1
+            self.count += 1
+            self.total += value_ms
+            if value_ms > self.max:
+                self.max = value_ms
+
+    def percentile(self, fraction: float) -> float:
+        """
+        :param fraction: Between 0 and 1, e.g. 0.99 for the 99th percentile
+        :return: The upper edge of the bucket holding the percentile, capped at the largest measurement. 0 if empty
+        """
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            target = fraction * self.count
+            seen = 0
+            for index, bucket_count in enumerate(self._counts):
+                seen += bucket_count
+                if seen >= target and bucket_count:
+                    edge = self._edges[index] if index < len(self._edges) else self.max
+                    return min(edge, self.max)
+            return self.max
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self):
+        """Forget every measurement"""
+        with self._lock:
+            for index in range(len(self._counts)):
+                self._counts[index] = 0
+            self.count = 0
+            self.total = 0.0
+            self.max = 0.0
@@ -1,12 +1,13 @@
 """The swerve drive subsystem and other classes it relies on"""
 
 import math
-import time
+import threading
 from dataclasses import dataclass
 from functools import singledispatchmethod
-from typing import Callable, Optional, TYPE_CHECKING, Iterable
+from typing import Callable, Optional, TYPE_CHECKING, Iterable, Sequence
 
 import commands2
+import numpy as np
 from pathplannerlib.path import PathPlannerPath
 from pathplannerlib.commands import FollowPathCommand
 from pathplannerlib.controller import PPHolonomicDriveController
@@ -28,6 +29,16 @@ if TYPE_CHECKING:
 
 from swervepy import u
 from swervepy.abstract import SwerveModule, Gyro
+from swervepy.abstract.system import cosine_scale_batch
+from swervepy.initializer import wait_until
+from swervepy.kinematics import VectorizedSwerveKinematics
+from swervepy.odometry import OdometryThread
+from swervepy.posehistory import PoseHistory
+from swervepy.telemetry import TelemetryPublisher
+from swervepy.trajectory import COLUMNS, CompiledTrajectory, HEADING, MODULE_DIRECTIONS, OMEGA, VX, VY, X, Y
+
+# Robot loop cycles between publishing the odometry thread's timing statistics
+ODOMETRY_STATS_CYCLES = 50
 
 
 class SwerveDrive(commands2.Subsystem):
@@ -48,7 +59,12 @@ class SwerveDrive(commands2.Subsystem):
         gyro: Gyro,
         max_velocity: Quantity,
         max_angular_velocity: Quantity,
-        vision_pose_callback: Callable[[], Optional[Pose2d]] = lambda: None,
+        vision_pose_callback: Callable[[], Optional["VisionMeasurement | Pose2d"]] = lambda: None,
+        vectorized_kinematics: bool = False,
+        ready_timeout: float = 1.0,
+        odometry_frequency: Optional[float] = None,
+        pose_history_capacity: int = 500,
+        telemetry: Optional[TelemetryPublisher] = None,
     ):
         """
         Construct a swerve drivetrain as a Subsystem.
@@ -58,7 +74,19 @@ class SwerveDrive(commands2.Subsystem):
         :param max_velocity: The actual maximum velocity of the robot
         :param max_angular_velocity: The actual maximum angular (turning) velocity of the robot
         :param vision_pose_callback: An optional method that returns the robot's pose derived from vision.
-               This pose from this method is integrated into the robot's odometry.
+               This pose from this method is integrated into the robot's odometry. Return a VisionMeasurement to
+               supply the frame's capture timestamp and standard deviations; a bare Pose2d is treated as
+               captured at the moment it is returned.
+        :param vectorized_kinematics: Compute module states for all modules at once with NumPy instead of
+               through wpimath's kinematics objects. The result is the same; only the per-loop cost differs
+        :param ready_timeout: Longest time in seconds to wait for the modules and gyro to report usable readings
+               before resetting them
+        :param odometry_frequency: If set, sample module positions and the gyro on a separate thread at this rate
+               in Hz (100-250 Hz works well) instead of once per loop in periodic()
+        :param pose_history_capacity: Number of odometry updates kept for :meth:`pose_at`
+        :param telemetry: Publisher to add the drivetrain's telemetry to. By default one publishing under "Swerve"
+               is created, and published from periodic(). A publisher passed in is not published by the drive; its
+               owner must call its periodic() every loop
         """
 
         super().__init__()
@@ -66,13 +94,16 @@ class SwerveDrive(commands2.Subsystem):
         self._modules = modules
         self._gyro = gyro
         self._vision_pose_callback = vision_pose_callback
+        self._last_vision_timestamp = -math.inf
         self.max_velocity: float = max_velocity.m_as(u.m / u.s)
         self.max_angular_velocity: float = max_angular_velocity.m_as(u.rad / u.s)
         self.period_seconds = 0.02
 
-        # Pause init for a second before setting module offsets to avoid a bug related to inverting motors.
-        # Fixes https://github.com/Team364/BaseFalconSwerve/issues/8.
-        time.sleep(1)
+        # Wait for the hardware to finish configuring before setting module offsets to avoid a bug related to
+        # inverting motors. Fixes https://github.com/Team364/BaseFalconSwerve/issues/8.
+        # Simulated devices are ready immediately, so there is nothing to wait for.
+        if wpilib.RobotBase.isReal() and not wait_until(self._hardware_ready, ready_timeout):
+            wpilib.reportWarning(f"Swerve hardware was not ready after {ready_timeout:.1f} s", False)
         for module in self._modules:
             module.reset()
 
@@ -88,9 +119,30 @@ class SwerveDrive(commands2.Subsystem):
             wpimath.estimator, f"SwerveDrive{len(modules)}PoseEstimator"
         )(self._kinematics, self._gyro.heading, self.module_positions, Pose2d())
 
-        for i, module in enumerate(modules):
-            wpilib.SmartDashboard.putData(f"Module {i}", module)
-        wpilib.SmartDashboard.putData("Gyro", gyro)
+        self._vectorized_kinematics = (
+            VectorizedSwerveKinematics(module.placement for module in self._modules) if vectorized_kinematics else None
+        )
+        self._azimuth_angles = np.zeros(len(self._modules))
+
+        # Guards the pose estimator, which the odometry thread updates while the robot loop reads and resets it
+        self._odometry_lock = threading.RLock()
+        self._odometry_thread: Optional[OdometryThread] = None
+        self._odometry_cycles = 0
+        self._pose_history = PoseHistory(pose_history_capacity, len(self._modules))
+        if odometry_frequency:
+            self._odometry_thread = OdometryThread(
+                self._modules,
+                self._gyro,
+                self._odometry,
+                self._odometry_lock,
+                odometry_frequency,
+                history=self._pose_history,
+            )
+            self._odometry_thread.start()
+
+        self._owns_telemetry = telemetry is None
+        self.telemetry = TelemetryPublisher("Swerve") if telemetry is None else telemetry
+        self._add_telemetry(self.telemetry)
         # Field to plot auto trajectories and robot pose
         self.field = wpilib.Field2d()
         wpilib.SmartDashboard.putData(self.field)
@@ -101,21 +153,80 @@ class SwerveDrive(commands2.Subsystem):
             SysIdRoutine.Mechanism(self._sysid_drive, self._sysid_log, self, "drive"),
         )
 
-    def periodic(self):
-        vision_pose = self._vision_pose_callback()
-        # TODO: Add ability to specify custom timestamp
-        if vision_pose:
-            self._odometry.addVisionMeasurement(vision_pose, wpilib.Timer.getFPGATimestamp())
+    def _add_telemetry(self, telemetry: TelemetryPublisher):
+        # Module values are batched into one array per quantity, in module order
+        modules = self._modules
+        telemetry.add_module_states("Module States", lambda: self.module_states, deadband=0.005, match_rate_hz=25)
+        telemetry.add_module_states(
+            "Desired Module States",
+            lambda: [module.desired_state for module in modules],
+            deadband=0.005,
+            match_rate_hz=25,
+        )
+        telemetry.add_double("Heading (deg)", lambda: self.heading.degrees(), deadband=0.05, match_rate_hz=25)
+        telemetry.add_double_array(
+            "Drive Voltages", lambda: [module.drive_voltage for module in modules], rate_hz=10, deadband=0.05
+        )
+        telemetry.add_double_array(
+            "Drive Distances (m)", lambda: [module.drive_distance for module in modules], rate_hz=10, deadband=0.001
+        )
+        telemetry.add_double_array(
+            "Azimuth Velocities (radps)",
+            lambda: [module.azimuth_velocity for module in modules],
+            rate_hz=10,
+            deadband=0.01,
+        )
+        telemetry.add_double("HAL Calls Saved", lambda: self.hal_calls_saved, rate_hz=1)
 
-        robot_pose = self._odometry.update(self._gyro.heading, self.module_positions)
+    def _hardware_ready(self) -> bool:
+        return self._gyro.is_ready() and all(module.is_ready() for module in self._modules)
+
+    def periodic(self):
+        # Start a new cycle: every consumer this cycle shares one bulk sensor read per module
+        for module in self._modules:
+            module.invalidate_snapshot()
+
+        with self._odometry_lock:
+            if self._odometry_thread:
+                # Apply any samples the thread queued while the estimator was busy
+                self._odometry_thread.apply_pending()
+                robot_pose = self._odometry.getEstimatedPosition()
+            else:
+                timestamp = wpilib.Timer.getFPGATimestamp()
+                robot_pose = self._odometry.updateWithTime(timestamp, self._gyro.heading, self.module_positions)
+                self._pose_history.record(timestamp, robot_pose, [state.speed for state in self.module_states])
+
+            # Vision is fused after odometry so the estimator's history covers the measurement's capture time
+            measurement = self._vision_pose_callback()
+            if measurement:
+                self.add_vision_measurement(measurement)
+
+        if self._odometry_thread:
+            self._odometry_cycles += 1
+            if self._odometry_cycles % ODOMETRY_STATS_CYCLES == 0:
+                self._publish_odometry_stats()
+
+        if self._owns_telemetry:
+            self.telemetry.periodic()
 
         # Visualize robot position on field
         # self.field.setRobotPose(robot_pose)
 
+    def _publish_odometry_stats(self):
+        thread = self._odometry_thread
+        for name, histogram in (("Jitter", thread.jitter), ("Latency", thread.latency)):
+            wpilib.SmartDashboard.putNumber(f"Odometry/{name} p50 (ms)", histogram.percentile(0.5))
+            wpilib.SmartDashboard.putNumber(f"Odometry/{name} p99 (ms)", histogram.percentile(0.99))
+            wpilib.SmartDashboard.putNumber(f"Odometry/{name} max (ms)", histogram.max)
+        wpilib.SmartDashboard.putNumber("Odometry/Samples Applied", thread.samples_applied)
+        wpilib.SmartDashboard.putNumber("Odometry/Samples Discarded", thread.samples_discarded)
+
     def simulationPeriodic(self):
         # Run a periodic simulation method that updates sensor readings based on desired velocities and rotations
         for module in self._modules:
             module.simulation_periodic(self.period_seconds)
+            # The simulation step moved the module, so readings taken earlier this cycle are out of date
+            module.invalidate_snapshot()
 
         # Calculate the chassis angular velocity produced by the simulated swerve modules
         angular_velocity = self._kinematics.toChassisSpeeds(self.module_states).omega
@@ -129,6 +240,7 @@ class SwerveDrive(commands2.Subsystem):
         rotation: float,
         field_relative: bool,
         drive_open_loop: bool,
+        module_accelerations: Optional[np.ndarray] = None,
     ):
         """
         Drive the robot at the provided speeds (translation and rotation).
@@ -141,8 +253,25 @@ class SwerveDrive(commands2.Subsystem):
         :param field_relative: If True, gyroscopic zero is used as the forward direction.
                Else, forward faces the front of the robot.
         :param drive_open_loop: Use open loop (True) or closed loop (False) velocity control for driving the wheel
+        :param module_accelerations: (modules, 2) array of each module's robot-relative (x, y) acceleration in m/s^2,
+               applied as drive feedforward in closed loop control. See :func:`module_accelerations_from_forces`
         """
 
+        if self._vectorized_kinematics:
+            speeds, angles = self._vectorized_kinematics.calculate(
+                translation.x,
+                translation.y,
+                rotation,
+                self._read_azimuth_angles(),
+                self.max_velocity,
+                self.period_seconds,
+                self._gyro.heading.radians() if field_relative else 0.0,
+                field_relative,
+                rotate_in_place=False,
+            )
+            self._desire_optimized_states(speeds, angles, drive_open_loop, module_accelerations)
+            return
+
         speeds = (
             ChassisSpeeds.fromFieldRelativeSpeeds(translation.x, translation.y, rotation, self._gyro.heading)
             if field_relative
@@ -151,10 +280,17 @@ class SwerveDrive(commands2.Subsystem):
         speeds = ChassisSpeeds.discretize(speeds, self.period_seconds)
         swerve_module_states = self._kinematics.toSwerveModuleStates(speeds)
 
-        self.desire_module_states(swerve_module_states, drive_open_loop, rotate_in_place=False)
+        self.desire_module_states(
+            swerve_module_states, drive_open_loop, rotate_in_place=False, accelerations=module_accelerations
+        )
 
     @drive.register
-    def _(self, chassis_speeds: ChassisSpeeds, drive_open_loop: bool):
+    def _(
+        self,
+        chassis_speeds: ChassisSpeeds,
+        drive_open_loop: bool,
+        module_accelerations: Optional[np.ndarray] = None,
+    ):
         """
         Alternative method to drive the robot at a set of chassis speeds (exclusively robot-relative).
 
@@ -163,16 +299,19 @@ class SwerveDrive(commands2.Subsystem):
 
         :param chassis_speeds: Robot-relative speeds on the XY-plane in m/s where +X is forward and +Y is left
         :param drive_open_loop: Use open loop (True) or closed loop (False) velocity control for driving the wheel
+        :param module_accelerations: (modules, 2) array of each module's robot-relative (x, y) acceleration in m/s^2,
+               applied as drive feedforward in closed loop control
         """
 
         translation = Translation2d(chassis_speeds.vx, chassis_speeds.vy)
-        return self.drive(translation, chassis_speeds.omega, False, drive_open_loop)
+        return self.drive(translation, chassis_speeds.omega, False, drive_open_loop, module_accelerations)
 
     def desire_module_states(
         self,
         states: tuple[SwerveModuleState, ...],
         drive_open_loop: bool = False,
         rotate_in_place: bool = True,
+        accelerations: Optional[np.ndarray] = None,
     ):
         """
         Command each individual module to a state (consisting of velocity and rotation)
@@ -180,13 +319,55 @@ class SwerveDrive(commands2.Subsystem):
         :param states: List of module states in the order of the swerve module list SwerveDrive was created with
         :param drive_open_loop: Use open loop (True) or closed loop (False) velocity control for driving the wheel
         :param rotate_in_place: Should the modules rotate while not driving
+        :param accelerations: (modules, 2) array of each module's robot-relative (x, y) acceleration in m/s^2
         """
 
+        if self._vectorized_kinematics:
+            speeds, angles = self._vectorized_kinematics.calculate_from_states(
+                [state.speed for state in states],
+                [state.angle.degrees() for state in states],
+                self._read_azimuth_angles(),
+                self.max_velocity,
+                rotate_in_place,
+            )
+            self._desire_optimized_states(speeds, angles, drive_open_loop, accelerations)
+            return
+
         swerve_module_states = self._kinematics.desaturateWheelSpeeds(states, self.max_velocity)  # type: ignore
+        module_accelerations = accelerations.tolist() if accelerations is not None else [None] * len(self._modules)
 
         for i in range(len(self._modules)):
             module: SwerveModule = self._modules[i]
-            module.desire_state(swerve_module_states[i], drive_open_loop, rotate_in_place)
+            module.desire_state(swerve_module_states[i], drive_open_loop, rotate_in_place, module_accelerations[i])
+
+    def _read_azimuth_angles(self) -> np.ndarray:
+        for i, module in enumerate(self._modules):
+            self._azimuth_angles[i] = module.azimuth_angle.degrees()
+        return self._azimuth_angles
+
+    def _desire_optimized_states(
+        self,
+        speeds: np.ndarray,
+        angles: np.ndarray,
+        drive_open_loop: bool,
+        accelerations: Optional[np.ndarray] = None,
+    ):
+        # States from the vectorized kinematics are already desaturated and optimized,
+        # so they bypass SwerveModule.desire_state
+        if accelerations is None:
+            wheel_accelerations = [0.0] * len(self._modules)
+        else:
+            # The part of each module's acceleration along its wheel, cosine scaled like the speeds
+            radians = np.radians(angles)
+            wheel_accelerations = accelerations[:, 0] * np.cos(radians) + accelerations[:, 1] * np.sin(radians)
+            cosine_scale_batch(wheel_accelerations, angles, self._azimuth_angles)
+            wheel_accelerations = wheel_accelerations.tolist()
+
+        for module, speed, angle, acceleration in zip(
+            self._modules, speeds.tolist(), angles.tolist(), wheel_accelerations
+        ):
+            module.desire_drive_velocity(speed, drive_open_loop, acceleration)
+            module.desire_azimuth_angle(Rotation2d.fromDegrees(angle))
 
     @property
     def module_states(self) -> tuple[SwerveModuleState, ...]:
@@ -200,8 +381,29 @@ class SwerveDrive(commands2.Subsystem):
 
     @property
     def pose(self) -> Pose2d:
-        """The robot's pose on the field (position and heading)"""
-        return self._odometry.getEstimatedPosition()
+        """The robot's pose on the field (position and heading). Safe to read from any thread"""
+        with self._odometry_lock:
+            return self._odometry.getEstimatedPosition()
+
+    def pose_at(self, timestamp: float) -> Optional[Pose2d]:
+        """
+        The robot's estimated pose at a past moment, interpolated between odometry updates. Safe to call from any thread
+
+        :param timestamp: FPGA time in seconds, as from wpilib.Timer.getFPGATimestamp()
+        :return: The pose at that time, the latest pose if the time is in the future, or None if the time is older than
+                 the pose history or before the last call to :meth:`reset_odometry`
+        """
+        return self._pose_history.pose_at(timestamp)
+
+    @property
+    def pose_history(self) -> PoseHistory:
+        """Every recent odometry update, with module speeds. See :meth:`PoseHistory.sample_at`"""
+        return self._pose_history
+
+    @property
+    def odometry_thread(self) -> Optional[OdometryThread]:
+        """The thread sampling odometry, if SwerveDrive was created with an odometry_frequency"""
+        return self._odometry_thread
 
     @property
     def heading(self) -> Rotation2d:
@@ -211,22 +413,29 @@ class SwerveDrive(commands2.Subsystem):
     @property
     def robot_relative_speeds(self) -> ChassisSpeeds:
         """The robot's translational and rotational speeds"""
-        module_states = tuple(module.module_state for module in self._modules)
-        return self._kinematics.toChassisSpeeds(module_states)
+        return self._kinematics.toChassisSpeeds(self.module_states)
+
+    @property
+    def hal_calls_saved(self) -> int:
+        """How many hardware sensor calls the modules' per-cycle snapshot caches have avoided"""
+        return sum(module.hal_calls_saved for module in self._modules)
 
     def reset_modules(self):
-        for module in self._modules:
-            module.reset()
+        with self._odometry_lock:
+            for module in self._modules:
+                module.reset()
 
-        # Any time encoder distances are reset, odometry must also be reset
-        self.reset_odometry(self.pose)
+            # Any time encoder distances are reset, odometry must also be reset
+            self.reset_odometry(self.pose)
 
     def zero_heading(self):
         """Set the chassis' current heading as "zero" or straight forward"""
-        self._gyro.zero_heading()
+        with self._odometry_lock:
+            self._gyro.zero_heading()
+            self._invalidate_odometry_samples()
 
-        # Any time gyro angle is reset, odometry must also be reset
-        self._odometry.resetPosition(Rotation2d(), self.module_positions, self.pose)
+            # Any time gyro angle is reset, odometry must also be reset
+            self._odometry.resetPosition(Rotation2d(), self.module_positions, self.pose)
 
     def reset_odometry(self, pose: Pose2d):
         """
@@ -235,14 +444,46 @@ class SwerveDrive(commands2.Subsystem):
         :param pose: The new pose
         """
 
-        self._odometry.resetPosition(self._gyro.heading, self.module_positions, pose)  # type: ignore
+        with self._odometry_lock:
+            self._invalidate_odometry_samples()
+            self._odometry.resetPosition(self._gyro.heading, self.module_positions, pose)  # type: ignore
+            # The recorded path no longer leads to the new pose
+            self._pose_history.clear()
+
+    def _invalidate_odometry_samples(self):
+        # Samples taken before a reset hold the old encoder distances or heading
+        if self._odometry_thread:
+            self._odometry_thread.invalidate()
 
     def reset_odometry_to_vision(self):
         """Reset the robot's pose to the vision pose estimation"""
         estimated_pose = self._vision_pose_callback()
+        if isinstance(estimated_pose, VisionMeasurement):
+            estimated_pose = estimated_pose.pose
         if estimated_pose:
             self.reset_odometry(estimated_pose)
 
+    def add_vision_measurement(self, measurement: "VisionMeasurement | Pose2d"):
+        """
+        Fuse a vision pose into odometry. The pose estimator replays the measurement against its odometry history at
+        the capture timestamp, so latency between capturing a frame and receiving its pose does not skew the estimate.
+
+        :param measurement: The measurement. A bare Pose2d is treated as captured now
+        """
+        if isinstance(measurement, Pose2d):
+            measurement = VisionMeasurement(measurement, wpilib.Timer.getFPGATimestamp())
+
+        # Callbacks are polled every cycle, but a new measurement only arrives with a new camera frame
+        if measurement.timestamp <= self._last_vision_timestamp:
+            return
+        self._last_vision_timestamp = measurement.timestamp
+
+        with self._odometry_lock:
+            if measurement.std_devs:
+                self._odometry.addVisionMeasurement(measurement.pose, measurement.timestamp, measurement.std_devs)
+            else:
+                self._odometry.addVisionMeasurement(measurement.pose, measurement.timestamp)
+
     def _sysid_drive(self, volts: float):
         """
         Drive all wheels at the specified voltage and lock them forward
@@ -301,7 +542,7 @@ class SwerveDrive(commands2.Subsystem):
 
     def follow_trajectory_command(
         self,
-        path: PathPlannerPath,
+        path: "PathPlannerPath | CompiledTrajectory",
         parameters: "TrajectoryFollowerParameters",
         robotConfig: "RobotConfig",
         first_path: bool = False,
@@ -311,8 +552,10 @@ class SwerveDrive(commands2.Subsystem):
         """
         Construct a command that follows a trajectory
 
-        :param path: The path to follow
+        :param path: The path to follow. A CompiledTrajectory (see swervepy.trajectory) is followed by swervepy's own
+               follower, which samples it by time and costs less per cycle than PathPlanner's
         :param parameters: Options that determine how the robot will follow the trajectory
+        :param robotConfig: The robot's physical properties. Its mass turns trajectory forces into feedforward
         :param first_path: If True, the robot's pose will be reset to the trajectory's initial pose
         :param drive_open_loop: Use open loop control (True) or closed loop (False) to swerve module speeds. Closed-loop
                positional control will always be used for trajectory following
@@ -321,6 +564,11 @@ class SwerveDrive(commands2.Subsystem):
         :return: Trajectory-follower command
         """
 
+        if isinstance(path, CompiledTrajectory):
+            return _TrajectoryFollowerCommand(
+                self, path, parameters, robotConfig.massKG, first_path, drive_open_loop, flip_path
+            )
+
         # TODO: Re-impl trajectory visualisation on Field2d
 
         # Find the drive base radius (the distance from the center of the robot to the furthest module)
@@ -334,12 +582,24 @@ class SwerveDrive(commands2.Subsystem):
             radius
         )
         
+        # PathPlanner gives module feedforwards in the order of the config's module locations
+        module_order = self.module_order(robotConfig.moduleLocations)
+
         # Trajectory follower command
         command = FollowPathCommand(
             path,
             lambda: self.pose,
             lambda: self.robot_relative_speeds,
-            lambda speeds, feedforwards: self.drive(speeds, drive_open_loop=drive_open_loop),
+            lambda speeds, feedforwards: self.drive(
+                speeds,
+                drive_open_loop,
+                module_accelerations_from_forces(
+                    feedforwards.robotRelativeForcesXNewtons,
+                    feedforwards.robotRelativeForcesYNewtons,
+                    robotConfig.massKG,
+                    module_order,
+                ),
+            ),
             controller,
             robotConfig,
             flip_path,
@@ -353,6 +613,22 @@ class SwerveDrive(commands2.Subsystem):
 
         return command
 
+    def module_order(self, locations: Sequence[Translation2d]) -> list[int]:
+        """
+        Match the modules to another list of module locations, e.g. the order a path planner gives feedforwards in
+
+        :param locations: Module locations, or just their directions from the robot's centre
+        :return: For each of this drive's modules, the index of the location pointing the same way from the centre
+        """
+
+        def angle_between(location: Translation2d, placement: Translation2d) -> float:
+            return abs((location.angle() - placement.angle()).radians())
+
+        return [
+            min(range(len(locations)), key=lambda i: angle_between(locations[i], module.placement))
+            for module in self._modules
+        ]
+
     def sys_id_quasistatic(self, direction: SysIdRoutine.Direction) -> commands2.Command:
         """
         Run a quasistatic characterization test. The robot will move until this command is cancelled.
@@ -420,6 +696,94 @@ class _TeleOpCommand(commands2.Command):
         self.open_loop = not self.open_loop
 
 
+class _TrajectoryFollowerCommand(commands2.Command):
+    """
+    Follows a compiled trajectory by time. Each cycle interpolates the trajectory's state, drives at its speeds plus
+    proportional corrections for position and heading error, and feeds each module's share of the trajectory's forces
+    forward as drive acceleration. Per-cycle state lives in preallocated arrays.
+    """
+
+    def __init__(
+        self,
+        swerve: SwerveDrive,
+        trajectory: CompiledTrajectory,
+        parameters: "TrajectoryFollowerParameters",
+        mass_kg: float,
+        first_path: bool,
+        drive_open_loop: bool,
+        flip_path: Callable[[], bool],
+    ):
+        super().__init__()
+        self.addRequirements(swerve)
+        self.setName(f"Follow {trajectory.name}")
+
+        self._swerve = swerve
+        self._trajectory = trajectory
+        self._xy_kP = parameters.xy_kP
+        self._theta_kP = parameters.theta_kP
+        self._mass_kg = mass_kg
+        self._first_path = first_path
+        self._open_loop = drive_open_loop
+        self._flip_path = flip_path
+        self._timer = wpilib.Timer()
+        # The trajectory being followed, mirrored if flip_path was True when the command started
+        self._active = trajectory
+
+        self._target = np.zeros(trajectory.samples.shape[1])
+        self._has_forces = trajectory.module_count == len(MODULE_DIRECTIONS)
+        self._module_order = np.array(swerve.module_order(MODULE_DIRECTIONS))
+        self._forces = np.zeros((2, len(self._module_order)))
+        self._accelerations = np.zeros((len(self._module_order), 2))
+
+    def initialize(self):
+        self._active = self._trajectory.flipped() if self._flip_path() else self._trajectory
+        if self._first_path:
+            self._swerve.reset_odometry(self._active.initial_pose)
+        self._timer.restart()
+
+    def execute(self):
+        target = self._active.sample_into(self._timer.get(), self._target)
+        pose = self._swerve.pose
+        heading = pose.rotation()
+
+        # Trajectory speeds as feedforward, plus feedback on the position and heading error
+        vx = target[VX] + self._xy_kP * (target[X] - pose.X())
+        vy = target[VY] + self._xy_kP * (target[Y] - pose.Y())
+        omega = target[OMEGA] + self._theta_kP * math.remainder(target[HEADING] - heading.radians(), math.tau)
+
+        accelerations = None
+        if self._has_forces:
+            accelerations = self._accelerations
+            forces = self._forces
+            np.take(target[len(COLUMNS) :].reshape(2, -1), self._module_order, axis=1, out=forces)
+            # Rotate the field-relative forces into the robot's frame, and divide by each module's share of the mass
+            scale = len(self._module_order) / self._mass_kg
+            cos, sin = heading.cos() * scale, heading.sin() * scale
+            np.multiply(forces[0], cos, out=accelerations[:, 0])
+            accelerations[:, 0] += forces[1] * sin
+            np.multiply(forces[1], cos, out=accelerations[:, 1])
+            accelerations[:, 1] -= forces[0] * sin
+
+        self._swerve.drive(
+            ChassisSpeeds.fromFieldRelativeSpeeds(vx, vy, omega, heading), self._open_loop, accelerations
+        )
+
+    def isFinished(self) -> bool:
+        return self._timer.hasElapsed(self._active.duration)
+
+    def end(self, interrupted: bool):
+        self._swerve.drive(ChassisSpeeds(), self._open_loop)
+
+
+@dataclass(frozen=True)
+class VisionMeasurement:
+    pose: Pose2d
+    # FPGA time in seconds at which the camera frame was captured
+    timestamp: float
+    # Standard deviations of the x (m), y (m) and heading (rad) measurements. None uses the estimator's defaults
+    std_devs: Optional[tuple[float, float, float]] = None
+
+
 @dataclass
 class TrajectoryFollowerParameters:
     max_drive_velocity: Quantity
@@ -451,6 +815,24 @@ class RobotConfigControls:
 """
     config:RobotConfig
 
+def module_accelerations_from_forces(
+    forces_x: Sequence[float], forces_y: Sequence[float], mass_kg: float, order: Sequence[int]
+) -> Optional[np.ndarray]:
+    """
+    Turn the force each module applies into the acceleration it gives that module's share of the robot's mass
+
+    :param forces_x: Each module's x force in N
+    :param forces_y: Each module's y force in N
+    :param mass_kg: The robot's mass
+    :param order: For each of the drive's modules, the index of its force (see :meth:`SwerveDrive.module_order`)
+    :return: (modules, 2) array of (x, y) accelerations in m/s^2 in the same frame as the forces, or None if no
+             forces were given
+    """
+    if len(forces_x) != len(order):
+        return None
+    return np.column_stack((np.take(forces_x, order), np.take(forces_y, order))) * (len(order) / mass_kg)
+
+
 def greatest_distance_from_translations(translations: Iterable[Translation2d]):
     """
     Calculates the magnitude of the longest translation from a list of translations.
@@ -0,0 +1,195 @@
+"""Publishes telemetry to NetworkTables at chosen rates, only when values change"""
+
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional, Sequence
+
+import ntcore
+import wpilib
+from wpimath.kinematics import SwerveModuleState
+
+from .stats import Histogram
+
+# Seconds a loop may run early and still read a signal that is due, so jitter does not skip reads
+DUE_TOLERANCE = 0.002
+
+
+@dataclass
+class Signal:
+    """One published value and when to publish it"""
+
+    name: str
+    getter: Callable[[], Any]
+    publish: Callable[[Any], None]
+    # Turns a value into the numbers compared against the deadband
+    flatten: Callable[[Any], Sequence[float]]
+    period: float  # Seconds between reads outside matches
+    match_period: Optional[float]  # Seconds between reads in low-bandwidth mode. None to not publish at all
+    deadband: float  # Smallest change in any number of the value that is published
+    next_time: float = 0.0
+    last: Optional[tuple[float, ...]] = field(default=None, repr=False)
+
+
+def flatten_module_states(states: Sequence[SwerveModuleState]) -> list[float]:
+    """Each module's speed and angle in radians, for comparing module states against a deadband"""
+    flat = []
+    for state in states:
+        flat.append(state.speed)
+        flat.append(state.angle.radians())
+    return flat
+
+
+class TelemetryPublisher:
+    """
+    Publishes values to NetworkTables topics, replacing per-property Sendables that read every value every loop.
+
+    Each signal has its own rate, and its getter is only called when it is due, so slow-changing values cost nothing
+    between reads. A value is only sent when some part of it has changed by more than the signal's deadband. Groups
+    of values such as module states go out as one struct array topic rather than many doubles.
+
+    During matches (when the FMS is attached) the publisher switches to low-bandwidth mode, where signals use their
+    match rate and signals without one are not published. The time spent publishing is measured and published
+    alongside.
+    """
+
+    def __init__(
+        self,
+        table: str | ntcore.NetworkTable = "Telemetry",
+        low_bandwidth: Optional[bool] = None,
+        stats_period: float = 1.0,
+    ):
+        """
+        :param table: NetworkTables table to publish under, or its name in the default instance
+        :param low_bandwidth: Always (True) or never (False) use low-bandwidth mode. By default it is used while the
+               FMS is attached
+        :param stats_period: Seconds between publishing the publisher's own cost
+        """
+        if isinstance(table, str):
+            table = ntcore.NetworkTableInstance.getDefault().getTable(table)
+        self._table = table
+        self._low_bandwidth = low_bandwidth
+        self._signals: list[Signal] = []
+
+        # Milliseconds each call to periodic() takes
+        self.cost = Histogram()
+        self.values_published = 0
+        self.values_unchanged = 0
+        self._stats_period = stats_period
+        self._next_stats_time = 0.0
+        self._cost_publisher = table.getDoubleArrayTopic("Cost (ms)").publish()
+        self._published_publisher = table.getIntegerTopic("Values Published").publish()
+
+    def add_double(
+        self,
+        name: str,
+        getter: Callable[[], float],
+        rate_hz: float = 50,
+        deadband: float = 0.0,
+        match_rate_hz: Optional[float] = None,
+    ) -> Signal:
+        """
+        :param name: Topic name within the table
+        :param getter: Reads the value
+        :param rate_hz: Most times per second to read and publish the value
+        :param deadband: Smallest change that is published
+        :param match_rate_hz: Rate in low-bandwidth mode. None to not publish the value in low-bandwidth mode
+        """
+        publisher = self._table.getDoubleTopic(name).publish()
+        return self._add(
+            Signal(name, getter, publisher.set, _flatten_scalar, *_periods(rate_hz, match_rate_hz), deadband)
+        )
+
+    def add_double_array(
+        self,
+        name: str,
+        getter: Callable[[], Sequence[float]],
+        rate_hz: float = 50,
+        deadband: float = 0.0,
+        match_rate_hz: Optional[float] = None,
+    ) -> Signal:
+        """Publish a group of numbers as one topic. Parameters are as for :meth:`add_double`"""
+        publisher = self._table.getDoubleArrayTopic(name).publish()
+        return self._add(Signal(name, getter, publisher.set, list, *_periods(rate_hz, match_rate_hz), deadband))
+
+    def add_module_states(
+        self,
+        name: str,
+        getter: Callable[[], Sequence[SwerveModuleState]],
+        rate_hz: float = 50,
+        deadband: float = 0.0,
+        match_rate_hz: Optional[float] = None,
+    ) -> Signal:
+        """
+        Publish module states as one SwerveModuleState[] struct topic, which AdvantageScope shows as a swerve diagram.
+        The deadband applies to speeds in m/s and angles in radians. Other parameters are as for :meth:`add_double`
+        """
+        publisher = self._table.getStructArrayTopic(name, SwerveModuleState).publish()
+        return self._add(
+            Signal(name, getter, publisher.set, flatten_module_states, *_periods(rate_hz, match_rate_hz), deadband)
+        )
+
+    def _add(self, signal: Signal) -> Signal:
+        self._signals.append(signal)
+        return signal
+
+    @property
+    def low_bandwidth(self) -> bool:
+        if self._low_bandwidth is None:
+            return wpilib.DriverStation.isFMSAttached()
+        return self._low_bandwidth
+
+    def periodic(self, now: Optional[float] = None):
+        """
+        Publish every signal that is due and has changed. Call once per robot loop
+
+        :param now: Time in seconds. Defaults to the FPGA time
+        """
+        start = time.perf_counter()
+        if now is None:
+            now = wpilib.Timer.getFPGATimestamp()
+        low_bandwidth = self.low_bandwidth
+
+        for signal in self._signals:
+            if now < signal.next_time - DUE_TOLERANCE:
+                continue
+            period = signal.match_period if low_bandwidth else signal.period
+            if period is None:
+                continue
+            # Keep to the signal's average rate through loop jitter, without a burst of catch-up reads after a stall
+            signal.next_time = max(signal.next_time + period, now + period / 2)
+
+            value = signal.getter()
+            flat = tuple(signal.flatten(value))
+            if signal.last is not None and not _changed(signal.last, flat, signal.deadband):
+                self.values_unchanged += 1
+                continue
+            signal.publish(value)
+            signal.last = flat
+            self.values_published += 1
+
+        self.cost.record((time.perf_counter() - start) * 1000)
+        if now >= self._next_stats_time:
+            self._next_stats_time = now + self._stats_period
+            self._publish_stats()
+
+    def _publish_stats(self):
+        self._cost_publisher.set([self.cost.percentile(0.5), self.cost.percentile(0.99), self.cost.max])
+        self._published_publisher.set(self.values_published)
+        self.cost.reset()
+
+
+def _periods(rate_hz: float, match_rate_hz: Optional[float]) -> tuple[float, Optional[float]]:
+    return 1 / rate_hz, None if match_rate_hz is None else 1 / match_rate_hz
+
+
+def _flatten_scalar(value: float) -> tuple[float]:
+    return (value,)
+
+
+def _changed(last: tuple[float, ...], current: tuple[float, ...], deadband: float) -> bool:
+    if len(last) != len(current):
+        return True
+    for before, after in zip(last, current):
+        if abs(after - before) > deadband:
+            return True
+    return False
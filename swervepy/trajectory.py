@@ -0,0 +1,245 @@
+"""
+Choreo trajectories compiled into a compact binary format, and loaded by memory-mapping them.
+
+Choreo's .traj files are JSON with the whole editor state alongside the samples, which is slow to parse on the
+roboRIO. Compile them before deploying with::
+
+    python -m swervepy.trajectory deploy/choreo
+
+This writes a .ctraj file next to each .traj file. A .ctraj file is a small header followed by one row of float64
+values per sample (see ``COLUMNS``), so loading it is a single memory map with no parsing. Compiled files are build
+outputs and are not committed; :func:`load_trajectory` compiles any that are missing or out of date.
+"""
+
+import argparse
+import bisect
+import json
+import math
+import os
+import struct
+from typing import Optional
+
+import numpy as np
+import wpilib
+from wpimath.geometry import Pose2d, Rotation2d, Translation2d
+
+MAGIC = b"SWTJ"
+FORMAT_VERSION = 1
+# Magic, format version, module count, sample count, padded so the samples start 8-byte aligned
+HEADER = struct.Struct("<4sHHI4x")
+EXTENSION = ".ctraj"
+
+# Columns of each sample row, followed by the x and then the y component of each module's force (N)
+COLUMNS = ("t", "x", "y", "heading", "vx", "vy", "omega", "ax", "ay", "alpha")
+T, X, Y, HEADING, VX, VY, OMEGA, AX, AY, ALPHA = range(len(COLUMNS))
+
+# Choreo gives module forces front left, front right, back left, back right. Directions of those modules from the
+# robot's centre, to match them to SwerveDrive's modules
+MODULE_DIRECTIONS = (Translation2d(1, 1), Translation2d(1, -1), Translation2d(-1, 1), Translation2d(-1, -1))
+
+# Field size used to mirror a trajectory for the red alliance. REEFSCAPE's field is rotationally symmetric
+FIELD_LENGTH = 17.548
+FIELD_WIDTH = 8.052
+
+
+class CompiledTrajectory:
+    """
+    A trajectory's samples as one (samples, columns) array. The array is read-only when memory-mapped from a file.
+    Positions and velocities are field-relative, in metres, radians and seconds.
+    """
+
+    def __init__(self, samples: np.ndarray, module_count: int, name: str = ""):
+        """
+        :param samples: One row per sample, with the columns in ``COLUMNS`` followed by the module forces
+        :param module_count: Number of swerve modules the forces are given for
+        :param name: Name of the trajectory, e.g. its file name
+        """
+        self.samples = samples
+        self.module_count = module_count
+        self.name = name
+        self._flipped: Optional["CompiledTrajectory"] = None
+        # Sample times as Python floats, which bisect searches faster than numpy searches a small array
+        self._times: list[float] = self.samples[:, T].tolist()
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self.samples[:, T]
+
+    @property
+    def duration(self) -> float:
+        return float(self.samples[-1, T])
+
+    @property
+    def module_forces_x(self) -> np.ndarray:
+        """(samples, modules) array of each module's field-relative x force in N"""
+        return self.samples[:, len(COLUMNS) : len(COLUMNS) + self.module_count]
+
+    @property
+    def module_forces_y(self) -> np.ndarray:
+        """(samples, modules) array of each module's field-relative y force in N"""
+        return self.samples[:, len(COLUMNS) + self.module_count :]
+
+    def pose(self, index: int) -> Pose2d:
+        row = self.samples[index]
+        return Pose2d(float(row[X]), float(row[Y]), Rotation2d(float(row[HEADING])))
+
+    @property
+    def initial_pose(self) -> Pose2d:
+        return self.pose(0)
+
+    def index_at(self, time: float) -> int:
+        """
+        :param time: Seconds since the start of the trajectory
+        :return: Index of the last sample at or before the time, clamped to the trajectory
+        """
+        index = bisect.bisect_right(self._times, time) - 1
+        return min(max(index, 0), len(self._times) - 1)
+
+    def sample_into(self, time: float, out: np.ndarray) -> np.ndarray:
+        """
+        Interpolate the trajectory's state at a time, without allocating a new array
+
+        :param time: Seconds since the start of the trajectory. Clamped to the trajectory
+        :param out: Array with one element per column of ``samples``, overwritten with the state
+        :return: ``out``
+        """
+        index = self.index_at(time)
+        before = self.samples[index]
+        if index == len(self._times) - 1 or time <= self._times[index]:
+            out[:] = before
+            return out
+
+        after = self.samples[index + 1]
+        fraction = (time - self._times[index]) / (self._times[index + 1] - self._times[index])
+        np.subtract(after, before, out=out)
+        out *= fraction
+        out += before
+        # Turn the short way around between the two headings
+        out[HEADING] = before[HEADING] + math.remainder(after[HEADING] - before[HEADING], math.tau) * fraction
+        out[T] = time
+        return out
+
+    def flipped(self) -> "CompiledTrajectory":
+        """
+        :return: The trajectory mirrored for the red alliance, by rotating it half a turn about the field's centre.
+                 Computed once and kept
+        """
+        if self._flipped is None:
+            samples = np.array(self.samples)
+            samples[:, X] = FIELD_LENGTH - samples[:, X]
+            samples[:, Y] = FIELD_WIDTH - samples[:, Y]
+            samples[:, HEADING] = np.remainder(samples[:, HEADING], 2 * math.pi) - math.pi
+            # Field-relative vectors point the opposite way; rotation is unchanged
+            samples[:, [VX, VY, AX, AY]] *= -1
+            samples[:, len(COLUMNS) :] *= -1
+            self._flipped = CompiledTrajectory(samples, self.module_count, self.name)
+        return self._flipped
+
+
+def compile_trajectory(source: str, destination: str) -> int:
+    """
+    Compile a Choreo .traj file
+
+    :param source: Path of the .traj file
+    :param destination: Path of the compiled file to write
+    :return: Size of the compiled file in bytes
+    """
+    with open(source) as file:
+        samples = json.load(file)["trajectory"]["samples"]
+
+    module_count = len(samples[0].get("fx", ())) if samples else 0
+    rows = np.zeros((len(samples), len(COLUMNS) + 2 * module_count), dtype="<f8")
+    for i, sample in enumerate(samples):
+        rows[i, : len(COLUMNS)] = [sample[column] for column in COLUMNS]
+        if module_count:
+            rows[i, len(COLUMNS) : len(COLUMNS) + module_count] = sample["fx"]
+            rows[i, len(COLUMNS) + module_count :] = sample["fy"]
+
+    # Write to a temporary file and swap it in, so a robot loading the trajectory never sees half a file
+    temporary = f"{destination}.tmp"
+    with open(temporary, "wb") as file:
+        file.write(HEADER.pack(MAGIC, FORMAT_VERSION, module_count, len(samples)))
+        file.write(rows.tobytes())
+    os.replace(temporary, destination)
+    return HEADER.size + rows.nbytes
+
+
+def read_compiled(path: str) -> CompiledTrajectory:
+    """
+    Memory-map a compiled trajectory
+
+    :param path: Path of the .ctraj file
+    :raises ValueError: If the file is not a compiled trajectory of this format version
+    """
+    with open(path, "rb") as file:
+        header = file.read(HEADER.size)
+    if len(header) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a compiled trajectory")
+    magic, version, module_count, sample_count = HEADER.unpack(header)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a version {FORMAT_VERSION} compiled trajectory")
+
+    samples = np.memmap(
+        path, dtype="<f8", mode="r", offset=HEADER.size, shape=(sample_count, len(COLUMNS) + 2 * module_count)
+    )
+    name = os.path.splitext(os.path.basename(path))[0]
+    return CompiledTrajectory(samples, module_count, name)
+
+
+def load_trajectory(name: str, directory: Optional[str] = None) -> CompiledTrajectory:
+    """
+    Load a trajectory by name, compiling it first if the compiled file is missing or older than the .traj file
+
+    :param name: The trajectory's file name, without an extension
+    :param directory: Directory holding the trajectory. Defaults to deploy/choreo
+    """
+    if directory is None:
+        directory = os.path.join(wpilib.getDeployDirectory(), "choreo")
+    source = os.path.join(directory, f"{name}.traj")
+    compiled = os.path.join(directory, f"{name}{EXTENSION}")
+
+    if _is_stale(source, compiled):
+        wpilib.reportWarning(f"Trajectory {name} was not compiled before deploying; compiling it now", False)
+        compile_trajectory(source, compiled)
+    return read_compiled(compiled)
+
+
+def compile_directory(directory: str) -> list[str]:
+    """
+    Compile every .traj file in a directory that is missing an up-to-date compiled file
+
+    :return: Paths of the files compiled
+    """
+    compiled = []
+    for file in sorted(os.listdir(directory)):
+        if not file.endswith(".traj"):
+            continue
+        source = os.path.join(directory, file)
+        destination = os.path.splitext(source)[0] + EXTENSION
+        if _is_stale(source, destination):
+            compile_trajectory(source, destination)
+            compiled.append(destination)
+    return compiled
+
+
+def _is_stale(source: str, compiled: str) -> bool:
+    try:
+        return os.path.getmtime(compiled) < os.path.getmtime(source)
+    except OSError:
+        return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile Choreo trajectories for swervepy")
+    parser.add_argument("directory", nargs="?", default=os.path.join("deploy", "choreo"))
+    args = parser.parse_args()
+
+    for path in compile_directory(args.directory):
+        print(f"Compiled {path} ({os.path.getsize(path)} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import dataclasses
+
+from swervepy.configcache import ConfigCache, fingerprint
+
+
+@dataclasses.dataclass
+class Parameters:
+    kP: float
+    gear_ratio: float
+
+
+def test_fingerprint_tracks_every_field():
+    base = fingerprint(Parameters(0.1, 6.75), 1)
+
+    assert fingerprint(Parameters(0.1, 6.75), 1) == base
+    assert fingerprint(Parameters(0.2, 6.75), 1) != base
+    assert fingerprint(Parameters(0.1, 8.14), 1) != base
+    assert fingerprint(Parameters(0.1, 6.75), 2) != base
+
+
+def test_cache_persists_between_boots(tmp_path):
+    path = str(tmp_path / "cache.json")
+    cache = ConfigCache(path)
+    assert not cache.matches("SPARK MAX 1", "abc")
+
+    cache.store("SPARK MAX 1", "abc")
+
+    reloaded = ConfigCache(path)
+    assert reloaded.matches("SPARK MAX 1", "abc")
+    assert not reloaded.matches("SPARK MAX 1", "def")
+    assert not reloaded.matches("SPARK MAX 2", "abc")
+
+
+def test_corrupt_cache_is_ignored(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{not json")
+
+    assert not ConfigCache(str(path)).matches("SPARK MAX 1", "abc")
@@ -0,0 +1,60 @@
+import random
+
+import numpy as np
+import pytest
+from wpimath.geometry import Rotation2d
+
+from swervepy import conversions
+from swervepy.conversions import FalconConversion
+
+GEAR_RATIO = 6.75
+CIRCUMFERENCE = 0.319
+
+
+@pytest.fixture
+def readings():
+    rng = random.Random(364)
+    return [rng.uniform(-50_000, 50_000) for _ in range(100)]
+
+
+def test_scalar_conversions_match_functions(readings):
+    conversion = FalconConversion(GEAR_RATIO, CIRCUMFERENCE)
+
+    for raw in readings:
+        assert conversion.to_mps(raw) == pytest.approx(conversions.falcon_to_mps(raw, CIRCUMFERENCE, GEAR_RATIO))
+        assert conversion.to_metres(raw) == pytest.approx(
+            conversions.falcon_to_metres(raw, CIRCUMFERENCE, GEAR_RATIO)
+        )
+        assert conversion.to_radps(raw) == pytest.approx(conversions.falcon_to_radps(raw, GEAR_RATIO))
+        assert conversion.to_rotation(raw).degrees() == pytest.approx(
+            conversions.falcon_to_degrees(raw, GEAR_RATIO).degrees()
+        )
+
+        mps = raw / 10_000
+        assert conversion.from_mps(mps) == pytest.approx(conversions.mps_to_falcon(mps, CIRCUMFERENCE, GEAR_RATIO))
+        assert conversion.from_metres(mps) == pytest.approx(
+            conversions.metres_to_falcon(mps, CIRCUMFERENCE, GEAR_RATIO)
+        )
+        rotation = Rotation2d.fromDegrees(raw / 1000)
+        assert conversion.from_rotation(rotation) == pytest.approx(conversions.degrees_to_falcon(rotation, GEAR_RATIO))
+
+
+def test_batch_conversions_match_scalar(readings):
+    conversion = FalconConversion(GEAR_RATIO, CIRCUMFERENCE)
+    raw = np.array(readings)
+
+    assert conversion.to_mps_batch(raw) == pytest.approx([conversion.to_mps(value) for value in readings])
+    assert conversion.to_metres_batch(raw) == pytest.approx([conversion.to_metres(value) for value in readings])
+    assert conversion.from_mps_batch(raw) == pytest.approx([conversion.from_mps(value) for value in readings])
+
+    out = np.empty_like(raw)
+    assert conversion.to_degrees_batch(raw, out) is out
+
+
+def test_per_module_factors():
+    gear_ratios = np.array([6.75, 8.14, 6.12, 5.5])
+    conversion = FalconConversion(gear_ratios, CIRCUMFERENCE)
+    raw = np.full(4, 2048.0)
+
+    expected = [conversions.falcon_to_mps(2048, CIRCUMFERENCE, ratio) for ratio in gear_ratios]
+    assert conversion.to_mps_batch(raw) == pytest.approx(expected)
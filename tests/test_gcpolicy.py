@@ -0,0 +1,35 @@
+import gc
+import threading
+
+import ntcore
+
+from gcpolicy import GcPolicy
+
+
+def test_collections_during_publish_do_not_wait_for_the_histograms():
+    policy = GcPolicy()
+    subscriber = ntcore.NetworkTableInstance.getDefault().getDoubleArrayTopic("/GC/Gen 0").subscribe([])
+    collected = threading.Event()
+
+    def collectWhilePublishing():
+        # As if an allocation in publish() set off a collection while it held a histogram's lock
+        with policy.pauses[0]._lock:
+            gc.collect(0)
+        collected.set()
+
+    threading.Thread(target=collectWhilePublishing, daemon=True).start()
+    assert collected.wait(timeout=5)
+
+    policy.publish()
+    assert subscriber.get()[3] >= 1
+
+
+def test_simulated_robots_are_not_frozen_and_leave_no_callback():
+    callbacks = len(gc.callbacks)
+    policy = GcPolicy()
+
+    policy.robotInitFinished()
+    assert gc.get_freeze_count() == 0
+
+    del policy
+    assert len(gc.callbacks) == callbacks
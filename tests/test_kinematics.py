@@ -0,0 +1,119 @@
+import math
+import random
+
+import commands2
+import numpy as np
+import pytest
+import wpimath.kinematics
+from wpimath.geometry import Rotation2d, Translation2d
+from wpimath.kinematics import ChassisSpeeds, SwerveModuleState
+
+from swervepy import SwerveDrive, u
+from swervepy.abstract.system import cosine_scale, optimize
+from swervepy.impl import CoaxialSwerveModule, DummyGyro
+from swervepy.impl.motor import DummyCoaxialAzimuthComponent, DummyCoaxialDriveComponent
+from swervepy.kinematics import VectorizedSwerveKinematics
+
+PLACEMENTS = (
+    Translation2d(0.3, 0.3),
+    Translation2d(-0.3, 0.3),
+    Translation2d(0.3, -0.3),
+    Translation2d(-0.3, -0.3),
+)
+MAX_SPEED = 3.5
+PERIOD = 0.02
+
+
+def reference_states(vx, vy, omega, heading, current_degrees):
+    kinematics = wpimath.kinematics.SwerveDrive4Kinematics(*PLACEMENTS)
+    speeds = ChassisSpeeds.fromFieldRelativeSpeeds(vx, vy, omega, Rotation2d(heading))
+    speeds = ChassisSpeeds.discretize(speeds, PERIOD)
+    states = kinematics.desaturateWheelSpeeds(kinematics.toSwerveModuleStates(speeds), MAX_SPEED)
+
+    optimized = []
+    for state, angle in zip(states, current_degrees):
+        current = Rotation2d.fromDegrees(angle)
+        state = optimize(state, current)
+        optimized.append((cosine_scale(state.speed, state.angle, current), state.angle.degrees()))
+    return optimized
+
+
+@pytest.mark.parametrize("seed", range(50))
+def test_matches_wpimath(seed):
+    rng = random.Random(seed)
+    vx, vy, omega = rng.uniform(-5, 5), rng.uniform(-5, 5), rng.uniform(-6, 6)
+    heading = rng.uniform(-math.pi, math.pi)
+    current_degrees = [rng.uniform(-1080, 1080) for _ in PLACEMENTS]
+
+    engine = VectorizedSwerveKinematics(PLACEMENTS)
+    speeds, angles = engine.calculate(
+        vx, vy, omega, np.array(current_degrees), MAX_SPEED, PERIOD, heading, field_relative=True
+    )
+
+    for (expected_speed, expected_angle), speed, angle in zip(
+        reference_states(vx, vy, omega, heading, current_degrees), speeds, angles
+    ):
+        assert speed == pytest.approx(expected_speed, abs=1e-9)
+        assert angle == pytest.approx(expected_angle, abs=1e-6)
+
+
+def test_stopped_chassis_holds_module_headings():
+    engine = VectorizedSwerveKinematics(PLACEMENTS)
+    current = np.zeros(len(PLACEMENTS))
+    _, moving_angles = engine.calculate(0, 1, 0, current, MAX_SPEED, PERIOD)
+    held = moving_angles.copy()
+
+    speeds, angles = engine.calculate(0, 0, 0, held, MAX_SPEED, PERIOD)
+
+    assert np.all(speeds == 0)
+    np.testing.assert_allclose(angles, held)
+
+
+def test_rotate_in_place_disabled_keeps_current_angle():
+    engine = VectorizedSwerveKinematics(PLACEMENTS)
+    current = np.array([10.0, 20.0, 30.0, 40.0])
+
+    _, angles = engine.calculate(0.01, 0, 0, current, MAX_SPEED, PERIOD, rotate_in_place=False)
+
+    np.testing.assert_allclose(angles, current)
+
+
+class RecordingDriveComponent(DummyCoaxialDriveComponent):
+    acceleration = 0.0
+
+    def follow_velocity_closed(self, velocity: float, acceleration: float = 0.0):
+        super().follow_velocity_closed(velocity, acceleration)
+        self.acceleration = acceleration
+
+
+def commanded_feedforward(vectorized, states, accelerations, current_degrees):
+    commands2.CommandScheduler.resetInstance()
+    drives = [RecordingDriveComponent() for _ in PLACEMENTS]
+    modules = tuple(
+        CoaxialSwerveModule(drive, DummyCoaxialAzimuthComponent(), placement)
+        for drive, placement in zip(drives, PLACEMENTS)
+    )
+    for module, angle in zip(modules, current_degrees):
+        module.desire_azimuth_angle(Rotation2d.fromDegrees(angle))
+    swerve = SwerveDrive(
+        modules, DummyGyro(), 10 * (u.m / u.s), 2 * math.pi * (u.rad / u.s), vectorized_kinematics=vectorized
+    )
+    swerve.desire_module_states(states, False, True, accelerations)
+    commands2.CommandScheduler.resetInstance()
+    return [(drive.velocity, drive.acceleration) for drive in drives]
+
+
+def test_batched_feedforward_matches_per_module():
+    rng = random.Random(0)
+    states = tuple(
+        SwerveModuleState(rng.uniform(-3, 3), Rotation2d.fromDegrees(rng.uniform(-180, 180))) for _ in PLACEMENTS
+    )
+    accelerations = np.array([[rng.uniform(-4, 4), rng.uniform(-4, 4)] for _ in PLACEMENTS])
+    current_degrees = [rng.uniform(-180, 180) for _ in PLACEMENTS]
+
+    batched = commanded_feedforward(True, states, accelerations, current_degrees)
+    per_module = commanded_feedforward(False, states, accelerations, current_degrees)
+
+    for (speed, acceleration), (expected_speed, expected_acceleration) in zip(batched, per_module):
+        assert speed == pytest.approx(expected_speed, abs=1e-9)
+        assert acceleration == pytest.approx(expected_acceleration, abs=1e-9)
@@ -0,0 +1,50 @@
+from loadshedder import LoadShedder, Tier
+
+
+def run_cycles(shedder, cycles, work_seconds):
+    for _ in range(cycles):
+        shedder.recordCycle(work_seconds)
+
+
+def test_sheds_after_consecutive_slow_loops():
+    shedder = LoadShedder(shedCycles=3)
+
+    run_cycles(shedder, 2, 0.018)
+    assert shedder.level == 0
+    run_cycles(shedder, 1, 0.018)
+    assert shedder.level == 1
+
+
+def test_sheds_straight_away_on_an_overrun():
+    shedder = LoadShedder()
+
+    run_cycles(shedder, 1, 0.025)
+
+    assert shedder.level == 1
+
+
+def test_restores_one_level_at_a_time_with_headroom():
+    shedder = LoadShedder(restoreCycles=50)
+    run_cycles(shedder, 2, 0.025)
+    assert shedder.level == 2
+
+    # Loops between the two thresholds hold the level
+    run_cycles(shedder, 100, 0.014)
+    assert shedder.level == 2
+
+    run_cycles(shedder, 50, 0.005)
+    assert shedder.level == 1
+    run_cycles(shedder, 50, 0.005)
+    assert shedder.level == 0
+
+
+def test_shed_functions_return_their_last_result():
+    shedder = LoadShedder()
+    calls = []
+    condition = shedder.wrap(Tier.BEST_EFFORT, lambda: calls.append(1) or len(calls))
+    run_cycles(shedder, 2, 0.025)
+
+    assert not shedder.shouldRun(Tier.BEST_EFFORT)
+    assert condition() is None
+    assert calls == []
+    assert shedder.skipped[Tier.BEST_EFFORT] == 1
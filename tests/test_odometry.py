@@ -0,0 +1,137 @@
+import collections
+import contextlib
+import threading
+
+import pytest
+import wpimath.estimator
+import wpimath.kinematics
+from wpimath.geometry import Pose2d, Translation2d
+
+from swervepy.abstract.system import ModuleSnapshot
+from swervepy.impl import CoaxialSwerveModule, DummyGyro
+from swervepy.impl.motor import DummyCoaxialAzimuthComponent, DummyCoaxialDriveComponent
+from swervepy.odometry import OdometryThread
+from swervepy.stats import Histogram
+
+PLACEMENTS = (
+    Translation2d(0.3, 0.3),
+    Translation2d(-0.3, 0.3),
+    Translation2d(0.3, -0.3),
+    Translation2d(-0.3, -0.3),
+)
+
+
+def make_odometry():
+    modules = [
+        CoaxialSwerveModule(DummyCoaxialDriveComponent(), DummyCoaxialAzimuthComponent(), placement)
+        for placement in PLACEMENTS
+    ]
+    gyro = DummyGyro()
+    kinematics = wpimath.kinematics.SwerveDrive4Kinematics(*PLACEMENTS)
+    estimator = wpimath.estimator.SwerveDrive4PoseEstimator(
+        kinematics, gyro.heading, tuple(module.read_position() for module in modules), Pose2d()
+    )
+    lock = threading.RLock()
+    return modules, OdometryThread(modules, gyro, estimator, lock), estimator, lock
+
+
+def drive_forward(modules, distance):
+    for module in modules:
+        module.desire_drive_velocity(distance, open_loop=False)
+        module.simulation_periodic(1.0)
+
+
+@contextlib.contextmanager
+def held_elsewhere(lock):
+    """Hold the lock from another thread, the way the robot loop does while it uses the estimator"""
+    acquired, release = threading.Event(), threading.Event()
+
+    def hold():
+        with lock:
+            acquired.set()
+            release.wait()
+
+    holder = threading.Thread(target=hold)
+    holder.start()
+    acquired.wait()
+    try:
+        yield
+    finally:
+        release.set()
+        holder.join()
+
+
+def test_samples_update_the_estimator():
+    modules, thread, estimator, _ = make_odometry()
+
+    drive_forward(modules, 0.5)
+    thread.sample()
+    drive_forward(modules, 0.5)
+    thread.sample()
+
+    assert estimator.getEstimatedPosition().x == pytest.approx(1.0)
+    assert thread.samples_applied == 2
+    assert thread.latency.count == 2
+
+
+def test_samples_read_only_the_sensors_odometry_needs():
+    modules, thread, _, _ = make_odometry()
+    reads = collections.Counter()
+
+    def counted(field, reader):
+        def read():
+            reads[field] += 1
+            return reader()
+
+        return read
+
+    for module in modules:
+        for field in ModuleSnapshot._fields:
+            setattr(module, f"read_{field}", counted(field, getattr(module, f"read_{field}")))
+    thread.sample()
+
+    assert reads == {"drive_distance": len(modules), "azimuth_angle": len(modules), "drive_velocity": len(modules)}
+
+
+def test_samples_queue_while_the_estimator_is_busy():
+    modules, thread, estimator, lock = make_odometry()
+
+    with held_elsewhere(lock):
+        drive_forward(modules, 1.0)
+        thread.sample()
+        assert thread.samples_applied == 0
+
+    with lock:
+        thread.apply_pending()
+    assert estimator.getEstimatedPosition().x == pytest.approx(1.0)
+    assert thread.samples_applied == 1
+
+
+def test_samples_from_before_a_reset_are_discarded():
+    modules, thread, estimator, lock = make_odometry()
+
+    with held_elsewhere(lock):
+        drive_forward(modules, 1.0)
+        thread.sample()
+
+    with lock:
+        thread.invalidate()
+        thread.apply_pending()
+    assert estimator.getEstimatedPosition().x == pytest.approx(0.0)
+    assert thread.samples_applied == 0
+    assert thread.samples_discarded == 1
+
+
+def test_histogram_percentiles():
+    histogram = Histogram()
+    for value in range(1, 101):
+        histogram.record(float(value))
+
+    assert histogram.count == 100
+    assert histogram.max == 100
+    assert histogram.mean == pytest.approx(50.5)
+    assert histogram.percentile(0.5) == pytest.approx(50, rel=0.15)
+    assert histogram.percentile(0.99) == pytest.approx(99, rel=0.15)
+
+    histogram.reset()
+    assert histogram.percentile(0.5) == 0
@@ -0,0 +1,105 @@
+import math
+import random
+
+import numpy as np
+import pytest
+from wpimath.geometry import Rotation2d
+from wpimath.kinematics import SwerveModuleState
+
+from swervepy.abstract.system import (
+    cosine_scale,
+    cosine_scale_batch,
+    optimize,
+    optimize_batch,
+    place_in_proper_0_to_360_scope,
+)
+
+# Wind-up angles reported by an azimuth encoder after anything from a few turns to a very long session
+WIND_UP_DEGREES = (0, 360, 3_600, 36_000, 360_000)
+SAMPLES = 500
+
+
+def looping_place_in_proper_0_to_360_scope(scope_reference: float, new_angle: float) -> float:
+    # The original loop-based implementation, kept as the reference for equivalence
+    lower_offset = scope_reference % 360
+    lower_bound = scope_reference - lower_offset
+    upper_bound = lower_bound + 360
+
+    while new_angle < lower_bound:
+        new_angle += 360
+    while new_angle > upper_bound:
+        new_angle -= 360
+
+    if new_angle - scope_reference > 180:
+        new_angle -= 360
+    elif new_angle - scope_reference < -180:
+        new_angle += 360
+
+    return new_angle
+
+
+def random_angles(rng: random.Random, wind_up: float) -> tuple[float, float]:
+    scope_reference = rng.uniform(-wind_up, wind_up) + rng.uniform(-360, 360)
+    new_angle = rng.uniform(-wind_up, wind_up) + rng.uniform(-360, 360)
+    return scope_reference, new_angle
+
+
+@pytest.mark.parametrize("wind_up", WIND_UP_DEGREES)
+def test_closed_form_scope_matches_loop(wind_up):
+    rng = random.Random(wind_up)
+    for _ in range(SAMPLES):
+        scope_reference, new_angle = random_angles(rng, wind_up)
+
+        expected = looping_place_in_proper_0_to_360_scope(scope_reference, new_angle)
+        actual = place_in_proper_0_to_360_scope(scope_reference, new_angle)
+
+        assert actual == pytest.approx(expected, abs=1e-6)
+        assert abs(actual - scope_reference) <= 180 + 1e-6
+
+
+@pytest.mark.parametrize("wind_up", WIND_UP_DEGREES)
+def test_optimized_state_points_the_same_way(wind_up):
+    rng = random.Random(wind_up + 1)
+    for _ in range(SAMPLES):
+        current, desired = random_angles(rng, wind_up)
+        speed = rng.uniform(-4, 4)
+
+        state = optimize(SwerveModuleState(speed, Rotation2d.fromDegrees(desired)), Rotation2d.fromDegrees(current))
+
+        # The module never turns more than 90 degrees, and the wheel's velocity vector is unchanged
+        assert abs(state.angle.degrees() - current) <= 90 + 1e-6
+        desired_radians = math.radians(desired)
+        optimized_radians = state.angle.radians()
+        assert state.speed * math.cos(optimized_radians) == pytest.approx(speed * math.cos(desired_radians), abs=1e-6)
+        assert state.speed * math.sin(optimized_radians) == pytest.approx(speed * math.sin(desired_radians), abs=1e-6)
+
+
+@pytest.mark.parametrize("wind_up", WIND_UP_DEGREES)
+def test_batch_matches_scalar(wind_up):
+    rng = random.Random(wind_up + 2)
+    pairs = [random_angles(rng, wind_up) for _ in range(SAMPLES)]
+    current = np.array([pair[0] for pair in pairs])
+    angles = np.array([pair[1] for pair in pairs])
+    speeds = np.array([rng.uniform(-4, 4) for _ in pairs])
+
+    expected = [
+        optimize(SwerveModuleState(speed, Rotation2d.fromDegrees(angle)), Rotation2d.fromDegrees(reference))
+        for speed, angle, reference in zip(speeds, angles, current)
+    ]
+    optimize_batch(speeds, angles, current)
+
+    for state, speed, angle in zip(expected, speeds, angles):
+        assert speed == pytest.approx(state.speed)
+        assert angle == pytest.approx(state.angle.degrees(), abs=1e-6)
+
+
+def test_cosine_scale():
+    current = Rotation2d.fromDegrees(720)
+
+    assert cosine_scale(2, Rotation2d.fromDegrees(720), current) == pytest.approx(2)
+    assert cosine_scale(2, Rotation2d.fromDegrees(780), current) == pytest.approx(1)
+    assert cosine_scale(2, Rotation2d.fromDegrees(630), current) == pytest.approx(0, abs=1e-12)
+
+    speeds = np.array([2.0, 2.0, 2.0])
+    cosine_scale_batch(speeds, np.array([720.0, 780.0, 630.0]), np.full(3, 720.0))
+    np.testing.assert_allclose(speeds, [2, 1, 0], atol=1e-12)
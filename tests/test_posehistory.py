@@ -0,0 +1,50 @@
+import math
+
+import pytest
+from wpimath.geometry import Pose2d, Rotation2d
+
+from swervepy.posehistory import PoseHistory
+
+
+def filled_history(samples, capacity):
+    history = PoseHistory(capacity, module_count=2)
+    for i in range(samples):
+        history.record(i * 0.02, Pose2d(i, 2 * i, Rotation2d(0.1 * i)), (i, -i))
+    return history
+
+
+def test_interpolates_between_samples():
+    history = filled_history(10, capacity=20)
+
+    sample = history.sample_at(0.05)
+    assert sample.pose.X() == pytest.approx(2.5)
+    assert sample.pose.Y() == pytest.approx(5.0)
+    assert sample.pose.rotation().radians() == pytest.approx(0.25)
+    assert sample.module_speeds == pytest.approx((2.5, -2.5))
+
+
+def test_keeps_only_the_newest_samples():
+    history = filled_history(25, capacity=10)
+
+    assert len(history) == 10
+    assert history.oldest_timestamp == pytest.approx(0.3)
+    assert history.pose_at(0.29) is None
+    assert history.pose_at(0.31).X() == pytest.approx(15.5)
+    # Times after the newest sample give the newest pose rather than extrapolating
+    assert history.pose_at(10).X() == pytest.approx(24)
+
+
+def test_heading_turns_the_short_way():
+    history = PoseHistory(4, module_count=1)
+    history.record(0.0, Pose2d(0, 0, Rotation2d(math.pi - 0.1)), (0,))
+    history.record(1.0, Pose2d(0, 0, Rotation2d(-math.pi + 0.1)), (0,))
+
+    heading = history.pose_at(0.5).rotation().radians()
+    assert abs(heading) == pytest.approx(math.pi)
+
+
+def test_ignores_samples_out_of_order():
+    history = filled_history(5, capacity=10)
+    history.record(0.01, Pose2d(), (0, 0))
+
+    assert len(history) == 5
@@ -0,0 +1,45 @@
+"""
+Runs the robot's own loop through pyfrc's ``control`` fixture, so use the robotpy test runner: ``robotpy test``
+"""
+
+import commands2
+import commands2.cmd
+import ntcore
+
+import constants
+from loadshedder import Tier
+
+
+def test_robot_loop_runs_the_scheduler_and_load_shedder_tasks(control, robot):
+    loops, executions, bestEffortRuns = [], [], []
+
+    with control.run_robot():
+        robot.loadShedder.addTask(Tier.CRITICAL, lambda: loops.append(1))
+        robot.loadShedder.addTask(Tier.BEST_EFFORT, lambda: bestEffortRuns.append(1))
+        commands2.cmd.run(lambda: executions.append(1)).ignoringDisable(True).schedule()
+
+        control.step_timing(seconds=1.0, autonomous=False, enabled=False)
+
+        # The scheduler runs once per loop, through the load shedder
+        assert len(loops) > 0
+        assert len(executions) == len(loops)
+        assert bestEffortRuns
+
+
+def test_enabled_profiler_times_the_scheduler_the_robot_runs(control, robot, monkeypatch):
+    monkeypatch.setattr(constants.LoopProfilerConstants, "kEnabled", True)
+    subscriber = ntcore.NetworkTableInstance.getDefault().getDoubleArrayTopic("/LoopProfiler/CommandScheduler.run")
+    subscriber = subscriber.subscribe([])
+
+    with control.run_robot():
+        control.step_timing(seconds=1.0, autonomous=False, enabled=False)
+
+        # Published once every kPublishPeriodCycles runs of the scheduler
+        assert subscriber.get()
+
+
+def test_robot_loop_publishes_the_drive_telemetry(control, robot):
+    with control.run_robot():
+        control.step_timing(seconds=1.0, autonomous=False, enabled=False)
+
+        assert robot.container.driveTelemetry.values_published > 0
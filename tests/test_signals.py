@@ -0,0 +1,24 @@
+import pytest
+import rev
+
+from swervepy.signals import AZIMUTH_SIGNALS, DRIVE_SIGNALS, BusLoadEstimator, apply_spark_max_signals
+
+
+def test_spark_max_frames_follow_the_fastest_signal():
+    periods = apply_spark_max_signals(rev.SparkMaxConfig(), DRIVE_SIGNALS)
+
+    assert sorted(periods) == [DRIVE_SIGNALS.position_ms, DRIVE_SIGNALS.applied_output_ms, DRIVE_SIGNALS.faults_ms]
+
+
+def test_bus_load_of_a_neo_drivetrain():
+    estimator = BusLoadEstimator()
+    for module in range(4):
+        estimator.register(f"drive {module}", apply_spark_max_signals(rev.SparkMaxConfig(), DRIVE_SIGNALS))
+        estimator.register(f"azimuth {module}", apply_spark_max_signals(rev.SparkMaxConfig(), AZIMUTH_SIGNALS))
+    # Registering a device again replaces it
+    estimator.register("drive 0", apply_spark_max_signals(rev.SparkMaxConfig(), DRIVE_SIGNALS))
+
+    drive = 1000 / 20 + 1000 / 250 + 1000 / 10
+    azimuth = 1000 / 100 + 1000 / 250 + 1000 / 10
+    assert estimator.frames_per_second() == pytest.approx(4 * (drive + azimuth))
+    assert estimator.utilization() == pytest.approx(4 * (drive + azimuth) * 150 / 1_000_000)
@@ -0,0 +1,44 @@
+import math
+import os
+
+import commands2
+import pytest
+from wpimath.geometry import Translation2d
+
+from swervepy import TrajectoryFollowerParameters, u
+from swervepy.simulation import HeadlessSimulation, dummy_swerve_drive
+from swervepy.trajectory import compile_trajectory, read_compiled
+
+SOURCE = os.path.join(os.path.dirname(__file__), os.pardir, "deploy", "choreo", "goToCage.traj")
+PLACEMENTS = (Translation2d(0.3, 0.3), Translation2d(-0.3, 0.3), Translation2d(0.3, -0.3), Translation2d(-0.3, -0.3))
+
+
+class RobotConfig:
+    massKG = 50.0
+
+
+@pytest.fixture
+def simulation():
+    commands2.CommandScheduler.resetInstance()
+    drive = dummy_swerve_drive(PLACEMENTS, 4.5 * (u.m / u.s), 2 * math.pi * (u.rad / u.s))
+    with HeadlessSimulation(drive) as simulation:
+        yield simulation
+    commands2.CommandScheduler.resetInstance()
+
+
+def test_follows_a_trajectory_faster_than_real_time(simulation, tmp_path):
+    destination = str(tmp_path / "goToCage.ctraj")
+    compile_trajectory(SOURCE, destination)
+    trajectory = read_compiled(destination)
+    parameters = TrajectoryFollowerParameters(4.5 * (u.m / u.s), theta_kP=2.0, xy_kP=2.0)
+
+    result = simulation.run_command(
+        simulation.drive.follow_trajectory_command(trajectory, parameters, RobotConfig, first_path=True)
+    )
+
+    assert result.finished
+    assert result.sim_seconds == pytest.approx(trajectory.duration, abs=0.05)
+    # A whole autonomous routine in well under a second
+    assert result.wall_seconds < 1.0
+    final = trajectory.pose(len(trajectory) - 1)
+    assert result.poses[-1].translation().distance(final.translation()) < 0.1
@@ -0,0 +1,45 @@
+import math
+
+import commands2
+from wpimath.geometry import Rotation2d, Translation2d
+from wpimath.kinematics import SwerveModuleState
+
+from swervepy import SwerveDrive, u
+from swervepy.impl import CoaxialSwerveModule, DummyGyro
+from swervepy.impl.motor import DummyCoaxialAzimuthComponent, DummyCoaxialDriveComponent
+
+PLACEMENTS = (Translation2d(0.3, 0.3), Translation2d(-0.3, 0.3), Translation2d(0.3, -0.3), Translation2d(-0.3, -0.3))
+
+
+def make_module(placement=Translation2d()):
+    return CoaxialSwerveModule(DummyCoaxialDriveComponent(), DummyCoaxialAzimuthComponent(), placement)
+
+
+def test_only_reads_served_from_the_snapshot_count_as_saved():
+    module = make_module()
+
+    # Only the fields asked for are read from the hardware
+    module.module_position
+    assert module.hal_reads == 2
+    assert module.hal_calls_saved == 0
+    module.module_position
+    assert module.hal_calls_saved == 2
+
+    # A new cycle's first read goes to the hardware, and saves nothing
+    module.invalidate_snapshot()
+    module.drive_velocity
+    assert module.hal_calls_saved == 2
+    assert module.hal_reads == 3
+
+
+def test_simulation_step_refreshes_module_readings():
+    commands2.CommandScheduler.resetInstance()
+    modules = tuple(make_module(placement) for placement in PLACEMENTS)
+    drive = SwerveDrive(modules, DummyGyro(), 4.5 * (u.m / u.s), 2 * math.pi * (u.rad / u.s))
+    drive.desire_module_states([SwerveModuleState(1.0, Rotation2d())] * len(modules), True, True)
+
+    drive.periodic()
+    drive.simulationPeriodic()
+
+    assert all(math.isclose(position.distance, 0.02) for position in drive.module_positions)
+    commands2.CommandScheduler.resetInstance()
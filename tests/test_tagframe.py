@@ -0,0 +1,65 @@
+import math
+
+import numpy as np
+import pytest
+from wpimath.geometry import Pose3d, Rotation3d, Transform3d, Translation3d
+
+import visionprocessing.apriltagpackager as ATPackage
+
+
+class FakeTag:
+    def __init__(self, ID, pose):
+        self.ID = ID
+        self.pose = pose
+
+
+class FakeLayout:
+    def __init__(self, tags):
+        self.tags = tags
+
+    def getTags(self):
+        return self.tags
+
+
+def make_frame(records) -> ATPackage.TagFrame:
+    buffer = bytearray(ATPackage.kFrameHeader.size + len(records) * ATPackage.kTagDtype.itemsize)
+    ATPackage.kFrameHeader.pack_into(buffer, 0, 0, 1, len(records))
+    tags = np.frombuffer(buffer, dtype=ATPackage.kTagDtype, count=len(records), offset=ATPackage.kFrameHeader.size)
+    for index, (tagId, translation, rotation) in enumerate(records):
+        tags[index] = (tagId, (320, 240), (0,) * 8, translation, rotation)
+    return ATPackage.decodeFrame(bytes(buffer), 1.5)
+
+
+def test_closest_and_filter():
+    frame = make_frame([(3, (0, 0, 4), (0, 0, 0)), (7, (1, 0, 2), (0, 0, 0)), (9, (0, 1, 3), (0, 0, 0))])
+
+    assert frame.closest().id == 7
+    assert list(frame.filterById([3, 9]).ids) == [3, 9]
+    assert list(frame.filterById(9).ids) == [9]
+    assert frame.filterById(4).closest() is None
+    assert [tag.id for tag in frame] == [3, 7, 9]
+
+
+def test_pose_is_built_lazily():
+    tag = make_frame([(3, (0.5, 0, 4), (0, 0, 0))])[0]
+
+    assert tag._pose is None
+    assert tag.getX() == pytest.approx(0.5)
+    assert tag._pose is None
+    assert tag.pose.z == pytest.approx(4)
+
+
+@pytest.mark.parametrize("yaw", [0.0, 0.3, -0.6])
+def test_field_relative_robot_pose(yaw):
+    # A tag on the far wall facing the robot, which is 3 m away and turned by yaw
+    layout = FakeLayout([FakeTag(7, Pose3d(Translation3d(5, 1, 0.5), Rotation3d(0, 0, math.pi)))])
+    robotToCamera = Transform3d(Translation3d(0, 0, 0.5), Rotation3d())
+    # Seen from the camera (x right, y down, z forward), the tag sits off to the side by the robot's yaw, and its
+    # face is turned by the same angle around the camera's vertical (down) axis
+    translation = (-3 * math.sin(-yaw), 0, 3 * math.cos(-yaw))
+    frame = make_frame([(7, translation, (0, yaw, 0)), (99, (0, 0, 1), (0, 0, 0))])
+
+    ids, poses = frame.fieldRelativeRobotPoses(layout, robotToCamera)
+
+    assert list(ids) == [7]
+    np.testing.assert_allclose(poses[0], [2, 1, yaw], atol=1e-5)
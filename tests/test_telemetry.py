@@ -0,0 +1,77 @@
+import ntcore
+import pytest
+from wpimath.geometry import Rotation2d
+from wpimath.kinematics import SwerveModuleState
+
+from swervepy.telemetry import TelemetryPublisher
+
+
+@pytest.fixture
+def table():
+    instance = ntcore.NetworkTableInstance.create()
+    yield instance.getTable("Telemetry")
+    ntcore.NetworkTableInstance.destroy(instance)
+
+
+class Counter:
+    """A getter that counts its calls"""
+
+    def __init__(self, value=0.0):
+        self.value = value
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        return self.value
+
+
+def test_reads_at_the_signal_rate(table):
+    telemetry = TelemetryPublisher(table, low_bandwidth=False)
+    getter = Counter()
+    telemetry.add_double("Value", getter, rate_hz=10)
+
+    for cycle in range(50):
+        telemetry.periodic(cycle * 0.02)
+
+    assert getter.calls == 10
+
+
+def test_publishes_only_changes_beyond_the_deadband(table):
+    telemetry = TelemetryPublisher(table, low_bandwidth=False)
+    getter = Counter(1.0)
+    telemetry.add_double("Value", getter, deadband=0.1)
+    subscriber = table.getDoubleTopic("Value").subscribe(0.0)
+
+    telemetry.periodic(0.0)
+    getter.value = 1.05
+    telemetry.periodic(0.02)
+    assert subscriber.get() == 1.0
+    assert telemetry.values_unchanged == 1
+
+    getter.value = 1.2
+    telemetry.periodic(0.04)
+    assert subscriber.get() == 1.2
+
+
+def test_low_bandwidth_mode_skips_signals_without_a_match_rate(table):
+    telemetry = TelemetryPublisher(table, low_bandwidth=True)
+    debug, essential = Counter(), Counter()
+    telemetry.add_double("Debug", debug)
+    telemetry.add_double("Essential", essential, match_rate_hz=25)
+
+    for cycle in range(50):
+        telemetry.periodic(cycle * 0.02)
+
+    assert debug.calls == 0
+    assert essential.calls == 25
+
+
+def test_publishes_module_states_as_one_struct_array(table):
+    telemetry = TelemetryPublisher(table, low_bandwidth=False)
+    states = [SwerveModuleState(i, Rotation2d(0.1 * i)) for i in range(4)]
+    telemetry.add_module_states("Module States", lambda: states)
+    subscriber = table.getStructArrayTopic("Module States", SwerveModuleState).subscribe([])
+
+    telemetry.periodic(0.0)
+
+    assert [state.speed for state in subscriber.get()] == [0, 1, 2, 3]
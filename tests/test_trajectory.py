@@ -0,0 +1,57 @@
+import json
+import math
+import os
+
+import numpy as np
+import pytest
+
+from swervepy.trajectory import FIELD_LENGTH, FIELD_WIDTH, compile_trajectory, read_compiled
+
+SOURCE = os.path.join(os.path.dirname(__file__), os.pardir, "deploy", "choreo", "goToCage.traj")
+
+
+@pytest.fixture
+def compiled(tmp_path):
+    destination = str(tmp_path / "goToCage.ctraj")
+    compile_trajectory(SOURCE, destination)
+    return read_compiled(destination)
+
+
+def test_compiled_samples_match_json(compiled):
+    with open(SOURCE) as file:
+        samples = json.load(file)["trajectory"]["samples"]
+
+    assert len(compiled) == len(samples)
+    assert compiled.duration == pytest.approx(samples[-1]["t"])
+    for i, sample in enumerate(samples):
+        row = compiled.samples[i]
+        assert row[:4] == pytest.approx([sample["t"], sample["x"], sample["y"], sample["heading"]])
+        assert compiled.module_forces_x[i] == pytest.approx(sample["fx"])
+        assert compiled.module_forces_y[i] == pytest.approx(sample["fy"])
+
+
+def test_index_at_clamps_to_the_trajectory(compiled):
+    assert compiled.index_at(-1) == 0
+    assert compiled.index_at(compiled.timestamps[5]) == 5
+    assert compiled.index_at(compiled.duration + 1) == len(compiled) - 1
+
+
+def test_flipped_trajectory_is_rotated_about_the_field_centre(compiled):
+    flipped = compiled.flipped()
+
+    assert flipped.samples[:, 1] == pytest.approx(FIELD_LENGTH - compiled.samples[:, 1])
+    assert flipped.samples[:, 2] == pytest.approx(FIELD_WIDTH - compiled.samples[:, 2])
+    heading_change = np.remainder(flipped.samples[:, 3] - compiled.samples[:, 3], 2 * math.pi)
+    assert heading_change == pytest.approx(np.full(len(compiled), math.pi))
+    assert flipped.samples[:, 4] == pytest.approx(-compiled.samples[:, 4])
+
+
+def test_sample_into_interpolates_between_samples(compiled):
+    out = np.zeros(compiled.samples.shape[1])
+    middle = (compiled.timestamps[3] + compiled.timestamps[4]) / 2
+
+    compiled.sample_into(middle, out)
+    assert out == pytest.approx((compiled.samples[3] + compiled.samples[4]) / 2)
+
+    compiled.sample_into(compiled.duration + 1, out)
+    assert out == pytest.approx(compiled.samples[-1])
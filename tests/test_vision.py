@@ -0,0 +1,26 @@
+import cv2
+import numpy as np
+
+from constants import CameraConstants as CamVals
+from visionprocessing.vision import TagTracker, createDetector, createEstimator, detectTags
+
+
+def render_tag(tagId, left, top, size=80):
+    """A white frame with one tag36h11 tag drawn in it"""
+    dictionary = cv2.aruco.getPredefinedDictionary(cv2.aruco.DICT_APRILTAG_36h11)
+    frame = np.full((CamVals.kImageHeight, CamVals.kImageWidth), 255, dtype=np.uint8)
+    frame[top : top + size, left : left + size] = cv2.aruco.generateImageMarker(dictionary, tagId, size)
+    return frame
+
+
+def test_tracked_regions_find_the_tag():
+    detector, estimator, tracker = createDetector(), createEstimator(), TagTracker()
+    frame = render_tag(3, 300, 200)
+
+    full = detectTags(detector, estimator, frame, 1, tracker)
+    assert tracker.regionsFor(2) is not None
+    tracked = detectTags(detector, estimator, frame, 2, tracker)
+
+    assert [tag.id for tag in full] == [tag.id for tag in tracked] == [3]
+    # Corners found in a region are shifted back into full frame coordinates
+    np.testing.assert_allclose(tracked[0].corners, full[0].corners, atol=0.5)
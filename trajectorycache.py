@@ -0,0 +1,114 @@
+"""Loads autonomous trajectories ahead of time, so starting autonomous does no file I/O"""
+
+import os
+import threading
+import time
+import typing
+
+import commands2
+import wpilib
+
+import swervepy.trajectory
+from swervepy.trajectory import CompiledTrajectory
+
+
+class TrajectoryCache:
+    """
+    Loads every Choreo trajectory in deploy/choreo on a background thread while the robot boots and sits disabled,
+    keeping each trajectory and its red alliance mirror image in memory. Trajectories are memory-mapped from their
+    compiled form (see swervepy.trajectory), and compiled first if that was not done before deploying. The follower
+    commands are then built from the main robot thread, so autonomousInit only has to pick one.
+    """
+
+    def __init__(self, buildCommand: typing.Callable[[CompiledTrajectory], commands2.Command]):
+        """
+        :param buildCommand: Makes the command that follows a trajectory. Called from the main robot thread only
+        """
+        self.directory = os.path.join(wpilib.getDeployDirectory(), "choreo")
+        self.loadSeconds = 0.0
+        self._buildCommand = buildCommand
+        self._lock = threading.Lock()
+        # Keyed by trajectory name and whether the trajectory is flipped for the red alliance
+        self._trajectories: dict[tuple[str, bool], CompiledTrajectory] = {}
+        self._commands: dict[tuple[str, bool], commands2.Command] = {}
+        self._loaded = threading.Event()
+        self._commandsBuilt = False
+
+    def trajectoryNames(self) -> list[str]:
+        """
+        :returns: The name of every trajectory file in deploy/choreo, without the .traj extension
+        """
+        try:
+            files = os.listdir(self.directory)
+        except OSError:
+            return []
+        return sorted(file[: -len(".traj")] for file in files if file.endswith(".traj"))
+
+    def preload(self) -> None:
+        """Start loading every trajectory on a background thread"""
+        threading.Thread(target=self.loadAll, name="TrajectoryCache", daemon=True).start()
+
+    def loadAll(self) -> None:
+        """Load every trajectory now. Failures are reported to the Driver Station and skipped"""
+        start = time.perf_counter()
+        names = self.trajectoryNames()
+        for name in names:
+            try:
+                self._loadTrajectory(name)
+            except Exception as e:
+                wpilib.reportError(f"Could not load trajectory {name}: {e!r}", False)
+        self.loadSeconds = time.perf_counter() - start
+        self._loaded.set()
+        print(f"Loaded {len(names)} trajectories in {self.loadSeconds * 1000:.0f} ms")
+
+    def isLoaded(self) -> bool:
+        return self._loaded.is_set()
+
+    def buildCommands(self) -> None:
+        """
+        Build the follower command for every loaded trajectory that does not have one yet. Commands register
+        themselves with the CommandScheduler when composed, so this must run on the main robot thread, e.g. from
+        disabledPeriodic. Does nothing until loading finishes, and nothing after the commands are built.
+        """
+        if self._commandsBuilt or not self.isLoaded():
+            return
+
+        with self._lock:
+            trajectories = list(self._trajectories.items())
+        for key, trajectory in trajectories:
+            if key not in self._commands:
+                self._commands[key] = self._buildCommand(trajectory)
+        self._commandsBuilt = True
+
+    def getTrajectory(self, name: str, red: bool) -> CompiledTrajectory:
+        """
+        :param name: The trajectory's file name, without the .traj extension
+        :param red: Whether to mirror the trajectory for the red alliance
+        :returns: The trajectory, loaded from deploy/choreo now if it was not preloaded
+        """
+        with self._lock:
+            trajectory = self._trajectories.get((name, red))
+        if trajectory is None:
+            wpilib.reportWarning(f"Trajectory {name} was not preloaded; loading it now", False)
+            self._loadTrajectory(name)
+            with self._lock:
+                trajectory = self._trajectories[(name, red)]
+        return trajectory
+
+    def getCommand(self, name: str, red: bool) -> commands2.Command:
+        """
+        :param name: The trajectory's file name, without the .traj extension
+        :param red: Whether to follow the trajectory mirrored for the red alliance
+        :returns: The command following the trajectory, built now if it was not prebuilt
+        """
+        command = self._commands.get((name, red))
+        if command is None:
+            command = self._commands[(name, red)] = self._buildCommand(self.getTrajectory(name, red))
+        return command
+
+    def _loadTrajectory(self, name: str) -> None:
+        trajectory = swervepy.trajectory.load_trajectory(name, self.directory)
+        flipped = trajectory.flipped()
+        with self._lock:
+            self._trajectories[(name, False)] = trajectory
+            self._trajectories[(name, True)] = flipped
@@ -1,37 +1,132 @@
+import struct
+from typing import NamedTuple
+
 import ntcore
+import numpy as np
 from wpimath import geometry
 
 
+# Every detected tag in a frame is published together as one raw value on the "AprilTag/Frame" topic, so the robot
+# always receives a complete frame. The value is a header followed by one fixed-size record per tag.
+kFrameTypeString = "apriltagframe"
+# Capture time [microseconds, coprocessor clock], frame id, tag count, padding
+kFrameHeader = struct.Struct("<qIH2x")
+kTagDtype = np.dtype([
+    ("id", "<i4"),
+    ("center", "<f4", (2,)),     # [pixels]
+    ("corners", "<f4", (8,)),    # x0, y0, x1, y1, ... from bottom left, counterclockwise [pixels]
+    ("translation", "<f4", (3,)),  # Camera-relative [meters]
+    ("rotation", "<f4", (3,)),   # Roll, pitch and yaw [radians]
+])
+
+
+# The robot pose solved on the coprocessor from every tag in a frame, published on "AprilTag/RobotPose" as
+# x [meters], y [meters], heading [radians], their three standard deviations, the tag count, and the ambiguity
+kRobotPoseLength = 8
+
+
+class RobotPoseEstimate(NamedTuple):
+    """A field-relative robot pose solved by the coprocessor"""
+    pose: geometry.Pose2d
+    # The frame's capture time in the robot's FPGA time base [seconds]
+    timestamp: float
+    # x [meters], y [meters] and heading [radians]
+    stdDevs: tuple[float, float, float]
+    tagCount: int
+    # Reprojection error of the best solution over the next best. 0 when several tags were used
+    ambiguity: float
+
+
+# Converts camera-relative vectors from the detector's east-down-north axes to WPILib's north-west-up axes
+kEdnToNwu = np.array([[0, 0, 1], [-1, 0, 0], [0, -1, 0]], dtype=np.float64)
+# Expresses a field tag's axes (x out of the tag, z up) in a detected tag's axes (x right, y down, z into the tag)
+_kFieldTagAxes = np.array([[0, 1, 0], [0, 0, -1], [-1, 0, 0]], dtype=np.float64)
+
+
+def _rotationMatrices(rotations:np.ndarray) -> np.ndarray:
+    """
+    Builds rotation matrices from roll, pitch and yaw with the same convention as wpimath's Rotation3d
+
+    :param rotations: An (n, 3) array of roll, pitch and yaw [radians]
+    :returns: An (n, 3, 3) array of rotation matrices
+    """
+    cR, cP, cY = np.cos(rotations).T
+    sR, sP, sY = np.sin(rotations).T
+    matrices = np.empty((len(rotations), 3, 3))
+    matrices[:, 0, 0] = cY * cP
+    matrices[:, 0, 1] = cY * sP * sR - sY * cR
+    matrices[:, 0, 2] = cY * sP * cR + sY * sR
+    matrices[:, 1, 0] = sY * cP
+    matrices[:, 1, 1] = sY * sP * sR + cY * cR
+    matrices[:, 1, 2] = sY * sP * cR - cY * sR
+    matrices[:, 2, 0] = -sP
+    matrices[:, 2, 1] = cP * sR
+    matrices[:, 2, 2] = cP * cR
+    return matrices
+
+
+def homogeneous(translation:geometry.Translation3d, rotation:geometry.Rotation3d) -> np.ndarray:
+    """:returns: The translation and rotation as a 4x4 homogeneous transform"""
+    q = rotation.getQuaternion()
+    w, x, y, z = q.W(), q.X(), q.Y(), q.Z()
+    return np.array([
+        [1 - 2 * (y * y + z * z), 2 * (x * y - w * z), 2 * (x * z + w * y), translation.x],
+        [2 * (x * y + w * z), 1 - 2 * (x * x + z * z), 2 * (y * z - w * x), translation.y],
+        [2 * (x * z - w * y), 2 * (y * z + w * x), 1 - 2 * (x * x + y * y), translation.z],
+        [0, 0, 0, 1],
+    ])
+
+
+def invertTransforms(transforms:np.ndarray) -> np.ndarray:
+    """:returns: The inverse of each 4x4 homogeneous transform in the (..., 4, 4) array"""
+    # Rigid transforms invert as [R^T, -R^T t]
+    inverse = np.zeros_like(transforms)
+    rotationT = np.swapaxes(transforms[..., :3, :3], -1, -2)
+    inverse[..., :3, :3] = rotationT
+    inverse[..., :3, 3] = -np.einsum("...ij,...j->...i", rotationT, transforms[..., :3, 3])
+    inverse[..., 3, 3] = 1
+    return inverse
+
 
 class _AprilTag:
-    def __init__(self, id, cX, cY, tX, tY, tZ, roll, pitch, yaw):
-        """
-        Creates an April Tag object that encapsulates information about the tag
-        
-        :param id: The ID of the April Tag
-        :param cX: The horizontal pixel coordinate in the frame
-        :param cY: The vertical pixel coordinate in the frame
-        :param tX: The horizontal displacement of the physical tag [meters]
-        :param tY: The vertical displacement of the physical tag [meters]
-        :param tZ: The profile displacement of the physical tag [meters]
-        :param roll: The roll rotation of the physical tag [radians]
-        :param pitch: The pitch rotation of the physical tag [radians]
-        :param yaw: The yaw rotation of the physical tag [radians]
-        
-        """
-        self.id = id
-        self.center = (cX, cY)
-        self.pose = geometry.Transform3d(tX, tY, tZ, geometry.Rotation3d(roll, pitch, yaw))
+    __slots__ = ("_record", "_pose")
+
+    def __init__(self, record):
+        """
+        A single tag in a frame. Reads straight from the frame's record, and only builds the wpimath pose the
+        first time it is asked for
+
+        :param record: The tag's kTagDtype record
+        """
+        self._record = record
+        self._pose: geometry.Transform3d | None = None
+
+    @property
+    def id(self) -> int:
+        return int(self._record["id"])
+
+    @property
+    def center(self) -> tuple[float, float]:
+        cX, cY = self._record["center"].tolist()
+        return cX, cY
+
+    @property
+    def pose(self) -> geometry.Transform3d:
+        if self._pose is None:
+            tX, tY, tZ = self._record["translation"].tolist()
+            roll, pitch, yaw = self._record["rotation"].tolist()
+            self._pose = geometry.Transform3d(tX, tY, tZ, geometry.Rotation3d(roll, pitch, yaw))
+        return self._pose
 
     def getPose(self) -> geometry.Transform3d:
         return self.pose
 
     def getX(self) -> float:
-        return self.pose.x
+        return float(self._record["translation"][0])
     def getY(self) -> float:
-        return self.pose.y
+        return float(self._record["translation"][1])
     def getZ(self) -> float:
-        return self.pose.z
+        return float(self._record["translation"][2])
     def getXinFeet(self) -> float:
         return self.pose.x_feet
     def getYinFeet(self) -> float:
@@ -41,28 +136,228 @@ class _AprilTag:
 
 
 
+class TagFrame:
+    __slots__ = ("captureTime", "frameId", "timestamp", "tags")
+
+    def __init__(self, captureTime:int, frameId:int, timestamp:float, tags:np.ndarray):
+        """
+        A decoded frame of tags, kept as columns of kTagDtype records. The batch helpers work on every tag at once,
+        and _AprilTag objects are only created for the tags that are iterated over or picked out
+
+        :param captureTime: Capture time on the coprocessor's clock [microseconds]
+        :param frameId: The coprocessor's frame counter
+        :param timestamp: The frame's capture time in the robot's FPGA time base [seconds]
+        :param tags: Read-only kTagDtype records, viewing the received buffer without copying it
+        """
+        self.captureTime = captureTime
+        self.frameId = frameId
+        self.timestamp = timestamp
+        self.tags = tags
+
+    def __len__(self) -> int:
+        return len(self.tags)
+
+    def __getitem__(self, index:int) -> _AprilTag:
+        return _AprilTag(self.tags[index])
+
+    def __iter__(self):
+        return (_AprilTag(record) for record in self.tags)
+
+    @property
+    def ids(self) -> np.ndarray:
+        return self.tags["id"]
+
+    @property
+    def translations(self) -> np.ndarray:
+        """Camera-relative translations, as an (n, 3) array [meters]"""
+        return self.tags["translation"]
+
+    @property
+    def rotations(self) -> np.ndarray:
+        """Roll, pitch and yaw, as an (n, 3) array [radians]"""
+        return self.tags["rotation"]
+
+    def distances(self) -> np.ndarray:
+        """
+        :returns: The straight line distance from the camera to each tag [meters]
+        """
+        return np.linalg.norm(self.translations, axis=1)
+
+    def closest(self) -> _AprilTag | None:
+        """
+        :returns: The tag nearest the camera, or None if the frame is empty
+        """
+        if len(self.tags) == 0:
+            return None
+        return _AprilTag(self.tags[np.argmin(self.distances())])
+
+    def filterById(self, ids) -> "TagFrame":
+        """
+        Keeps only the tags with the given IDs
+
+        :param ids: A tag ID, or an iterable of them
+        :returns: A frame with the same timing, containing only the matching tags
+        """
+        mask = np.isin(self.ids, np.asarray(ids))
+        return TagFrame(self.captureTime, self.frameId, self.timestamp, self.tags[mask])
+
+    def fieldRelativeRobotPoses(self, layout, robotToCamera:geometry.Transform3d) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Works out where the robot is on the field from each tag on its own. Tags missing from the layout are skipped
+
+        :param layout: The AprilTagFieldLayout giving each tag's pose on the field
+        :param robotToCamera: The camera's position on the robot
+        :returns: The IDs of the tags used, and an (n, 3) array of the robot's x [meters], y [meters] and heading
+            [radians] from each of them
+        """
+        fieldToTags = _FieldTagPoses.forLayout(layout)
+        known = np.array([tagId in fieldToTags for tagId in self.ids.tolist()], dtype=bool)
+        tags = self.tags[known]
+        if len(tags) == 0:
+            return np.empty(0, dtype=np.int32), np.empty((0, 3))
+
+        # Camera-relative tag poses, converted from the detector's axes to WPILib's
+        cameraToTags = np.zeros((len(tags), 4, 4))
+        cameraToTags[:, :3, :3] = kEdnToNwu @ _rotationMatrices(tags["rotation"].astype(np.float64)) @ _kFieldTagAxes
+        cameraToTags[:, :3, 3] = tags["translation"].astype(np.float64) @ kEdnToNwu.T
+        cameraToTags[:, 3, 3] = 1
+
+        cameraToRobot = invertTransforms(homogeneous(robotToCamera.translation(), robotToCamera.rotation()))
+        fieldToTag = np.stack([fieldToTags[tagId] for tagId in tags["id"].tolist()])
+        fieldToRobot = fieldToTag @ invertTransforms(cameraToTags) @ cameraToRobot
+
+        poses = np.empty((len(tags), 3))
+        poses[:, 0] = fieldToRobot[:, 0, 3]
+        poses[:, 1] = fieldToRobot[:, 1, 3]
+        poses[:, 2] = np.arctan2(fieldToRobot[:, 1, 0], fieldToRobot[:, 0, 0])
+        return tags["id"], poses
+
+
+class _FieldTagPoses:
+    # Each layout's tag poses as homogeneous transforms, built once per layout
+    _cache: dict[int, tuple[object, dict[int, np.ndarray]]] = {}
+
+    @classmethod
+    def forLayout(cls, layout) -> dict[int, np.ndarray]:
+        cached = cls._cache.get(id(layout))
+        if cached is None or cached[0] is not layout:
+            poses = {tag.ID: homogeneous(tag.pose.translation(), tag.pose.rotation()) for tag in layout.getTags()}
+            cached = cls._cache[id(layout)] = (layout, poses)
+        return cached[1]
+
+
+def decodeFrame(data, timestamp:float) -> TagFrame:
+    """
+    Decodes a raw frame value without copying the tag records
+
+    :param data: The raw value published by the coprocessor
+    :param timestamp: The time the value was published with, converted to the robot's time base [seconds]
+    """
+    captureTime, frameId, count = kFrameHeader.unpack_from(data, 0)
+    tags = np.frombuffer(data, dtype=kTagDtype, count=count, offset=kFrameHeader.size)
+    return TagFrame(captureTime, frameId, timestamp, tags)
+
+
+
 class AprilTagUnpacker:
-    def __init__(self):
+    def __init__(self, queueDepth:int = 20):
+        """
+        Receives frames of tags from the coprocessor. Frames are pushed to the unpacker by a NetworkTables listener,
+        and are only decoded the first time they are read.
+
+        :param queueDepth: The number of frames kept for getNewFrames between polls
+        """
         NT = ntcore.NetworkTableInstance.getDefault()
         self.tagTable = NT.getTable("AprilTag")
+        # sendAll and keepDuplicates make sure every frame is queued, even if two arrive within one loop
+        self.frameSubscriber = self.tagTable.getRawTopic("Frame").subscribe(
+            kFrameTypeString, b"", ntcore.PubSubOptions(pollStorage=queueDepth, sendAll=True, keepDuplicates=True))
+
+        # The newest (raw value, robot timestamp, tag count). Replaced as a whole by the listener thread
+        self._latest: tuple[bytes, float, int] | None = None
+        self._decoded: tuple[bytes, TagFrame, list[_AprilTag]] | None = None
+        self.listener = NT.addListener(self.frameSubscriber, ntcore.EventFlags.kValueAll, self._onFrame)
+
+        self.robotPoseSubscriber = self.tagTable.getDoubleArrayTopic("RobotPose").subscribe([])
+        self._robotPose: RobotPoseEstimate | None = None
+
+    def _onFrame(self, event:ntcore.Event):
+        # Runs on the NetworkTables listener thread, so only the header is read here
+        value = event.data.value
+        raw = value.getRaw()
+        if len(raw) < kFrameHeader.size:
+            return
+        _, _, count = kFrameHeader.unpack_from(raw, 0)
+        self._latest = (raw, value.time() / 1e6, count)
+
+    def hasTags(self) -> bool:
+        """
+        :returns: Whether the most recent frame contains any tags. Cheap enough to poll every loop
+        """
+        latest = self._latest
+        return latest is not None and latest[2] > 0
+
+    def getFrame(self) -> TagFrame | None:
+        """
+        Gets the most recent frame of tags
+
+        :returns: The frame, or None if no frame has been received
+        """
+        return self._decodeLatest()[0]
 
     def getTags(self) -> list[_AprilTag]:
-        tagList = []
-        cX, cY, tX, tY, tZ, roll, pitch, yaw = self.tagTable.getFloatArrayTopic("Centers_x").getEntry(), 
-        self.tagTable.getFloatArrayTopic("Centers_y").getEntry(), 
-        self.tagTable.getFloatArrayTopic("Positions_x").getEntry(), 
-        self.tagTable.getFloatArrayTopic("Positions_y").getEntry(), 
-        self.tagTable.getFloatArrayTopic("Positions_z").getEntry(),
-        self.tagTable.getFloatArrayTopic("Roll").getEntry(),
-        self.tagTable.getFloatArrayTopic("Pitch").getEntry(),
-        self.tagTable.getFloatArrayTopic("Yaw").getEntry()
-        for index in range(len(cX)):
-            tag = _AprilTag(cX[index], cY[index], tX[index], tY[index], tZ[index], roll[index], pitch[index], yaw[index])
-            tagList.append(tag)
-
-        return tagList
-        
-            
-
-
-    
\ No newline at end of file
+        """
+        Gets the tags in the most recent frame. The list is only rebuilt when a new frame arrives
+
+        :returns: The tags
+        """
+        return self._decodeLatest()[1]
+
+    def getNewFrames(self) -> list[TagFrame]:
+        """
+        Gets every frame received since the last call, oldest first, so that none are missed between loops
+
+        :returns: The frames
+        """
+        # The coprocessor publishes with the frame's capture time, which NetworkTables converts into local time
+        return [decodeFrame(value.value, value.time / 1e6)
+                for value in self.frameSubscriber.readQueue() if len(value.value) >= kFrameHeader.size]
+
+    def getRobotPose(self) -> RobotPoseEstimate | None:
+        """
+        Gets the most recent robot pose solved by the coprocessor from all the tags in a frame
+
+        :returns: The pose, or None if the coprocessor has not solved one
+        """
+        latest = self.robotPoseSubscriber.getAtomic()
+        if latest.time == 0 or len(latest.value) < kRobotPoseLength:
+            return None
+
+        # The published time is the frame's capture time, converted into local time by NetworkTables
+        timestamp = latest.time / 1e6
+        if self._robotPose is None or self._robotPose.timestamp != timestamp:
+            x, y, heading, xStdDev, yStdDev, headingStdDev, tagCount, ambiguity = latest.value[:kRobotPoseLength]
+            self._robotPose = RobotPoseEstimate(geometry.Pose2d(x, y, heading), timestamp,
+                                                (xStdDev, yStdDev, headingStdDev), int(tagCount), ambiguity)
+        return self._robotPose
+
+    def getCaptureTimestamp(self) -> float:
+        """
+        Gets the time the most recent frame was captured by the camera
+
+        :returns: The capture time in the robot's FPGA time base [seconds], or 0 if no frame has been received
+        """
+        latest = self._latest
+        return latest[1] if latest is not None else 0.0
+
+    def _decodeLatest(self) -> tuple[TagFrame | None, list[_AprilTag]]:
+        latest = self._latest
+        if latest is None:
+            return None, []
+
+        raw, timestamp, _ = latest
+        if self._decoded is None or self._decoded[0] is not raw:
+            frame = decodeFrame(raw, timestamp)
+            self._decoded = (raw, frame, list(frame))
+
+        return self._decoded[1], self._decoded[2]
@@ -1,16 +1,25 @@
-from cscore import CameraServer as CS
+from cscore import CameraServer as CS, VideoMode
 import robotpy_apriltag as AprTag
 import numpy as np
 from constants import CameraConstants as CamVals
 import cv2
 import ntcore
+import itertools
+import math
+import queue
+import threading
+import time
+import tracemalloc
 from wpimath import geometry
+import visionprocessing.apriltagpackager as ATPackage
 
 
 
 def main():
     CS.enableLogging()
     tagPublisher = Packager()
+    poseSolver = FieldPoseSolver(AprTag.AprilTagFieldLayout.loadField(AprTag.AprilTagField.k2025ReefscapeWelded),
+                                 CamVals.kRobotToCamera)
     # Get the UsbCamera from CameraServer
     camera = CS.startAutomaticCapture()
     # Set the resolution
@@ -18,119 +27,622 @@ def main():
     camera.setBrightness(50)
 
     # Get a CvSink. This will capture images from the camera
-    cvSink = CS.getVideo()
+    if CamVals.kGrabGrayScale:
+        # The camera converts to grayscale for us, so frames never need a color copy
+        cvSink = CS.getVideo(camera=camera, pixelFormat=VideoMode.PixelFormat.kGray)
+    else:
+        cvSink = CS.getVideo()
     # Setup a CvSource. This will send images back to the Dashboard
     outputStream = CS.putVideo("Default", CamVals.kImageWidth, CamVals.kImageHeight)
 
     grayScaleStream = CS.putVideo("GrayScale", CamVals.kImageWidth, CamVals.kImageHeight)
 
-    # Setup an April Tag Detector
+    pipeline = VisionPipeline(cvSink, outputStream, grayScaleStream, tagPublisher, poseSolver)
+    pipeline.run()
+
+
+def createDetector() -> AprTag.AprilTagDetector:
+    """Creates an April Tag detector. Detectors are not thread safe, so every worker needs its own"""
     detector = AprTag.AprilTagDetector()
     detector.addFamily("tag36h11", CamVals.kAprTagBitCorrectionMax)
-    estimator = AprTag.AprilTagPoseEstimator(
+    return detector
+
+
+def createEstimator() -> AprTag.AprilTagPoseEstimator:
+    """Creates an estimator for the 3D pose of a tag relative to the camera"""
+    return AprTag.AprilTagPoseEstimator(
         AprTag.AprilTagPoseEstimator.Config(CamVals.kAprilTagSize, 
                                             fx=CamVals.kHorizontalFocalLength, 
                                             fy=CamVals.kVerticalFocalLength, 
                                             cx=CamVals.kImageWidth/2, 
                                             cy=CamVals.kImageHeight/2))
 
-    # Allocating new images is very expensive, always try to preallocate
-    mat = np.zeros(shape=(CamVals.kImageHeight, CamVals.kImageWidth, 3), dtype=np.uint8)
 
+class TagDetection:
+    """
+    A detected tag copied out of the detector's results, so it stays valid after the detector runs again
+    on another thread
+    """
+    __slots__ = ("id", "center", "corners", "homography", "pose")
+
+    def __init__(self, detection:AprTag.AprilTagDetection, estimator:AprTag.AprilTagPoseEstimator, offsetX:int = 0, offsetY:int = 0):
+        """
+        :param detection: The detection reported by the detector
+        :param estimator: Estimates the 3D pose of the tag relative to the camera
+        :param offsetX: Horizontal position of the detected image region within the full frame [pixels]
+        :param offsetY: Vertical position of the detected image region within the full frame [pixels]
+        """
+        center = detection.getCenter()
+        self.id = detection.getId()
+        self.center = (center.x + offsetX, center.y + offsetY)
+        # Bottom left, bottom right, top right, top left; as x0, y0, x1, y1, ...
+        corners = detection.getCorners((0.0,) * 8)
+        self.corners = tuple(value + (offsetY if index % 2 else offsetX) for index, value in enumerate(corners))
+
+        # The homography maps tag coordinates to pixels. Translating the pixels by the offset premultiplies it by
+        # [[1, 0, offsetX], [0, 1, offsetY], [0, 0, 1]]
+        h = detection.getHomography()
+        self.homography = (h[0] + offsetX * h[6], h[1] + offsetX * h[7], h[2] + offsetX * h[8],
+                           h[3] + offsetY * h[6], h[4] + offsetY * h[7], h[5] + offsetY * h[8],
+                           h[6], h[7], h[8])
+        self.pose = estimator.estimate(self.homography, self.corners)
+
+    def bounds(self) -> tuple[float, float, float, float]:
+        """:returns: The tag's bounding box in the full frame as (left, top, right, bottom) [pixels]"""
+        xs, ys = self.corners[0::2], self.corners[1::2]
+        return min(xs), min(ys), max(xs), max(ys)
+
+
+class TagTracker:
+    """
+    Predicts where tags will appear from where they were last detected, so that the detector can search small
+    regions of interest instead of the whole frame. A full-frame scan still runs every few frames to find new
+    tags, and immediately after a tracked tag is lost.
+
+    The tracker is shared by all detector workers.
+    """
+
+    def __init__(self, fullScanInterval:int = CamVals.kTrackingFullScanInterval,
+                 margin:float = CamVals.kTrackingMargin, minMargin:int = CamVals.kTrackingMinMargin):
+        """
+        :param fullScanInterval: Scan the full frame at least once every this many frames
+        :param margin: Padding around a predicted tag, as a fraction of the tag's size
+        :param minMargin: Minimum padding around a predicted tag [pixels]
+        """
+        self.fullScanInterval = fullScanInterval
+        self.margin = margin
+        self.minMargin = minMargin
+
+        self._lock = threading.Lock()
+        self._lastFrameId = 0
+        self._lastFullScanId = 0
+        self._forceFullScan = True
+        # Tag id -> (bounds, frame id it was seen in, (dx, dy) motion per frame)
+        self._tracks: dict[int, tuple[tuple[float, float, float, float], int, tuple[float, float]]] = {}
+
+    def regionsFor(self, frameId:int) -> list[tuple[int, int, int, int]] | None:
+        """
+        Gets the regions of a frame to search
+
+        :param frameId: The frame about to be searched
+        :returns: The regions as (left, top, right, bottom) [pixels], or None if the full frame should be searched
+        """
+        with self._lock:
+            if self._forceFullScan or not self._tracks or frameId - self._lastFullScanId >= self.fullScanInterval:
+                return None
+
+            regions = []
+            for (left, top, right, bottom), seenId, (dx, dy) in self._tracks.values():
+                frames = frameId - seenId
+                pad = max(self.margin * max(right - left, bottom - top), self.minMargin)
+                regions.append(self._clip(left + dx * frames - pad, top + dy * frames - pad,
+                                          right + dx * frames + pad, bottom + dy * frames + pad))
+            return mergeRegions(regions)
+
+    def update(self, frameId:int, detections:list[TagDetection], fullScan:bool):
+        """
+        Records where tags were detected
+
+        :param frameId: The frame that was searched
+        :param detections: The tags detected in the frame
+        :param fullScan: Whether the full frame was searched
+        """
+        with self._lock:
+            if frameId < self._lastFrameId:
+                # Another worker has already reported a newer frame
+                return
+            self._lastFrameId = frameId
+
+            detected = {tag.id: tag for tag in detections}
+            if fullScan:
+                self._lastFullScanId = frameId
+                self._forceFullScan = False
+            elif not detected.keys() >= self._tracks.keys():
+                # A tracked tag was lost. It may have moved out of its region, so look everywhere next frame
+                self._forceFullScan = True
+
+            tracks = {}
+            for tagId, tag in detected.items():
+                bounds = tag.bounds()
+                motion = (0.0, 0.0)
+                if tagId in self._tracks:
+                    lastBounds, lastId, _ = self._tracks[tagId]
+                    frames = max(frameId - lastId, 1)
+                    motion = ((bounds[0] - lastBounds[0]) / frames, (bounds[1] - lastBounds[1]) / frames)
+                tracks[tagId] = (bounds, frameId, motion)
+            self._tracks = tracks
+
+    @staticmethod
+    def _clip(left:float, top:float, right:float, bottom:float) -> tuple[int, int, int, int]:
+        return (max(int(left), 0), max(int(top), 0),
+                min(int(right) + 1, CamVals.kImageWidth), min(int(bottom) + 1, CamVals.kImageHeight))
+
+
+def mergeRegions(regions:list[tuple[int, int, int, int]]) -> list[tuple[int, int, int, int]]:
+    """
+    Merges overlapping regions so that no part of the frame is searched twice
+
+    :param regions: Regions as (left, top, right, bottom) [pixels]
+    :returns: Non-overlapping regions covering the same area
+    """
+    merged = list(regions)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(merged)):
+            for j in range(i + 1, len(merged)):
+                a, b = merged[i], merged[j]
+                if a[0] < b[2] and b[0] < a[2] and a[1] < b[3] and b[1] < a[3]:
+                    merged[i] = (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+                    del merged[j]
+                    changed = True
+                    break
+            if changed:
+                break
+    return merged
+
+
+def detectTags(detector:AprTag.AprilTagDetector, estimator:AprTag.AprilTagPoseEstimator, grayScale,
+               frameId:int, tracker:TagTracker | None = None,
+               regionBuffer:np.ndarray | None = None) -> list[TagDetection]:
+    """
+    Detects the tags in a frame, only searching around previously detected tags when tracking
+
+    :param detector: The detector to use
+    :param estimator: The estimator to use
+    :param grayScale: The grayscale frame
+    :param frameId: Increasing number identifying the frame
+    :param tracker: Tracks tags between frames. If None, the full frame is always searched
+    :param regionBuffer: Flat uint8 array with room for a whole frame, that regions are copied into for detection.
+                         Allocated on every call if None, so workers should each pass their own
+    :returns: The detected tags
+    """
+    regions = tracker.regionsFor(frameId) if tracker is not None else None
+
+    if regions is None:
+        detections = [TagDetection(tag, estimator) for tag in detector.detect(grayScale)]
+    else:
+        if regionBuffer is None:
+            regionBuffer = np.empty(grayScale.size, dtype=np.uint8)
+        found: dict[int, TagDetection] = {}
+        for left, top, right, bottom in regions:
+            # The detector ignores strides, so a slice of the frame finds nothing. Copy the region into contiguous
+            # memory first; the buffer is reused, so this allocates no image
+            region = regionBuffer[:(bottom - top) * (right - left)].reshape(bottom - top, right - left)
+            np.copyto(region, grayScale[top:bottom, left:right])
+            for tag in detector.detect(region):
+                found.setdefault(tag.getId(), TagDetection(tag, estimator, left, top))
+        detections = list(found.values())
+
+    if tracker is not None:
+        tracker.update(frameId, detections, regions is None)
+    return detections
+
+
+class FieldPoseSolver:
+    """
+    Solves for the robot's pose on the field from the corners of every tag in a frame together. Using all the
+    corners at once is much more accurate than any one tag, and leaves only single tag frames ambiguous.
+    """
+
+    def __init__(self, layout:AprTag.AprilTagFieldLayout, robotToCamera:geometry.Transform3d,
+                 tagSize:float = CamVals.kAprilTagSize, maxAmbiguity:float = CamVals.kMaxPoseAmbiguity):
+        """
+        :param layout: Where every tag is on the field
+        :param robotToCamera: The camera's position on the robot
+        :param tagSize: The length of a tag's side [meters]
+        :param maxAmbiguity: Single tag poses more ambiguous than this are thrown out
+        """
+        self.maxAmbiguity = maxAmbiguity
+        self.cameraMatrix = np.array([[CamVals.kHorizontalFocalLength, 0, CamVals.kImageWidth / 2],
+                                      [0, CamVals.kVerticalFocalLength, CamVals.kImageHeight / 2],
+                                      [0, 0, 1]], dtype=np.float64)
+        self.distortion = np.zeros(5)
+        self.cameraToRobot = ATPackage.invertTransforms(
+            ATPackage.homogeneous(robotToCamera.translation(), robotToCamera.rotation()))
+
+        # Each tag's corners on the field, in the order the detector reports them: bottom left, bottom right,
+        # top right, top left as seen from the front of the tag
+        half = tagSize / 2
+        tagCorners = [(0, -half, -half), (0, half, -half), (0, half, half), (0, -half, half)]
+        self.fieldCorners: dict[int, np.ndarray] = {}
+        for tag in layout.getTags():
+            corners = [tag.pose.transformBy(geometry.Transform3d(geometry.Translation3d(*corner), geometry.Rotation3d()))
+                       for corner in tagCorners]
+            self.fieldCorners[tag.ID] = np.array([(corner.x, corner.y, corner.z) for corner in corners])
+
+    def solve(self, detections:list[TagDetection]) -> tuple[float, ...] | None:
+        """
+        Solves for the robot's pose
+
+        :param detections: The tags detected in the frame
+        :returns: The pose as published on "AprilTag/RobotPose", or None if no pose could be trusted
+        """
+        known = [tag for tag in detections if tag.id in self.fieldCorners]
+        if not known:
+            return None
+        objectPoints = np.concatenate([self.fieldCorners[tag.id] for tag in known])
+        imagePoints = np.array([tag.corners for tag in known], dtype=np.float64).reshape(-1, 2)
+
+        if len(known) == 1:
+            # Four corners of a square fit two mirror image poses. Keep the one that fits best, unless the other
+            # fits nearly as well
+            count, rvecs, tvecs, errors = cv2.solvePnPGeneric(objectPoints, imagePoints, self.cameraMatrix,
+                                                              self.distortion, flags=cv2.SOLVEPNP_IPPE)
+            if count == 0:
+                return None
+            errors = errors.ravel()
+            best, other = (0, 1) if count == 1 or errors[0] <= errors[1] else (1, 0)
+            ambiguity = errors[best] / errors[other] if count > 1 and errors[other] > 0 else 0.0
+            if ambiguity > self.maxAmbiguity:
+                return None
+            rvec, tvec = rvecs[best], tvecs[best]
+        else:
+            solved, rvec, tvec = cv2.solvePnP(objectPoints, imagePoints, self.cameraMatrix, self.distortion,
+                                              flags=cv2.SOLVEPNP_SQPNP)
+            if not solved:
+                return None
+            ambiguity = 0.0
+
+        # solvePnP maps field points into the camera's east-down-north axes. Invert it to get the camera's pose
+        # on the field, in north-west-up axes
+        rotation, _ = cv2.Rodrigues(rvec)
+        fieldToCamera = np.eye(4)
+        fieldToCamera[:3, :3] = rotation.T @ ATPackage.kEdnToNwu.T
+        fieldToCamera[:3, 3] = -rotation.T @ tvec.ravel()
+        fieldToRobot = fieldToCamera @ self.cameraToRobot
+
+        tagCenters = np.array([self.fieldCorners[tag.id].mean(axis=0) for tag in known])
+        distance = float(np.mean(np.linalg.norm(tagCenters - fieldToCamera[:3, 3], axis=1)))
+        scale = distance * distance / len(known)
+        xyStdDev = CamVals.kVisionXYStdDev * scale
+        return (fieldToRobot[0, 3], fieldToRobot[1, 3], math.atan2(fieldToRobot[1, 0], fieldToRobot[0, 0]),
+                xyStdDev, xyStdDev, CamVals.kVisionHeadingStdDev * scale, len(known), ambiguity)
+
+
+class _Frame:
+    """
+    Preallocated frame buffers and everything computed from them as they move through the pipeline.
+    Every stage writes into these buffers, so a frame allocates no images once the pipeline is running.
+    """
+    __slots__ = ("image", "grayScale", "annotated", "frameId", "captureTime", "grabbedAt", "detectedAt", "detections",
+                 "robotPose")
+
+    def __init__(self, grabGrayScale:bool):
+        """
+        :param grabGrayScale: Whether the camera delivers grayscale frames
+        """
+        # Allocating new images is very expensive, always try to preallocate
+        colorShape = (CamVals.kImageHeight, CamVals.kImageWidth, 3)
+        grayScaleShape = (CamVals.kImageHeight, CamVals.kImageWidth)
+        if grabGrayScale:
+            self.image = np.zeros(shape=grayScaleShape, dtype=np.uint8)
+            self.grayScale = self.image
+            # Annotations are drawn in color over a copy of the grayscale frame
+            self.annotated = np.zeros(shape=colorShape, dtype=np.uint8)
+        else:
+            self.image = np.zeros(shape=colorShape, dtype=np.uint8)
+            self.grayScale = np.zeros(shape=grayScaleShape, dtype=np.uint8)
+            # The grayscale copy is taken before annotating, so annotations can be drawn on the frame itself
+            self.annotated = self.image
+        self.frameId = 0
+        self.captureTime = 0
+        self.grabbedAt = 0.0
+        self.detectedAt = 0.0
+        self.detections: list[TagDetection] = []
+        self.robotPose: tuple[float, ...] | None = None
+
+
+def putDroppingOldest(frames:queue.Queue, frame:_Frame, freeFrames:queue.Queue) -> bool:
+    """
+    Puts a frame in a bounded queue. If the queue is full, the oldest frame in it is stale, so it is
+    dropped and its buffer is returned to the pool.
+
+    :returns: Whether a frame was dropped
+    """
+    dropped = False
     while True:
-        # Tell the CvSink to grab a frame from the camera and put it
-        # in the source image.  If there is an error notify the output.
-        time, mat = cvSink.grabFrame(mat)
-        if time == 0:
-            # Send the output the error.
-            outputStream.notifyError(cvSink.getError())
-            # skip the rest of the current iteration
-            continue
+        try:
+            frames.put_nowait(frame)
+            return dropped
+        except queue.Full:
+            pass
+
+        # Another thread may empty or refill the queue between these calls, so retry until the frame fits
+        try:
+            freeFrames.put_nowait(frames.get_nowait())
+            dropped = True
+        except queue.Empty:
+            pass
+
+
+class VisionPipeline:
+    """
+    Runs April Tag detection as a pipeline, so that detection latency no longer caps the frame rate:
 
-        
+    1. A capture thread grabs frames from the camera into preallocated buffers
+    2. A pool of detector workers, each with its own detector and estimator, finds tags, estimates their poses, and
+       solves for the robot's pose on the field
+    3. The calling thread publishes the tags, annotates the frame, and streams it
 
-        grayScaleMat = cv2.cvtColor(mat, cv2.COLOR_BGR2GRAY)
-        # Detect all apriltags
-        detections = detector.detect(grayScaleMat)
+    The stages are joined by bounded queues that drop the oldest frame when a stage falls behind, so every
+    stage always works on the freshest frame available. Frames finishing out of order are discarded.
+    """
+
+    def __init__(self, cvSink, outputStream, grayScaleStream, tagPublisher:"Packager", poseSolver:FieldPoseSolver | None = None,
+                 workerCount:int = CamVals.kDetectorWorkers, grabGrayScale:bool = CamVals.kGrabGrayScale):
+        """
+        :param cvSink: The sink that frames are grabbed from
+        :param outputStream: The stream that annotated frames are sent to
+        :param grayScaleStream: The stream that the grayscale frames are sent to
+        :param tagPublisher: Publishes the detected tags to NetworkTables
+        :param poseSolver: Solves for the robot's pose from the detected tags. If None, no pose is published
+        :param workerCount: The number of detector threads
+        :param grabGrayScale: Whether cvSink delivers grayscale frames
+        """
+        self.cvSink = cvSink
+        self.outputStream = outputStream
+        self.grayScaleStream = grayScaleStream
+        self.tagPublisher = tagPublisher
+        self.poseSolver = poseSolver
+        self.workerCount = workerCount
+        self.grabGrayScale = grabGrayScale
+
+        self.captured: queue.Queue[_Frame] = queue.Queue(maxsize=workerCount)
+        self.detected: queue.Queue[_Frame] = queue.Queue(maxsize=workerCount)
+        # Enough frames to fill both queues while every worker, the capture thread and the publisher each hold one,
+        # so the capture thread never waits for a free frame
+        self.freeFrames: queue.Queue[_Frame] = queue.Queue()
+        for _ in range(self.captured.maxsize + self.detected.maxsize + workerCount + 2):
+            self.freeFrames.put(_Frame(grabGrayScale))
+
+        self.frameIds = itertools.count(1)
+        self.tracker = TagTracker() if CamVals.kTrackingEnabled else None
+        self.lastPublishedId = 0
+        # Counted by the capture thread and every worker
+        self.droppedFrames = 0
+        self._droppedLock = threading.Lock()
+        self.timing = _StageTimingPublisher()
+        self.allocations = AllocationTracer() if CamVals.kTraceAllocations else None
+
+    def run(self):
+        """Starts the capture and detector threads, then streams results on the calling thread forever"""
+        threading.Thread(target=self._captureLoop, name="AprilTag capture", daemon=True).start()
+        for worker in range(self.workerCount):
+            threading.Thread(target=self._detectLoop, name=f"AprilTag detector {worker}", daemon=True).start()
+
+        while True:
+            self._publishFrame(self.detected.get())
+
+    def _captureLoop(self):
+        while True:
+            frame = self.freeFrames.get()
+            # Tell the CvSink to grab a frame from the camera and put it
+            # in the source image.  If there is an error notify the output.
+            captureTime, frame.image = self.cvSink.grabFrame(frame.image)
+            if self.grabGrayScale:
+                frame.grayScale = frame.image
+            if captureTime == 0:
+                # Send the output the error.
+                self.outputStream.notifyError(self.cvSink.getError())
+                self.freeFrames.put(frame)
+                continue
+
+            frame.frameId = next(self.frameIds)
+            frame.captureTime = captureTime
+            frame.grabbedAt = time.perf_counter()
+            if putDroppingOldest(self.captured, frame, self.freeFrames):
+                self._countDropped()
+
+    def _detectLoop(self):
+        detector = createDetector()
+        estimator = createEstimator()
+        regionBuffer = np.empty(CamVals.kImageHeight * CamVals.kImageWidth, dtype=np.uint8)
+
+        while True:
+            frame = self.captured.get()
+            startedAt = time.perf_counter()
+            if not self.grabGrayScale:
+                cv2.cvtColor(frame.image, cv2.COLOR_BGR2GRAY, dst=frame.grayScale)
+            # Detect all apriltags
+            frame.detections = detectTags(detector, estimator, frame.grayScale, frame.frameId, self.tracker,
+                                          regionBuffer)
+            if self.poseSolver is not None:
+                frame.robotPose = self.poseSolver.solve(frame.detections)
+            frame.detectedAt = time.perf_counter()
+            self.timing.detect.set((frame.detectedAt - startedAt) * 1000)
+
+            if putDroppingOldest(self.detected, frame, self.freeFrames):
+                self._countDropped()
+
+    def _countDropped(self):
+        with self._droppedLock:
+            self.droppedFrames += 1
+
+    def _publishFrame(self, frame:_Frame):
+        if frame.frameId < self.lastPublishedId:
+            # A worker finished after another worker published a newer frame
+            self.freeFrames.put(frame)
+            return
+        self.lastPublishedId = frame.frameId
 
         # Put the data to NetworkTables
-        tagPublisher.clear()
-        for tag in detections:
-            drawDetectionBox(tag, mat) # Draws to "Default"
-            tagPose = estimator.estimate(tag)
-            tagPublisher.addDetectedTag(tag, tagPose)
-        
-        tagPublisher.publishAllTags()
+        self.tagPublisher.clear()
+        for tag in frame.detections:
+            self.tagPublisher.addDetectedTag(tag)
+        # Stamp the tags with the time the frame was captured rather than the time they were published
+        self.tagPublisher.publishAllTags(frame.captureTime, frame.frameId)
+        if frame.robotPose is not None:
+            self.tagPublisher.publishRobotPose(frame.robotPose, frame.captureTime)
+        publishedAt = time.perf_counter()
+
+        if self.grabGrayScale:
+            cv2.cvtColor(frame.grayScale, cv2.COLOR_GRAY2BGR, dst=frame.annotated)
+        for tag in frame.detections:
+            drawDetectionBox(tag, frame.annotated) # Draws to "Default"
 
         # Give the output stream a new image to display (MUST COME AFTER ALL OTHER PROCESSING CODE)
-        outputStream.putFrame(mat)
-        grayScaleStream.putFrame(grayScaleMat)
+        self.outputStream.putFrame(frame.annotated)
+        self.grayScaleStream.putFrame(frame.grayScale)
+        streamedAt = time.perf_counter()
+
+        self.timing.publish(frame, publishedAt, streamedAt, self.droppedFrames)
+        self.freeFrames.put(frame)
+        if self.allocations is not None:
+            self.allocations.frameDone()
 
 
-def drawDetectionBox(tag:AprTag.AprilTagDetection, mat):
+class AllocationTracer:
+    """
+    Measures memory allocated while processing frames with tracemalloc and publishes it to NetworkTables.
+    Once the pipeline is warmed up, both values should stay near zero; an image allocated per frame shows up
+    as hundreds of kilobytes.
+
+    Tracing slows every allocation down, so only enable it while checking the pipeline.
+    """
+
+    def __init__(self, reportInterval:int = 100):
+        """
+        :param reportInterval: Number of frames between reports
+        """
+        self.reportInterval = reportInterval
+        self.frames = 0
+        tracemalloc.start()
+        self.baseline, _ = tracemalloc.get_traced_memory()
+
+        allocationTable = ntcore.NetworkTableInstance.getDefault().getTable("AprilTag").getSubTable("Allocations")
+        self.peakPublisher = allocationTable.getIntegerTopic("Peak Transient (bytes)").publish()
+        self.growthPublisher = allocationTable.getIntegerTopic("Net Growth (bytes per frame)").publish()
+
+    def frameDone(self):
+        """Records that a frame finished, and reports once every reportInterval frames"""
+        self.frames += 1
+        if self.frames < self.reportInterval:
+            return
+
+        current, peak = tracemalloc.get_traced_memory()
+        # The peak above where memory started shows the largest burst of allocations that happened at once
+        self.peakPublisher.set(peak - self.baseline)
+        self.growthPublisher.set((current - self.baseline) // self.frames)
+
+        tracemalloc.reset_peak()
+        self.baseline, _ = tracemalloc.get_traced_memory()
+        self.frames = 0
+
+
+class _StageTimingPublisher:
+    """Publishes how long each pipeline stage takes to NetworkTables"""
+
+    def __init__(self):
+        timingTable = ntcore.NetworkTableInstance.getDefault().getTable("AprilTag").getSubTable("Timing")
+        self.detect = timingTable.getDoubleTopic("Detect (ms)").publish()
+        self.queued = timingTable.getDoubleTopic("Queued (ms)").publish()
+        self.stream = timingTable.getDoubleTopic("Stream (ms)").publish()
+        self.latency = timingTable.getDoubleTopic("Capture To Publish (ms)").publish()
+        self.poseRate = timingTable.getDoubleTopic("Fresh Pose Rate (Hz)").publish()
+        self.dropped = timingTable.getIntegerTopic("Dropped Frames").publish()
+        self.lastPublishedAt = time.perf_counter()
+
+    def publish(self, frame:_Frame, publishedAt:float, streamedAt:float, droppedFrames:int):
+        self.queued.set((publishedAt - frame.detectedAt) * 1000)
+        self.latency.set((publishedAt - frame.grabbedAt) * 1000)
+        self.stream.set((streamedAt - publishedAt) * 1000)
+        self.poseRate.set(1 / max(publishedAt - self.lastPublishedAt, 1e-6))
+        self.dropped.set(droppedFrames)
+        self.lastPublishedAt = publishedAt
+
+
+def drawDetectionBox(tag:TagDetection, mat):
     """
     Draws a box around the tag
 
     :param tag: The tag to draw a box around
     :param mat: The image frame that this method draws to
     """
-    bL, bR, tR, tL = tag.getCorner(0), tag.getCorner(1), tag.getCorner(2), tag.getCorner(3)
+    bLx, bLy, bRx, bRy, tRx, tRy, tLx, tLy = (int(value) for value in tag.corners)
 
-    cv2.line(mat, (int(bL.x), int(bL.y)), (int(bR.x), int(bR.y)), (0, 0, 0), 5)
-    cv2.line(mat, (int(bR.x), int(bR.y)), (int(tR.x), int(tR.y)), (0, 255, 255), 5)
-    cv2.line(mat, (int(tR.x), int(tR.y)), (int(tL.x), int(tL.y)), (255, 0, 255), 5)
-    cv2.line(mat, (int(tL.x), int(tL.y)), (int(bL.x), int(bL.y)), (255, 255, 0), 5)
+    cv2.line(mat, (bLx, bLy), (bRx, bRy), (0, 0, 0), 5)
+    cv2.line(mat, (bRx, bRy), (tRx, tRy), (0, 255, 255), 5)
+    cv2.line(mat, (tRx, tRy), (tLx, tLy), (255, 0, 255), 5)
+    cv2.line(mat, (tLx, tLy), (bLx, bLy), (255, 255, 0), 5)
 
 
 class Packager:
-    def __init__(self):
-        """A class to handle the publishing of all necessary April Tag data"""
+    def __init__(self, maxTags:int = 32):
+        """
+        A class to handle the publishing of all necessary April Tag data
+
+        :param maxTags: The most tags that will be published from one frame
+        """
         NT = ntcore.NetworkTableInstance.getDefault()
         tagTable = NT.getTable("AprilTag")
-        self.publishers = [tagTable.getFloatArrayTopic("Centers_x").publish(),
-                    tagTable.getFloatArrayTopic("Centers_y").publish(),
-                    tagTable.getFloatArrayTopic("Positions_x").publish(),
-                    tagTable.getFloatArrayTopic("Positions_y").publish(),
-                    tagTable.getFloatArrayTopic("Positions_z").publish(),
-                    tagTable.getFloatArrayTopic("Roll").publish(),
-                    tagTable.getFloatArrayTopic("Pitch").publish(),
-                    tagTable.getFloatArrayTopic("Yaw").publish()]
-        
-        self.tagList = dict(str, list[float])
-        for publisher in self.publishers:
-            publisher.setDefault([])
-            self.tagList.setdefault(publisher.getTopic().getName(), [])
-
-        
-    def addDetectedTag(self, tag:AprTag.AprilTagDetection, tagPose:geometry.Transform3d):
+        self.framePublisher = tagTable.getRawTopic("Frame").publish(ATPackage.kFrameTypeString)
+        self.robotPosePublisher = tagTable.getDoubleArrayTopic("RobotPose").publish()
+
+        # Tags are written straight into the buffer that gets published
+        self.buffer = bytearray(ATPackage.kFrameHeader.size + maxTags * ATPackage.kTagDtype.itemsize)
+        self.tags = np.frombuffer(self.buffer, dtype=ATPackage.kTagDtype, count=maxTags, offset=ATPackage.kFrameHeader.size)
+        self.tagCount = 0
+
+    def addDetectedTag(self, tag:TagDetection):
         """
         Adds Tag Information to publishing cache
 
-        :param tag: The tag detected
-        :param tagPose: The estimated 3D pose of the tag in space
-        """
-        self.tagList.get("Centers_x").append(tag.getCenter().x)
-        self.tagList.get("Centers_y").append(tag.getCenter().y)
-        self.tagList.get("Positions_x").append(tagPose.x)
-        self.tagList.get("Positions_y").append(tagPose.y)
-        self.tagList.get("Positions_z").append(tagPose.z)
-        self.tagList.get("Roll").append(tagPose.rotation().x)
-        self.tagList.get("Pitch").append(tagPose.rotation().y)
-        self.tagList.get("Yaw").append(tagPose.rotation().z)
-        tagPose.rotation().y
+        :param tag: The tag detected, with its estimated 3D pose in space
+        """
+        if self.tagCount == len(self.tags):
+            return
+
+        tagPose = tag.pose
+        rotation = tagPose.rotation()
+        self.tags[self.tagCount] = (tag.id, tag.center, tag.corners,
+                                    (tagPose.x, tagPose.y, tagPose.z), (rotation.x, rotation.y, rotation.z))
+        self.tagCount += 1
     
-    def publishAllTags(self):
+    def publishAllTags(self, captureTime:int, frameId:int):
         """
-        Publishes all tag information in the cache
+        Publishes all tag information in the cache as one value
+
+        :param captureTime: The time the frame was captured, as returned by CvSink.grabFrame [microseconds].
+                            The value is published with this timestamp so that NetworkTables delivers it to the
+                            robot in the robot's own time base.
+        :param frameId: Increasing number identifying the frame
         """
-        for publisher in self.publishers:
-            publisher.set(self.tagList.get(publisher.getTopic().getName()))
+        ATPackage.kFrameHeader.pack_into(self.buffer, 0, captureTime, frameId, self.tagCount)
+        size = ATPackage.kFrameHeader.size + self.tagCount * ATPackage.kTagDtype.itemsize
+        self.framePublisher.set(memoryview(self.buffer)[:size], captureTime)
     
-    def clear(self):
+    def publishRobotPose(self, robotPose:tuple[float, ...], captureTime:int):
         """
-        Clears published values and publishing cache
+        Publishes the robot's pose on the field
+
+        :param robotPose: The pose from FieldPoseSolver.solve
+        :param captureTime: The time the frame was captured, as returned by CvSink.grabFrame [microseconds]
         """
-        for publisher in self.publishers:
-            publisher.setDefault([])
-            self.tagList.setdefault(publisher.getTopic().getName(), [])
+        self.robotPosePublisher.set(robotPose, captureTime)
 
+    def clear(self):
+        """
+        Clears the publishing cache
+        """
+        self.tagCount = 0